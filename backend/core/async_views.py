@@ -0,0 +1,82 @@
+# core/async_views.py
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from . import live
+from .models import Project, Vote
+
+User = get_user_model()
+
+
+async def authenticate(request):
+    """JWT auth without a thread hop: the token check is pure CPU, the user lookup is async."""
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    try:
+        token = auth.get_validated_token(raw_token)
+    except (InvalidToken, TokenError):
+        return None
+    lookup = {jwt_settings.USER_ID_FIELD: token.get(jwt_settings.USER_ID_CLAIM)}
+    user = await User.objects.filter(**lookup, is_active=True).afirst()
+    return user
+
+
+@sync_to_async
+def insert_vote(user, project_id):
+    # Savepoint so a duplicate doesn't poison an enclosing transaction
+    try:
+        with transaction.atomic():
+            Vote.objects.create(user=user, project_id=project_id)
+    except IntegrityError:
+        return False
+    return True
+
+
+# --- ASYNC VOTING (serve with an ASGI server, e.g. uvicorn) ---
+# Same contract as ProjectViewSet.vote, but the request never ties up a worker
+# thread while it waits on the database. Counters are still updated by the
+# Vote post_save signal (or the vote buffer when enabled).
+@csrf_exempt
+@require_POST
+async def vote(request, pk):
+    user = await authenticate(request)
+    if user is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+
+    if not await Project.objects.filter(pk=pk, status="published").aexists():
+        return JsonResponse({"detail": "No Project matches the given query."}, status=404)
+
+    # One INSERT; the unique (user, project) constraint rejects repeat votes
+    if not await insert_vote(user, pk):
+        return JsonResponse({"detail": "Already voted"}, status=400)
+    return JsonResponse({"detail": "Voted successfully"}, status=201)
+
+
+# --- LIVE UPDATES (Server-Sent Events) ---
+# ?project=<id> and ?category=<slug> may repeat; no filter means every project.
+# Each message is a batched diff: {"projects": [{"id", "vote_count", ...}, ...]}
+@require_GET
+async def live_stream(request):
+    if not live.is_enabled():
+        return JsonResponse({"detail": "Live updates are disabled."}, status=404)
+
+    projects = request.GET.getlist("project")
+    if not all(pk.isdigit() for pk in projects):
+        return JsonResponse({"project": "Must be project ids."}, status=400)
+    categories = request.GET.getlist("category")
+
+    subscription = live.get_hub().subscribe(projects, categories)
+    response = StreamingHttpResponse(live.event_stream(subscription), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,159 @@
+# core/caching.py
+"""Read-through caching for API payloads shared by every worker.
+
+* Keys live in a :class:`Namespace` whose version is part of every key, so
+  invalidating a whole namespace is one INCR; old entries just expire.
+* A miss or an expired entry is rebuilt by one worker only (single-flight
+  lock via ``cache.add``). The others serve the expired value while it lasts,
+  or wait briefly for the new one.
+* Hot entries are refreshed early with probability rising towards expiry
+  (XFetch), so the rebuild usually happens before anyone sees a miss.
+* Hits, misses and rebuilds are counted per namespace, see :func:`metrics`.
+"""
+import math
+import random
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+DEFAULTS = {
+    "TTL": 300,          # seconds an entry is fresh
+    "STALE": 60,         # seconds an expired entry may still be served during a rebuild
+    "LOCK_TIMEOUT": 30,  # seconds after which a crashed rebuild no longer blocks others
+    "WAIT": 2.0,         # seconds a worker waits for someone else's rebuild on a cold miss
+    "BETA": 1.0,         # XFetch eagerness; > 1 refreshes earlier
+    "METRICS_FLUSH": 5,  # seconds between pushes of the local counters to the shared cache
+}
+EVENTS = ("hit", "miss", "stale", "early", "wait", "rebuild")
+POLL = 0.05
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "API_CACHE", {})}
+
+
+class Namespace:
+    """A group of keys invalidated together by :meth:`bump`."""
+
+    registry = {}
+
+    def __init__(self, name):
+        self.name = name
+        self.version_key = f"{name}:version"
+        Namespace.registry[name] = self
+
+    def version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            # Seeded from the clock so a lost version never re-addresses old entries
+            cache.add(self.version_key, time.time_ns() // 1000, timeout=None)
+            version = cache.get(self.version_key, 0)
+        return version
+
+    def key(self, key):
+        return f"{self.name}:{self.version()}:{key}"
+
+    def bump(self):
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.add(self.version_key, time.time_ns() // 1000, timeout=None)
+
+
+# --- METRICS ---
+_counts = Counter()
+_counts_lock = threading.Lock()
+_last_flush = [time.monotonic()]
+
+
+def _count(namespace, event):
+    with _counts_lock:
+        _counts[namespace.name, event] += 1
+        due = time.monotonic() - _last_flush[0] >= get_config()["METRICS_FLUSH"]
+    if due:
+        flush_metrics()
+
+
+def flush_metrics():
+    with _counts_lock:
+        pending = dict(_counts)
+        _counts.clear()
+        _last_flush[0] = time.monotonic()
+    for (name, event), count in pending.items():
+        key = f"metrics:cache:{name}:{event}"
+        try:
+            cache.incr(key, count)
+        except ValueError:
+            if not cache.add(key, count, timeout=None):
+                cache.incr(key, count)
+
+
+def metrics():
+    """{namespace: {event: count}} summed over every worker, plus the hit ratio."""
+    flush_metrics()
+    keys = {f"metrics:cache:{name}:{event}": (name, event) for name in Namespace.registry for event in EVENTS}
+    found = cache.get_many(list(keys))
+    result = {}
+    for key, (name, event) in keys.items():
+        result.setdefault(name, {})[event] = found.get(key, 0)
+    for counts in result.values():
+        lookups = counts["hit"] + counts["early"] + counts["stale"] + counts["miss"]
+        counts["hit_ratio"] = round((lookups - counts["miss"]) / lookups, 4) if lookups else None
+    return result
+
+
+# --- READ-THROUGH ---
+def _should_refresh_early(delta, expires, beta, now):
+    # XFetch: the closer to expiry and the slower the rebuild, the likelier
+    return now - delta * beta * math.log(random.random() or 1e-12) >= expires
+
+
+def _rebuild(namespace, key, build, ttl, config, lock_key=None):
+    _count(namespace, "rebuild")
+    start = time.monotonic()
+    try:
+        value = build()
+        delta = time.monotonic() - start
+        cache.set(key, (value, delta, time.time() + ttl), ttl + config["STALE"])
+        return value
+    finally:
+        if lock_key:
+            cache.delete(lock_key)
+
+
+def fetch(namespace, key, build, ttl=None):
+    """Return the cached value of ``key`` in ``namespace``, calling ``build()`` when needed."""
+    config = get_config()
+    ttl = ttl or config["TTL"]
+    key = namespace.key(key)
+    lock_key = f"{key}:lock"
+    entry = cache.get(key)
+    now = time.time()
+
+    if entry is not None:
+        value, delta, expires = entry
+        if now < expires and not _should_refresh_early(delta, expires, config["BETA"], now):
+            _count(namespace, "hit")
+            return value
+        if not cache.add(lock_key, 1, config["LOCK_TIMEOUT"]):
+            # Someone else is already rebuilding it
+            _count(namespace, "stale" if now >= expires else "hit")
+            return value
+        _count(namespace, "stale" if now >= expires else "early")
+        return _rebuild(namespace, key, build, ttl, config, lock_key)
+
+    _count(namespace, "miss")
+    if cache.add(lock_key, 1, config["LOCK_TIMEOUT"]):
+        return _rebuild(namespace, key, build, ttl, config, lock_key)
+    deadline = time.monotonic() + config["WAIT"]
+    while time.monotonic() < deadline:
+        time.sleep(POLL)
+        entry = cache.get(key)
+        if entry is not None:
+            _count(namespace, "wait")
+            return entry[0]
+    # The rebuilding worker is too slow or gone; don't keep the request waiting
+    return _rebuild(namespace, key, build, ttl, config)
@@ -0,0 +1,71 @@
+# core/catalogue.py
+"""Per-process registry of Criteria rows.
+
+Criteria change a handful of times per event but are read by every criteria
+listing, scorecard and rating validation. Each process loads them all in one
+query, indexed by id and by category, and keeps them for as long as the
+shared ``criteria`` version token (core/versions.py) is unchanged. Writers
+call :func:`criteria_changed`: the writing process drops its copy at once,
+the others reload on their next read after the commit.
+
+Only rows read outside a transaction are kept; inside one they may include
+changes that are later rolled back. The Criteria instances are shared
+between threads and requests: treat them as read-only.
+"""
+from django.db import connection
+
+from . import versions
+from .models import Criteria
+
+
+class Snapshot:
+    def __init__(self, version, criteria):
+        self.version = version
+        self.all = tuple(criteria)  # in Criteria.Meta.ordering
+        self.by_id = {criteria.pk: criteria for criteria in self.all}
+        by_category = {}
+        for criteria in self.all:
+            by_category.setdefault(criteria.project_category, []).append(criteria)
+        self.by_category = {category: tuple(rows) for category, rows in by_category.items()}
+
+
+_snapshot = None
+
+
+def snapshot():
+    """The current :class:`Snapshot`; one cache read when nothing changed."""
+    global _snapshot
+    # Read the token first: rows loaded after it are at least that recent
+    version = versions.current([versions.CRITERIA])[0]
+    current = _snapshot
+    if current is not None and current.version == version:
+        return current
+    current = Snapshot(version, Criteria.objects.all())
+    if not connection.in_atomic_block:
+        _snapshot = current
+    return current
+
+
+def get(pk):
+    """The Criteria with primary key ``pk``, or None."""
+    return snapshot().by_id.get(pk)
+
+
+def for_category(category):
+    return snapshot().by_category.get(category, ())
+
+
+def all_criteria():
+    return snapshot().all
+
+
+def clear():
+    """Forget this process's copy (the next read reloads it)."""
+    global _snapshot
+    _snapshot = None
+
+
+def criteria_changed():
+    """Call after writing Criteria rows; the Criteria signals already do."""
+    clear()
+    versions.bump(versions.CRITERIA)
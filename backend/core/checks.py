@@ -0,0 +1,30 @@
+# core/checks.py
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+# Backends whose entries other worker processes cannot see
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """The version tokens (core/versions.py) must be shared by every worker.
+
+    With a per-process cache a write only bumps the tokens of the worker that
+    handled it: the others keep answering 304 for the old data and keep their
+    old Criteria registry (core/catalogue.py). Fine for a single dev server
+    and the tests, an error anywhere else.
+    """
+    if settings.DEBUG or getattr(settings, "TESTING", False):
+        return []
+    if isinstance(caches["default"], PROCESS_LOCAL_CACHES):
+        return [Error(
+            "The default cache is local to each process, so ETags and the Criteria registry go stale "
+            "across workers.",
+            hint="Set REDIS_URL (or CACHE_REDIS_URL) so every worker shares the cache.",
+            id="core.E001",
+        )]
+    return []
@@ -0,0 +1,34 @@
+# core/events.py
+import logging
+
+from django.db import transaction
+
+from . import leaderboard, leaderboard_index, live, versions
+
+logger = logging.getLogger(__name__)
+
+
+def projects_changed(project_ids):
+    """Tell every read model that the stats of ``project_ids`` changed.
+
+    Everything runs after commit so nobody re-reads rows that could still roll back.
+    """
+    ids = sorted({int(pk) for pk in project_ids})
+    if not ids:
+        return
+    leaderboard.invalidate()
+    transaction.on_commit(lambda: _after_commit(ids))
+
+
+def _after_commit(ids):
+    # The write has committed: a failing read model (Redis slow or down) is
+    # logged, not raised into a request that already succeeded. Version
+    # tokens go first so conditional GETs never keep serving the old rows.
+    steps = {"version tokens": versions.projects_changed, "live updates": live.publish}
+    if leaderboard_index.is_enabled():
+        steps["leaderboard index"] = leaderboard_index.sync_projects
+    for name, step in steps.items():
+        try:
+            step(ids)
+        except Exception:
+            logger.exception("Updating the %s failed for projects %s", name, ids)
@@ -0,0 +1,80 @@
+# core/fastpath.py
+"""Read-only project rows without ModelSerializer.
+
+Builds exactly what ProjectSerializer returns from ``.values()`` rows plus one
+query for the primary images, skipping per-field ``to_representation`` and model
+instantiation. Only used for plain JSON list/top responses; anything that
+needs the full serializer (?fields=, ?expand=, ?view=, the browsable API)
+goes through the normal path.
+"""
+from rest_framework import serializers
+
+from . import fieldsets, images
+from .models import ProjectImage
+
+# ProjectSerializer field -> values() path
+COLUMNS = {
+    "id": "id",
+    "name": "name",
+    "description": "description",
+    "category": "category",
+    "creator": "creator__email",
+    "status": "status",
+    "vote_count": "vote_count",
+    "created_at": "created_at",
+}
+IMAGE_COLUMNS = ("project_id", "image", "variants", "width", "height")
+
+# Reused DRF field, so datetimes are formatted exactly like the serializer does
+_datetime = serializers.DateTimeField()
+
+
+def eligible(request):
+    params = request.query_params
+    if fieldsets.FIELDS_PARAM in params or fieldsets.EXPAND_PARAM in params or "view" in params:
+        return False
+    return getattr(request, "accepted_renderer", None) is None or request.accepted_renderer.format == "json"
+
+
+def values(queryset, extra=()):
+    """``queryset`` as dict rows holding every column the fast path reads, plus ``extra``
+    (e.g. the pagination key) and any annotation used for ordering."""
+    annotations = list(queryset.query.annotations)
+    columns = dict.fromkeys([*COLUMNS.values(), *extra, *annotations])
+    return queryset.prefetch_related(None).values(*columns)
+
+
+def _thumbnails(project_ids, request):
+    # Rows come in ProjectImage.Meta.ordering per project, so the first one is the primary image
+    primary = {}
+    rows = ProjectImage.objects.filter(project_id__in=project_ids).order_by("project_id", "order", "id")
+    for row in rows.values(*IMAGE_COLUMNS):
+        primary.setdefault(row["project_id"], row)
+    return {
+        pk: images.thumbnail(row["image"], row["variants"], row["width"], row["height"], request)
+        for pk, row in primary.items()
+    }
+
+
+def project_rows(rows, request=None, voted=frozenset()):
+    """ProjectSerializer-shaped dicts for ``rows`` from :func:`values`.
+
+    ``voted`` is the set of project ids the current user has voted for.
+    """
+    rows = list(rows)
+    thumbnails = _thumbnails([row["id"] for row in rows], request)
+    return [
+        {
+            "id": row["id"],
+            "name": row["name"],
+            "description": row["description"],
+            "category": row["category"],
+            "creator": row["creator__email"],
+            "status": row["status"],
+            "vote_count": row["vote_count"],
+            "has_voted": row["id"] in voted,
+            "thumbnail": thumbnails.get(row["id"]),
+            "created_at": _datetime.to_representation(row["created_at"]),
+        }
+        for row in rows
+    ]
@@ -0,0 +1,82 @@
+# core/fieldsets.py
+"""Sparse fieldsets: ``?fields=id,name`` trims the payload, ``?expand=images``
+adds relations on top. The same selection trims the SQL (``only()``) and the
+prefetches, so unused columns and relations are never read."""
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+
+
+def _csv(value):
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+def parse(request):
+    """Return (fields or None for "all", expand set) from the query string."""
+    fields = _csv(request.query_params.get(FIELDS_PARAM))
+    return (set(fields) or None), set(_csv(request.query_params.get(EXPAND_PARAM)))
+
+
+class SparseFieldsetMixin:
+    """Serializer mixin honouring ``context["fields"]`` / ``context["expand"]``.
+
+    ``Meta.expandable_fields`` maps a name to a factory for a field that is only
+    included when expanded (or explicitly listed in ``fields``).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        wanted, expand = self.context.get("fields"), self.context.get("expand") or set()
+        expandable = getattr(self.Meta, "expandable_fields", {})
+        for name in (expand | (wanted or set())) & set(expandable):
+            if name not in self.fields:
+                self.fields[name] = expandable[name]()
+        if wanted is not None:
+            for name in set(self.fields) - wanted - expand:
+                self.fields.pop(name)
+
+    @classmethod
+    def available_fields(cls):
+        return set(cls.Meta.fields) | set(getattr(cls.Meta, "expandable_fields", {}))
+
+    @classmethod
+    def validate_fieldset(cls, fields, expand):
+        unknown = ((fields or set()) | expand) - cls.available_fields()
+        if unknown:
+            raise ValidationError({
+                FIELDS_PARAM: f"Unknown field(s): {', '.join(sorted(unknown))}. "
+                              f"Choose from {', '.join(sorted(cls.available_fields()))}."
+            })
+
+    @classmethod
+    def selected_fields(cls, fields, expand):
+        base = set(cls.Meta.fields) if fields is None else fields
+        return base | expand
+
+
+def shape_queryset(queryset, serializer_class, fields, expand, always=()):
+    """Restrict ``queryset`` to the columns and relations the selected fields read.
+
+    ``Meta.field_sources`` maps a serializer field to the model paths it needs:
+    a ``__`` path is joined with select_related, ``"prefetch:<name>"`` is
+    prefetched, and an empty list means no column at all (e.g. per-user flags).
+    Unlisted fields are plain columns of the same name. ``always`` lists
+    columns that must stay loaded, such as the pagination key.
+    """
+    sources = getattr(serializer_class.Meta, "field_sources", {})
+    columns, joins, prefetches = {"pk", *always}, set(), set()
+    for name in serializer_class.selected_fields(fields, expand):
+        for path in sources.get(name, [name]):
+            if path.startswith("prefetch:"):
+                prefetches.add(path.split(":", 1)[1])
+            else:
+                columns.add(path)
+                if "__" in path:
+                    joins.add(path.split("__", 1)[0])
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if joins:
+        queryset = queryset.select_related(*joins)
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+    return queryset.only(*columns)
@@ -0,0 +1,50 @@
+# core/histograms.py
+import math
+
+from .models import CriteriaAggregate
+
+SCORES = list(CriteriaAggregate.SCORES)
+DEFAULT_PERCENTILES = (25, 50, 75, 90)
+
+
+def combine(histograms):
+    """Element-wise sum, e.g. all criteria of a project."""
+    return [sum(counts) for counts in zip(*histograms)] if histograms else [0] * len(SCORES)
+
+
+def _score_at(histogram, rank):
+    """Score of the ``rank``-th (1-based) rating in ascending order."""
+    seen = 0
+    for score, count in zip(SCORES, histogram):
+        seen += count
+        if seen >= rank:
+            return score
+    return SCORES[-1]
+
+
+def percentile(histogram, p):
+    """Nearest-rank percentile; None when there are no ratings."""
+    total = sum(histogram)
+    if not total:
+        return None
+    return _score_at(histogram, max(1, math.ceil(p / 100 * total)))
+
+
+def summarize(histogram, percentiles=DEFAULT_PERCENTILES):
+    """Count, mean, median, standard deviation, percentiles and distribution in O(10)."""
+    total = sum(histogram)
+    summary = {
+        "count": total,
+        "mean": None,
+        "median": None,
+        "stddev": None,
+        "percentiles": {f"p{p:g}": percentile(histogram, p) for p in percentiles},
+        "distribution": {str(score): count for score, count in zip(SCORES, histogram)},
+    }
+    if total:
+        mean = sum(score * count for score, count in zip(SCORES, histogram)) / total
+        variance = sum(count * (score - mean) ** 2 for score, count in zip(SCORES, histogram)) / total
+        # Average of the two middle ratings when the count is even
+        median = (_score_at(histogram, (total + 1) // 2) + _score_at(histogram, total // 2 + 1)) / 2
+        summary.update(mean=round(mean, 2), median=median, stddev=round(math.sqrt(variance), 2))
+    return summary
@@ -0,0 +1,177 @@
+# core/images.py
+"""Resized variants of uploaded project images.
+
+An upload only stores the original; :func:`image_saved` queues
+``tasks.process_project_image`` after commit, which writes a thumbnail, card
+and full-size WebP next to the original and records their dimensions on the
+row. Output names are derived from the original, so a retried or repeated
+run overwrites its own files instead of piling up copies.
+
+List payloads only carry the primary image's thumbnail (:func:`thumbnail`);
+the detail view lists every image with all of its variants.
+"""
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import ExifTags, Image, ImageOps, UnidentifiedImageError, features
+
+from .models import ProjectImage
+
+DEFAULTS = {
+    "ENABLED": True,
+    "QUALITY": 80,
+}
+# name -> bounding box; images are only ever scaled down
+VARIANTS = {
+    "full": (1920, 1920),
+    "card": (800, 600),
+    "thumbnail": (320, 320),
+}
+PRIMARY_VARIANT = "thumbnail"
+FORMAT = "webp" if features.check("webp") else "jpeg"
+# Uploads we can never turn into variants; anything else (storage I/O) is retried
+PERMANENT_ERRORS = (FileNotFoundError, UnidentifiedImageError, Image.DecompressionBombError)
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "IMAGE_PIPELINE", {})}
+
+
+def is_enabled():
+    return get_config()["ENABLED"]
+
+
+def _storage():
+    return ProjectImage._meta.get_field("image").storage
+
+
+# --- SCHEDULING ---
+def image_saved(instance, created):
+    """Queue processing for a new or replaced upload (from the post_save signal)."""
+    if not created and getattr(instance, "_image_snapshot", None) == instance.image.name:
+        return
+    if not created:
+        # The old variants show the old picture; drop them now, reprocess below
+        delete_variants(instance.variants)
+        ProjectImage.objects.filter(pk=instance.pk).update(status="pending", width=None, height=None, variants={})
+        instance.status, instance.width, instance.height, instance.variants = "pending", None, None, {}
+    instance._image_snapshot = instance.image.name
+    if is_enabled() and instance.image.name:
+        from . import tasks
+
+        pk = instance.pk
+        transaction.on_commit(lambda: tasks.process_project_image.delay(pk))
+
+
+def delete_variants(variants):
+    names = [variant["name"] for variant in variants.values()]
+    if names:
+        transaction.on_commit(lambda: [_storage().delete(name) for name in names])
+
+
+# --- PROCESSING ---
+def _variant_name(original, variant):
+    stem, _ = os.path.splitext(original)
+    return f"{stem}_{variant}.{FORMAT}"
+
+
+def _encode(picture):
+    buffer = BytesIO()
+    if FORMAT == "jpeg":
+        picture = picture.convert("RGB")
+    picture.save(buffer, FORMAT, quality=get_config()["QUALITY"])
+    return ContentFile(buffer.getvalue())
+
+
+def oriented_size(source):
+    """(width, height) as displayed, i.e. after the EXIF rotation."""
+    width, height = source.size
+    if source.getexif().get(ExifTags.Base.Orientation) in (5, 6, 7, 8):
+        return height, width
+    return width, height
+
+
+def render_variants(source, original_name, storage):
+    """Write every variant of the open image ``source`` and describe them."""
+    source = ImageOps.exif_transpose(source)
+    has_alpha = source.mode in ("RGBA", "LA") or "transparency" in source.info
+    picture = source.convert("RGBA" if has_alpha else "RGB")
+
+    variants = {}
+    # Largest first, each one scaled down from the previous: far less resampling work
+    for variant, box in VARIANTS.items():
+        picture.thumbnail(box, Image.Resampling.LANCZOS)
+        name = _variant_name(original_name, variant)
+        storage.delete(name)  # overwrite rather than get a suffixed duplicate on retries
+        stored = storage.save(name, _encode(picture))
+        variants[variant] = {"name": stored, "width": picture.width, "height": picture.height, "format": FORMAT}
+    return variants
+
+
+def process(image_id):
+    """Create the variants of one ProjectImage. Safe to run any number of times.
+
+    Returns "ready", "failed" (the upload is not a usable image), "skipped"
+    (already done) or "gone" (deleted or replaced meanwhile). Storage errors
+    propagate so the task can retry.
+    """
+    from . import events
+
+    image = ProjectImage.objects.filter(pk=image_id).first()
+    if image is None or not image.image.name:
+        return "gone"
+    if image.status == "ready" and set(image.variants) == set(VARIANTS):
+        return "skipped"
+
+    storage = _storage()
+    try:
+        with storage.open(image.image.name, "rb") as fh, Image.open(fh) as source:
+            width, height = oriented_size(source)
+            # Let JPEG decode straight at a reduced scale when the original is huge
+            source.draft("RGB", VARIANTS["full"])
+            variants = render_variants(source, image.image.name, storage)
+    except PERMANENT_ERRORS:
+        ProjectImage.objects.filter(pk=image_id, image=image.image.name).update(status="failed")
+        return "failed"
+
+    updated = ProjectImage.objects.filter(pk=image_id, image=image.image.name).update(
+        status="ready", width=width, height=height, variants=variants,
+    )
+    if not updated:
+        # Replaced or deleted while we worked: these files belong to nobody
+        for variant in variants.values():
+            storage.delete(variant["name"])
+        return "gone"
+    events.projects_changed([image.project_id])
+    return "ready"
+
+
+def mark_failed(image_id):
+    ProjectImage.objects.filter(pk=image_id).update(status="failed")
+
+
+# --- REPRESENTATION ---
+def _url(name, request):
+    url = _storage().url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def variant_urls(variants, request=None):
+    return {
+        variant: {"url": _url(data["name"], request), "width": data["width"], "height": data["height"],
+                  "format": data["format"]}
+        for variant, data in variants.items()
+    }
+
+
+def thumbnail(name, variants, width, height, request=None):
+    """The primary-image entry of a list row: the thumbnail once processed, the original until then."""
+    if not name:
+        return None
+    variant = variants.get(PRIMARY_VARIANT)
+    if variant:
+        return {"url": _url(variant["name"], request), "width": variant["width"], "height": variant["height"]}
+    return {"url": _url(name, request), "width": width, "height": height}
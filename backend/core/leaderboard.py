@@ -0,0 +1,35 @@
+# core/leaderboard.py
+from django.db import transaction
+
+from . import caching, ranking
+
+NAMESPACE = caching.Namespace("leaderboard")
+LEADERBOARD_TTL = 300
+LEADERBOARD_SIZE = 5
+
+# ?by= value -> Project column used when ranking from the database
+ORDERINGS = {
+    "votes": "-vote_count",
+    "score": "-weighted_score",
+    **{name: f"-{column}" for name, (column, _) in ranking.RANKINGS.items()},
+}
+
+
+def payload_key(by="votes", category=None):
+    return f"{by}:{category or 'all'}"
+
+
+def get_payload(build, by="votes", category=None):
+    """Return the shared (user-independent) leaderboard rows, building them on a miss.
+
+    Per-user fields such as has_voted are left False here; callers overlay
+    them per request (see core.user_flags.overlay). One worker rebuilds an
+    expired ranking while the others keep serving it (see core.caching).
+    """
+    return caching.fetch(NAMESPACE, payload_key(by, category), build, LEADERBOARD_TTL)
+
+
+def invalidate():
+    # Wait for the commit, otherwise a concurrent reader could re-cache stale counts.
+    # Bumping the namespace drops every ranking at once.
+    transaction.on_commit(NAMESPACE.bump)
@@ -0,0 +1,139 @@
+# core/leaderboard_index.py
+import uuid
+
+from django.conf import settings
+
+from .models import Project
+from .redis_client import get_redis
+
+DEFAULTS = {"ENABLED": False, "PREFIX": "lb"}
+
+# metric name -> Project column the sorted set is scored by
+METRICS = {
+    "votes": "vote_count",
+    "score": "weighted_score",
+}
+GLOBAL = "global"
+REBUILD_TIMEOUT = 3600  # seconds a half-built set from a crashed rebuild survives
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "LEADERBOARD_INDEX", {})}
+
+
+def is_enabled():
+    return get_config()["ENABLED"]
+
+
+def key(metric, category=None):
+    return f"{get_config()['PREFIX']}:{metric}:{category or GLOBAL}"
+
+
+def all_keys():
+    scopes = [None] + [choice[0] for choice in Project.CATEGORY_CHOICES]
+    return [key(metric, scope) for metric in METRICS for scope in scopes]
+
+
+# --- WRITES ---
+def _index_rows(pipe, rows):
+    categories = [choice[0] for choice in Project.CATEGORY_CHOICES]
+    for row in rows:
+        member = str(row["id"])
+        for metric, column in METRICS.items():
+            for scope in [None] + categories:
+                if row["status"] == "published" and scope in (None, row["category"]):
+                    pipe.zadd(key(metric, scope), {member: row[column] or 0})
+                else:
+                    # Unpublished, or moved out of this category
+                    pipe.zrem(key(metric, scope), member)
+
+
+def sync_projects(project_ids):
+    """Copy the current stats of ``project_ids`` into every sorted set they belong to.
+
+    One PK lookup for all projects plus one pipelined round trip; each ZADD is O(log n).
+    Projects that no longer exist are removed.
+    """
+    project_ids = {int(pk) for pk in project_ids}
+    if not project_ids:
+        return
+    rows = list(
+        Project.objects.filter(pk__in=project_ids).values("id", "category", "status", *METRICS.values())
+    )
+    pipe = get_redis().pipeline(transaction=False)
+    _index_rows(pipe, rows)
+    missing = [str(pk) for pk in project_ids - {row["id"] for row in rows}]
+    if missing:
+        for name in all_keys():
+            pipe.zrem(name, *missing)
+    pipe.execute()
+
+
+def rebuild(batch_size=1000):
+    """Repopulate every sorted set from the database (cold start).
+
+    The sets are built under temporary keys and swapped in with one MULTI of
+    RENAMEs, so readers never see a half-filled leaderboard. Deltas synced
+    while the rebuild runs can be overwritten by the older rows it read;
+    they are corrected by the project's next change.
+    """
+    client = get_redis()
+    suffix = f":rebuild:{uuid.uuid4().hex}"
+    filled = set()
+    count = 0
+    queryset = Project.objects.filter(status="published").values("id", "category", "status", *METRICS.values())
+    pipe = client.pipeline(transaction=False)
+    for row in queryset.order_by("pk").iterator(chunk_size=batch_size):
+        for metric, column in METRICS.items():
+            for scope in (None, row["category"]):
+                temporary = key(metric, scope) + suffix
+                pipe.zadd(temporary, {str(row["id"]): row[column] or 0})
+                if temporary not in filled:
+                    filled.add(temporary)
+                    pipe.expire(temporary, REBUILD_TIMEOUT)  # in case we die before the swap
+        count += 1
+        if count % batch_size == 0:
+            pipe.execute()
+    pipe.execute()
+
+    swap = client.pipeline(transaction=True)
+    for name in all_keys():
+        if name + suffix in filled:
+            swap.rename(name + suffix, name)
+            swap.persist(name)
+        else:  # nothing published in this scope any more
+            swap.delete(name)
+    swap.execute()
+    return count
+
+
+# --- READS ---
+def top(metric="votes", category=None, limit=10, offset=0):
+    """[(project_id, score), ...] best first."""
+    rows = get_redis().zrevrange(key(metric, category), offset, offset + limit - 1, withscores=True)
+    return [(int(member), score) for member, score in rows]
+
+
+def rank(project_id, metric="votes", category=None):
+    """1-based rank and score of a project, or None if it isn't indexed."""
+    pipe = get_redis().pipeline(transaction=False)
+    pipe.zrevrank(key(metric, category), str(project_id))
+    pipe.zscore(key(metric, category), str(project_id))
+    pipe.zcard(key(metric, category))
+    position, score, total = pipe.execute()
+    if position is None:
+        return None
+    return {"rank": position + 1, "score": score, "total": total}
+
+
+def around(project_id, metric="votes", category=None, window=2):
+    """The ``window`` projects ranked above and below ``project_id`` (inclusive)."""
+    position = get_redis().zrevrank(key(metric, category), str(project_id))
+    if position is None:
+        return []
+    start = max(position - window, 0)
+    rows = top(metric, category, limit=position + window - start + 1, offset=start)
+    return [
+        {"id": pk, "rank": start + i + 1, "score": score}
+        for i, (pk, score) in enumerate(rows)
+    ]
@@ -0,0 +1,194 @@
+# core/live.py
+import asyncio
+import json
+import logging
+import threading
+
+from django.conf import settings
+
+from .models import Project
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {"ENABLED": False, "BACKEND": "redis", "CHANNEL": "live:projects", "INTERVAL": 0.25, "HEARTBEAT": 15}
+
+# Fields pushed to clients for every changed project
+FIELDS = ("id", "category", "vote_count", "rating_count", "average_score", "weighted_score")
+# Longest wait between retries of a failing hub loop, in seconds
+MAX_BACKOFF = 30
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "LIVE_UPDATES", {})}
+
+
+def is_enabled():
+    return get_config()["ENABLED"]
+
+
+# --- PUBLISH (any process, sync code) ---
+def publish(project_ids):
+    """Mark projects as changed. Only ids travel; values are read once per batch by each hub."""
+    config = get_config()
+    if not config["ENABLED"] or not project_ids:
+        return
+    if config["BACKEND"] == "redis":
+        get_redis().publish(config["CHANNEL"], ",".join(str(pk) for pk in project_ids))
+    else:
+        get_hub().mark_dirty(project_ids)
+
+
+# --- HUB (one per ASGI process) ---
+class Subscription:
+    def __init__(self, projects=(), categories=(), maxsize=32):
+        self.projects = {int(pk) for pk in projects}
+        self.categories = set(categories)
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def wants(self, row):
+        if not self.projects and not self.categories:
+            return True
+        return row["id"] in self.projects or row["category"] in self.categories
+
+    def offer(self, message):
+        # Messages carry absolute values, so a slow client can safely skip stale ones
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+
+class Hub:
+    """Coalesces change events and fans them out to every local subscriber.
+
+    Changed ids pile up in a set; every ``interval`` seconds the hub reads all
+    of them in one query and sends each subscriber one diff with just the rows
+    it asked for. Database cost per batch does not depend on the client count.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.subscribers = set()
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._tasks = []
+        self.loop = None
+
+    def mark_dirty(self, project_ids):
+        with self._lock:
+            self._dirty.update(int(pk) for pk in project_ids)
+
+    def subscribe(self, projects=(), categories=()):
+        self.ensure_started()
+        subscription = Subscription(projects, categories)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscribers.discard(subscription)
+
+    def ensure_started(self):
+        # The loops retry their own errors, but restart them if one ended anyway
+        if self._tasks and not any(task.done() for task in self._tasks):
+            return
+        self.close()
+        self.loop = asyncio.get_running_loop()
+        self._tasks.append(self.loop.create_task(self._flush_forever()))
+        if get_config()["BACKEND"] == "redis":
+            self._tasks.append(self.loop.create_task(self._listen_forever()))
+
+    async def flush(self):
+        with self._lock:
+            ids, self._dirty = self._dirty, set()
+        if not ids or not self.subscribers:
+            return 0
+        try:
+            rows = [row async for row in Project.objects.filter(pk__in=ids).values(*FIELDS)]
+        except Exception:
+            self.mark_dirty(ids)  # send them with the next batch
+            raise
+        for subscription in list(self.subscribers):
+            wanted = [row for row in rows if subscription.wants(row)]
+            if wanted:
+                subscription.offer({"projects": wanted})
+        return len(rows)
+
+    async def _retry_forever(self, name, step):
+        # One failed query or a dropped Redis connection must not end live updates
+        failures = 0
+        while True:
+            try:
+                await step()
+                failures = 0
+            except Exception:
+                failures += 1
+                delay = min(self.interval * 2 ** failures, MAX_BACKOFF)
+                logger.exception("Live updates: %s failed, retrying in %.1fs", name, delay)
+                await asyncio.sleep(delay)
+
+    async def _flush_forever(self):
+        async def step():
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+        await self._retry_forever("flush", step)
+
+    async def _listen_forever(self):
+        import redis.asyncio as aioredis
+
+        async def step():
+            # Returns (or raises) only when the connection drops; then subscribe again
+            client = aioredis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(get_config()["CHANNEL"])
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.mark_dirty(pk for pk in message["data"].split(",") if pk)
+            finally:
+                await client.aclose()
+
+        await self._retry_forever("subscription", step)
+
+    def close(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+
+_hub = None
+
+
+def get_hub():
+    global _hub
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    # A hub belongs to one event loop; start a fresh one if that loop is gone
+    if _hub is None or (loop is not None and _hub.loop not in (None, loop)):
+        if _hub is not None:
+            _hub.close()
+        _hub = Hub(get_config()["INTERVAL"])
+    return _hub
+
+
+# --- SSE ---
+def format_event(message, event="stats"):
+    return f"event: {event}\ndata: {json.dumps(message, separators=(',', ':'))}\n\n"
+
+
+async def event_stream(subscription, heartbeat=None):
+    heartbeat = heartbeat or get_config()["HEARTBEAT"]
+    hub = get_hub()
+    try:
+        yield ": connected\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield format_event(message)
+    finally:
+        hub.unsubscribe(subscription)
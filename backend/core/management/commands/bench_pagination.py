@@ -0,0 +1,87 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.models import Comment, Project
+from core.pagination import KeysetPagination
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare per-page latency of OFFSET and keyset pagination at increasing depth."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=50000, help="Comments to generate (rolled back afterwards).")
+        parser.add_argument("--page-size", type=int, default=10)
+        parser.add_argument("--samples", type=int, default=8, help="Number of depths to sample.")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                project = self.seed(options["rows"])
+                self.run(project, options["rows"], options["page_size"], options["samples"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, rows):
+        user, _ = get_user_model().objects.get_or_create(
+            email="bench@example.com", defaults={"username": "bench-pagination"}
+        )
+        project = Project.objects.create(name="Pagination benchmark", status="published")
+        Comment.objects.bulk_create(
+            (Comment(user=user, project=project, content=f"comment {i}") for i in range(rows)),
+            batch_size=5000,
+        )
+        return project
+
+    def run(self, project, rows, page_size, samples):
+        factory = APIRequestFactory()
+        queryset = Comment.objects.filter(project=project)
+        last_page = max(rows // page_size, 1)
+        depths = sorted({max(1, last_page * i // samples) for i in range(samples + 1)})
+
+        # Collect the keyset cursor for every sampled depth by walking the feed once
+        paginator = KeysetPagination()
+        paginator.page_size = page_size
+        cursors, url, page = {}, "/", 1
+        while page <= depths[-1]:
+            if page in depths:
+                cursors[page] = url
+            request = Request(factory.get(url, {"page_size": page_size}))
+            paginator.paginate_queryset(queryset, request)
+            url = paginator.get_next_link()
+            page += 1
+            if url is None:
+                break
+
+        self.stdout.write(f"{'page':>8} {'offset ms':>12} {'keyset ms':>12}")
+        for depth in depths:
+            offset_ms = self.time(lambda: self.offset_page(factory, queryset, depth, page_size))
+            keyset_ms = self.time(lambda: self.keyset_page(factory, queryset, cursors.get(depth, "/"), page_size))
+            self.stdout.write(f"{depth:>8} {offset_ms:>12.2f} {keyset_ms:>12.2f}")
+
+    def offset_page(self, factory, queryset, page, page_size):
+        paginator = PageNumberPagination()
+        paginator.page_size = page_size
+        paginator.paginate_queryset(queryset, Request(factory.get("/", {"page": page})))
+
+    def keyset_page(self, factory, queryset, url, page_size):
+        request = Request(factory.get(url, {"page_size": page_size}))
+        KeysetPagination().paginate_queryset(queryset, request)
+
+    def time(self, func, repeat=5):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        return best * 1000
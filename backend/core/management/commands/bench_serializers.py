@@ -0,0 +1,72 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from core import fastpath
+from core.models import Project, ProjectImage
+from core.renderers import FastJSONRenderer
+from core.serializers import ProjectSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare rows/sec of ProjectSerializer + JSONRenderer with the values() fast path + orjson."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000, help="Projects to generate (rolled back afterwards).")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.seed(options["rows"])
+                self.run(options["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, rows):
+        user, _ = get_user_model().objects.get_or_create(
+            email="bench@example.com", defaults={"username": "bench-serializers"}
+        )
+        projects = Project.objects.bulk_create(
+            (Project(name=f"Project {i}", description="x" * 200, creator=user, status="published") for i in range(rows)),
+            batch_size=2000,
+        )
+        ProjectImage.objects.bulk_create(
+            (ProjectImage(project=project, image=f"projects/{project.pk}.png") for project in projects[::2]),
+            batch_size=2000,
+        )
+
+    def run(self, repeat):
+        queryset = Project.objects.order_by("-id")
+        rows = queryset.count()
+
+        def serializer():
+            data = ProjectSerializer(
+                queryset.select_related("creator").prefetch_related("images"), many=True,
+                context={"user_flags": {"has_voted": set()}},
+            ).data
+            return JSONRenderer().render(data)
+
+        def fast():
+            return FastJSONRenderer().render(fastpath.project_rows(fastpath.values(queryset)))
+
+        self.stdout.write(f"{'path':>12} {'ms':>10} {'rows/s':>12}")
+        for name, func in (("serializer", serializer), ("fastpath", fast)):
+            seconds = self.time(func, repeat)
+            self.stdout.write(f"{name:>12} {seconds * 1000:>10.1f} {rows / seconds:>12.0f}")
+
+    def time(self, func, repeat):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        return best
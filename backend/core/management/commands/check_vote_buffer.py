@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from core import vote_buffer
+
+
+class Command(BaseCommand):
+    help = "Compare Project.vote_count (plus buffered deltas) against the Vote table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--flush", action="store_true", help="Flush the vote buffer before checking.")
+
+    def handle(self, *args, **options):
+        if options["flush"] and vote_buffer.is_enabled():
+            flushed = vote_buffer.flush()
+            self.stdout.write(f"Flushed votes for {flushed} project(s).")
+
+        mismatches = vote_buffer.check_consistency()
+        for pk, stored, pending, actual in mismatches:
+            self.stdout.write(f"project {pk}: vote_count={stored} buffered={pending} votes={actual}")
+
+        if mismatches:
+            self.stdout.write(self.style.WARNING(
+                f"{len(mismatches)} project(s) inconsistent. Run reconcile_stats to repair."
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("Vote counts are consistent."))
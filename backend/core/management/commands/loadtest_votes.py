@@ -0,0 +1,89 @@
+import asyncio
+import statistics
+import time
+import uuid
+from collections import Counter
+
+import httpx
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import Project
+
+ENDPOINTS = {
+    "sync": "/api/projects/{pk}/vote/",
+    "async": "/api/projects/{pk}/vote-async/",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent votes at a running server and compare the DRF vote action "
+        "with the async (ASGI) vote endpoint under the same concurrency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://localhost:8000")
+        parser.add_argument("--requests", type=int, default=500, help="Votes per endpoint (one user each).")
+        parser.add_argument("--concurrency", type=int, default=100)
+        parser.add_argument("--endpoint", choices=[*ENDPOINTS, "both"], default="both")
+        parser.add_argument("--keep", action="store_true", help="Keep the generated users and projects.")
+
+    def handle(self, *args, **options):
+        run = uuid.uuid4().hex[:8]
+        users = self.create_users(run, options["requests"])
+        tokens = [str(AccessToken.for_user(user)) for user in users]
+        endpoints = list(ENDPOINTS) if options["endpoint"] == "both" else [options["endpoint"]]
+        projects = []
+
+        try:
+            self.stdout.write(f"{'endpoint':<8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  statuses")
+            for name in endpoints:
+                project = Project.objects.create(name=f"loadtest {run} {name}", status="published")
+                projects.append(project)
+                url = options["base_url"].rstrip("/") + ENDPOINTS[name].format(pk=project.pk)
+                result = asyncio.run(self.fire(url, tokens, options["concurrency"]))
+                self.report(name, result)
+        finally:
+            if not options["keep"]:
+                Project.objects.filter(pk__in=[p.pk for p in projects]).delete()
+                get_user_model().objects.filter(pk__in=[u.pk for u in users]).delete()
+
+    def create_users(self, run, count):
+        User = get_user_model()
+        User.objects.bulk_create(
+            [User(username=f"loadtest-{run}-{i}", email=f"loadtest-{run}-{i}@example.com", password="!")
+             for i in range(count)],
+            batch_size=1000,
+        )
+        return list(User.objects.filter(username__startswith=f"loadtest-{run}-"))
+
+    async def fire(self, url, tokens, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+        async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+            async def one(token):
+                async with semaphore:
+                    start = time.perf_counter()
+                    try:
+                        res = await client.post(url, headers={"Authorization": f"Bearer {token}"})
+                        status = res.status_code
+                    except httpx.HTTPError as exc:
+                        status = type(exc).__name__
+                    return status, time.perf_counter() - start
+
+            start = time.perf_counter()
+            results = await asyncio.gather(*(one(token) for token in tokens))
+            elapsed = time.perf_counter() - start
+        return results, elapsed
+
+    def report(self, name, result):
+        results, elapsed = result
+        latencies = sorted(latency * 1000 for _, latency in results)
+        cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        statuses = ", ".join(f"{code}x{n}" for code, n in Counter(s for s, _ in results).most_common())
+        self.stdout.write(
+            f"{name:<8} {len(results) / elapsed:>9.1f} {cuts[49]:>9.1f} {cuts[94]:>9.1f} {cuts[98]:>9.1f}  {statuses}"
+        )
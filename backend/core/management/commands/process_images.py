@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from core import images, tasks
+from core.models import ProjectImage
+
+
+class Command(BaseCommand):
+    help = "Create the thumbnail/card/full variants of project images that don't have them yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--retry-failed", action="store_true", help="Also retry images that failed before.")
+        parser.add_argument("--sync", action="store_true", help="Process here instead of queueing Celery tasks.")
+
+    def handle(self, *args, **options):
+        statuses = ["pending", "failed"] if options["retry_failed"] else ["pending"]
+        ids = list(ProjectImage.objects.filter(status__in=statuses).order_by("pk").values_list("pk", flat=True))
+        if options["retry_failed"]:
+            ProjectImage.objects.filter(pk__in=ids, status="failed").update(status="pending")
+        results = {}
+        for pk in ids:
+            if options["sync"]:
+                status = images.process(pk)
+                results[status] = results.get(status, 0) + 1
+            else:
+                tasks.process_project_image.delay(pk)
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(results.items()))
+        verb = "Processed" if options["sync"] else "Queued"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {len(ids)} image(s)" + (f": {summary}." if summary else ".")))
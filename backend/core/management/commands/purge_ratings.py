@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core import purge
+
+
+class Command(BaseCommand):
+    help = "Delete ratings older than --days in chunks, then recalculate the affected projects."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--restart", action="store_true", help="Ignore the progress of an interrupted purge.")
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timezone.timedelta(days=options["days"])
+
+        def report(state):
+            self.stdout.write(f"  batch {state['batches']}: {state['deleted']} deleted (last id {state['last_pk']})")
+
+        result = purge.purge_ratings(
+            before, batch_size=options["batch_size"], resume=not options["restart"], progress=report,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {result['deleted']} rating(s) in {result['batches']} batch(es), "
+            f"{result['rows_per_second']} rows/s; recalculated {result['projects']} project(s)."
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core import leaderboard_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the Redis leaderboard sorted sets from the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = leaderboard_index.rebuild(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} published project(s)."))
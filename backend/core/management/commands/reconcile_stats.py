@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from core import rollups, stats, vote_buffer
+from core.models import Project
+
+
+class Command(BaseCommand):
+    help = "Recompute cached vote/rating stats for every project and fix any drift, then rebuild the analytics rollups."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--project", type=int, action="append", help="Only reconcile these project ids.")
+        parser.add_argument("--dry-run", action="store_true", help="Report drift without writing.")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        queryset = None
+        if options["project"]:
+            queryset = Project.objects.filter(pk__in=options["project"])
+
+        if vote_buffer.is_enabled() and not options["dry_run"]:
+            # Buffered deltas would be applied on top of the recount otherwise
+            vote_buffer.flush()
+
+        fixed = stats.reconcile(queryset, dry_run=options["dry_run"], batch_size=options["batch_size"])
+        verb = "drifted" if options["dry_run"] else "reconciled"
+        self.stdout.write(self.style.SUCCESS(f"{fixed} project(s) {verb}."))
+
+        # Rollups are recounted whole, so not for a subset of projects or a dry run
+        if queryset is None and not options["dry_run"]:
+            counts = rollups.rebuild(batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(
+                "Rollups rebuilt from " + ", ".join(f"{n} {source}" for source, n in counts.items()) + "."
+            ))
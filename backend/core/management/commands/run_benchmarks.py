@@ -0,0 +1,171 @@
+import json
+import platform
+import random
+import statistics
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.models import Criteria, Project
+
+ENDPOINTS = ["list", "detail", "top", "vote", "rating", "comment"]
+# Metrics where higher is worse, checked by --compare
+REGRESSION_METRICS = ("p95_ms", "queries_mean")
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the main API endpoints in-process against the current database (see seed_cohort): "
+        "p50/p95/p99 latency, throughput and SQL queries per endpoint, optionally saved as a JSON "
+        "baseline or compared with one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Measured requests per endpoint.")
+        parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per endpoint first.")
+        parser.add_argument("--endpoint", action="append", choices=ENDPOINTS, help="Only these endpoints.")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--output", help="Write the results to this JSON file (a new baseline).")
+        parser.add_argument("--compare", help="Baseline JSON to diff against; fails on regressions.")
+        parser.add_argument("--tolerance", type=float, default=0.25,
+                            help="Allowed relative increase of p95 latency / mean queries before failing.")
+        parser.add_argument("--keep", action="store_true", help="Keep the votes, ratings and comments written.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        projects = list(Project.objects.filter(status="published").order_by("pk").values_list("pk", "category"))
+        if not projects:
+            raise CommandError("No published projects; run `manage.py seed_cohort` first.")
+        self.projects = projects
+        self.criteria = {}
+        for pk, category in Criteria.objects.order_by("order", "pk").values_list("pk", "project_category"):
+            self.criteria.setdefault(category, []).append(pk)
+
+        endpoints = options["endpoint"] or ENDPOINTS
+        count = options["warmup"] + options["requests"]
+        # One fresh user per write, so every vote and scorecard is new
+        self.users = self.create_users(count * len(endpoints))
+        created = [user.pk for user in self.users]
+        self.client = APIClient()
+
+        results = {}
+        try:
+            self.stdout.write(
+                f"{'endpoint':<8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8}  statuses"
+            )
+            for name in endpoints:
+                results[name] = self.measure(name, options["warmup"], options["requests"])
+                self.report(name, results[name])
+        finally:
+            if not options["keep"]:
+                # Cascades to what they wrote; the delete signals take the stats back down
+                get_user_model().objects.filter(pk__in=created).delete()
+
+        report = {
+            "meta": {
+                "requests": options["requests"],
+                "warmup": options["warmup"],
+                "seed": options["seed"],
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "projects": len(projects),
+            },
+            "endpoints": results,
+        }
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(report, fh, indent=2, sort_keys=True)
+            self.stdout.write(f"Baseline written to {options['output']}.")
+        if options["compare"]:
+            self.compare(report, options["compare"], options["tolerance"])
+
+    def create_users(self, count):
+        User = get_user_model()
+        run = f"bench-{time.time_ns()}"
+        User.objects.bulk_create(
+            [User(username=f"{run}-{i}", email=f"{run}-{i}@example.com", password="!") for i in range(count)],
+            batch_size=1000,
+        )
+        return list(User.objects.filter(username__startswith=f"{run}-").order_by("pk"))
+
+    # --- REQUESTS ---
+    def request(self, name):
+        user = self.users.pop()
+        pk, category = self.rng.choice(self.projects)
+        self.client.force_authenticate(user)
+        if name == "list":
+            return self.client.get("/api/projects/")
+        if name == "detail":
+            return self.client.get(f"/api/projects/{pk}/")
+        if name == "top":
+            return self.client.get("/api/projects/top/")
+        if name == "vote":
+            return self.client.post(f"/api/projects/{pk}/vote/")
+        if name == "rating":
+            scores = [{"criteria": c, "score": self.rng.randint(1, 10)} for c in self.criteria.get(category, [])]
+            return self.client.post(f"/api/projects/{pk}/ratings/scorecard/", {"scores": scores}, format="json")
+        return self.client.post(f"/api/projects/{pk}/comments/", {"content": "Benchmark comment"}, format="json")
+
+    def measure(self, name, warmup, requests):
+        for _ in range(warmup):
+            self.request(name)
+        latencies, queries, statuses = [], [], Counter()
+        start = time.perf_counter()
+        for _ in range(requests):
+            began = time.perf_counter()
+            with CaptureQueriesContext(connection) as captured:
+                response = self.request(name)
+            latencies.append((time.perf_counter() - began) * 1000)
+            queries.append(len(captured))
+            statuses[str(response.status_code)] += 1
+        elapsed = time.perf_counter() - start
+
+        cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        return {
+            "requests": requests,
+            "throughput": round(requests / elapsed, 1),
+            "p50_ms": round(cuts[49], 2),
+            "p95_ms": round(cuts[94], 2),
+            "p99_ms": round(cuts[98], 2),
+            "queries_mean": round(statistics.mean(queries), 2),
+            "queries_max": max(queries),
+            "statuses": dict(statuses),
+        }
+
+    def report(self, name, row):
+        statuses = ", ".join(f"{code}x{n}" for code, n in Counter(row["statuses"]).most_common())
+        self.stdout.write(
+            f"{name:<8} {row['throughput']:>9.1f} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} "
+            f"{row['p99_ms']:>9.1f} {row['queries_mean']:>8.1f}  {statuses}"
+        )
+
+    # --- BASELINES ---
+    def compare(self, report, path, tolerance):
+        with open(path) as fh:
+            baseline = json.load(fh)
+        regressions = []
+        self.stdout.write(f"\nAgainst {path}:")
+        for name, row in report["endpoints"].items():
+            before = baseline.get("endpoints", {}).get(name)
+            if not before:
+                self.stdout.write(f"{name:<8} (not in baseline)")
+                continue
+            changes = []
+            for metric in ("throughput", "p50_ms", "p95_ms", "p99_ms", "queries_mean"):
+                old, new = before.get(metric), row[metric]
+                if old is None:  # older baseline, or written by hand
+                    changes.append(f"{metric} (not in baseline)")
+                    continue
+                change = (new - old) / old if old else 0.0
+                changes.append(f"{metric} {old} -> {new} ({change:+.0%})")
+                if metric in REGRESSION_METRICS and change > tolerance:
+                    regressions.append(f"{name} {metric}")
+            self.stdout.write(f"{name:<8} " + ", ".join(changes))
+        if regressions:
+            raise CommandError(f"Regressed beyond {tolerance:.0%}: {', '.join(regressions)}")
+        self.stdout.write(self.style.SUCCESS("No regressions."))
@@ -0,0 +1,177 @@
+import random
+import time
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import CharField, F, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Concat, LPad
+
+from core import catalogue, leaderboard_index, stats
+from core.models import Comment, Criteria, Project, Rating, Vote
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-generate a synthetic cohort (users, projects in every category, criteria, votes, "
+        "ratings, threaded comments) for load tests and benchmarks, then rebuild the cached stats."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--projects", type=int, default=200)
+        parser.add_argument("--criteria", type=int, default=4, help="Criteria per category (existing ones count).")
+        parser.add_argument("--votes", type=int, default=10000)
+        parser.add_argument("--scorecards", type=int, default=5000,
+                            help="(user, project) pairs that rate every criteria of the project's category.")
+        parser.add_argument("--comments", type=int, default=5000)
+        parser.add_argument("--reply-ratio", type=float, default=0.3, help="Share of comments that are replies.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=1, help="Random seed; the same seed gives the same cohort.")
+        parser.add_argument("--tag", default="cohort", help="Prefix of generated usernames and project names.")
+        parser.add_argument("--clear", action="store_true", help="Delete a previous cohort with the same tag first.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.tag = options["tag"]
+        users, projects = options["users"], options["projects"]
+        if not users or not projects:
+            raise CommandError("--users and --projects must be positive.")
+        for name in ("votes", "scorecards"):
+            if options[name] > users * projects:
+                raise CommandError(f"--{name} can be at most --users x --projects ({users * projects}).")
+
+        if options["clear"]:
+            self.step("clear", self.clear)
+        elif get_user_model().objects.filter(username__startswith=f"{self.tag}-").exists():
+            raise CommandError(f"A cohort tagged '{self.tag}' exists; pass --clear or another --tag.")
+
+        user_ids = self.step("users", lambda: self.create_users(users))
+        criteria = self.step("criteria", lambda: self.create_criteria(options["criteria"]))
+        project_rows = self.step("projects", lambda: self.create_projects(projects, user_ids))
+        self.step("votes", lambda: self.create_votes(options["votes"], user_ids, project_rows))
+        self.step("ratings", lambda: self.create_ratings(options["scorecards"], user_ids, project_rows, criteria))
+        self.step("comments", lambda: self.create_comments(options["comments"], options["reply_ratio"],
+                                                           user_ids, project_rows))
+        # bulk_create skips the signals that keep the counters current
+        self.step("stats", lambda: stats.reconcile(Project.objects.filter(pk__in=[pk for pk, _ in project_rows])))
+        if leaderboard_index.is_enabled():
+            self.step("leaderboard index", leaderboard_index.rebuild)
+        self.stdout.write(self.style.SUCCESS(f"Cohort '{self.tag}' ready."))
+
+    def step(self, name, func):
+        start = time.perf_counter()
+        result = func()
+        count = result if isinstance(result, int) else len(result) if result is not None else ""
+        self.stdout.write(f"{name:<18} {count:>10} {time.perf_counter() - start:>8.1f}s")
+        return result
+
+    def insert(self, model, objects):
+        created = 0
+        for chunk in chunked(objects, self.batch_size):
+            model.objects.bulk_create(chunk, batch_size=self.batch_size)
+            created += len(chunk)
+        return created
+
+    # --- GENERATORS ---
+    def clear(self):
+        # Projects first: their votes, ratings and comments go with them
+        Project.objects.filter(name__startswith=f"{self.tag} #").delete()
+        get_user_model().objects.filter(username__startswith=f"{self.tag}-").delete()
+
+    def create_users(self, count):
+        User = get_user_model()
+        self.insert(User, (
+            User(username=f"{self.tag}-{i}", email=f"{self.tag}-{i}@example.com", password="!")
+            for i in range(count)
+        ))
+        return list(User.objects.filter(username__startswith=f"{self.tag}-").order_by("pk").values_list("pk", flat=True))
+
+    def create_criteria(self, per_category):
+        criteria = {}
+        for category, _ in Project.CATEGORY_CHOICES:
+            existing = Criteria.objects.filter(project_category=category)
+            Criteria.objects.bulk_create([
+                Criteria(project_category=category, name=f"{self.tag} criteria {i}", order=i)
+                for i in range(existing.count(), per_category)
+            ])
+            criteria[category] = list(existing.order_by("order", "pk").values_list("pk", flat=True))
+        # bulk_create skips the Criteria signals
+        catalogue.criteria_changed()
+        return criteria
+
+    def create_projects(self, count, user_ids):
+        categories = [choice for choice, _ in Project.CATEGORY_CHOICES]
+        self.insert(Project, (
+            Project(
+                name=f"{self.tag} #{i}",
+                description=f"Synthetic project {i} for load tests.",
+                category=categories[i % len(categories)],
+                status="published",
+                creator_id=self.rng.choice(user_ids),
+            )
+            for i in range(count)
+        ))
+        return list(
+            Project.objects.filter(name__startswith=f"{self.tag} #").order_by("pk").values_list("pk", "category")
+        )
+
+    def pairs(self, count, user_ids, project_rows):
+        # The k-th pair is (user k % U, project k // U shifted by a per-user offset),
+        # unique as long as count <= U * P, without remembering what was drawn.
+        offsets = [self.rng.randrange(len(project_rows)) for _ in user_ids]
+        for k in range(count):
+            u = k % len(user_ids)
+            yield user_ids[u], project_rows[(k // len(user_ids) + offsets[u]) % len(project_rows)]
+
+    def create_votes(self, count, user_ids, project_rows):
+        return self.insert(Vote, (
+            Vote(user_id=user, project_id=project)
+            for user, (project, _) in self.pairs(count, user_ids, project_rows)
+        ))
+
+    def create_ratings(self, count, user_ids, project_rows, criteria):
+        # Every project gets a "true" quality so rankings have something to find
+        quality = {pk: self.rng.uniform(3, 9) for pk, _ in project_rows}
+
+        def ratings():
+            for user, (project, category) in self.pairs(count, user_ids, project_rows):
+                for criteria_id in criteria[category]:
+                    score = min(10, max(1, round(self.rng.gauss(quality[project], 1.5))))
+                    yield Rating(user_id=user, project_id=project, criteria_id=criteria_id, score=score)
+
+        return self.insert(Rating, ratings())
+
+    def create_comments(self, count, reply_ratio, user_ids, project_rows):
+        projects = [pk for pk, _ in project_rows]
+        replies = int(count * reply_ratio)
+        roots = count - replies
+        segment = LPad(Cast("pk", CharField()), 10, Value("0"))
+
+        self.insert(Comment, (
+            Comment(user_id=self.rng.choice(user_ids), project_id=self.rng.choice(projects),
+                    content=f"Comment {i}")
+            for i in range(roots)
+        ))
+        # Comment.save() builds the materialized path; do the same in one UPDATE
+        cohort = Comment.objects.filter(project_id__in=projects)
+        cohort.filter(path="", parent__isnull=True).update(root_id=F("pk"), path=segment)
+
+        parents = list(cohort.filter(parent__isnull=True).values_list("pk", "project_id")) if replies else []
+        if parents:
+            def reply(i):
+                parent, project = self.rng.choice(parents)
+                return Comment(user_id=self.rng.choice(user_ids), project_id=project, parent_id=parent,
+                               root_id=parent, depth=1, content=f"Reply {i}")
+
+            self.insert(Comment, (reply(i) for i in range(replies)))
+            parent_path = Subquery(Comment.objects.filter(pk=OuterRef("parent_id")).values("path")[:1])
+            cohort.filter(path="").update(path=Concat(parent_path, Value(Comment.PATH_SEPARATOR), segment))
+        return roots + (replies if parents else 0)
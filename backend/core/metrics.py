@@ -0,0 +1,283 @@
+# core/metrics.py
+"""Request, signal and task instrumentation exported in the Prometheus text format.
+
+Each process (web or Celery worker) keeps its observations in memory and
+merges them into one snapshot in the shared cache every FLUSH_INTERVAL
+seconds, so ``/metrics`` on any web worker reports the totals of all of them.
+Recording is a dict update under a lock; the per-query cost is two clock reads.
+"""
+import bisect
+import functools
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": True,
+    "TOKEN": "",                  # when set, /metrics requires "Authorization: Bearer <TOKEN>"
+    "FLUSH_INTERVAL": 10,         # seconds between merges into the shared snapshot
+    "SLOW_REQUEST_SECONDS": 1.0,  # log requests slower than this with their SQL; 0 disables
+    "SLOW_REQUEST_MAX_QUERIES": 20,
+}
+SNAPSHOT_KEY = "metrics:snapshot"
+LOCK_KEY = "metrics:snapshot:lock"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "METRICS", {})}
+
+
+def is_enabled():
+    return get_config()["ENABLED"]
+
+
+# --- REGISTRY ---
+class Histogram:
+    def __init__(self, name, documentation, labelnames, buckets=LATENCY_BUCKETS):
+        self.name, self.documentation = name, documentation
+        self.labelnames, self.buckets = tuple(labelnames), tuple(buckets)
+        REGISTRY[name] = self
+
+    def observe(self, value, **labels):
+        if is_enabled():
+            _record(self, tuple(str(labels[name]) for name in self.labelnames), value)
+
+    def time(self, **labels):
+        """Decorator observing the duration of every call."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - start, **labels)
+            return wrapper
+        return decorator
+
+
+REGISTRY = {}
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time spent in Django per request.", ["view", "method", "status"]
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_queries", "SQL queries run per request.", ["view", "method"], QUERY_BUCKETS
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent in SQL per request.", ["view", "method"]
+)
+SIGNAL_SECONDS = Histogram("signal_duration_seconds", "Time spent in model signal receivers.", ["receiver"])
+TASK_SECONDS = Histogram("celery_task_duration_seconds", "Run time of core Celery tasks.", ["task", "state"])
+
+
+# --- LOCAL OBSERVATIONS ---
+# (name, labels) -> [count per bucket..., +Inf count, sum]
+_pending = {}
+_lock = threading.Lock()
+_last_flush = [time.monotonic()]
+
+
+def _record(histogram, labels, value):
+    with _lock:
+        series = _pending.setdefault((histogram.name, labels), [0] * (len(histogram.buckets) + 2))
+        series[bisect.bisect_left(histogram.buckets, value)] += 1
+        series[-1] += value
+        due = time.monotonic() - _last_flush[0] >= get_config()["FLUSH_INTERVAL"]
+    if due:
+        flush()
+
+
+def flush():
+    """Merge this process's observations into the shared snapshot.
+
+    When another process holds the lock the observations stay pending for the
+    next flush, so nothing is lost or counted twice.
+    """
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _last_flush[0] = time.monotonic()
+    if not pending:
+        return
+    if not cache.add(LOCK_KEY, 1, 5):
+        _restore(pending)
+        return
+    try:
+        snapshot = cache.get(SNAPSHOT_KEY) or {}
+        for key, series in pending.items():
+            current = snapshot.get(key)
+            snapshot[key] = series if current is None else [a + b for a, b in zip(current, series)]
+        cache.set(SNAPSHOT_KEY, snapshot, timeout=None)
+    except Exception:
+        _restore(pending)
+        raise
+    finally:
+        cache.delete(LOCK_KEY)
+
+
+def _restore(pending):
+    with _lock:
+        for key, series in pending.items():
+            current = _pending.get(key)
+            _pending[key] = series if current is None else [a + b for a, b in zip(current, series)]
+
+
+# --- EXPOSITION ---
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    """Every process's histograms, plus the API cache counters, in the Prometheus text format."""
+    flush()
+    snapshot = cache.get(SNAPSHOT_KEY) or {}
+    lines = []
+    for histogram in REGISTRY.values():
+        lines += [
+            f"# HELP {histogram.name} {histogram.documentation}",
+            f"# TYPE {histogram.name} histogram",
+        ]
+        for (name, labels), series in sorted(snapshot.items()):
+            if name != histogram.name:
+                continue
+            pairs = list(zip(histogram.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip([*histogram.buckets, "+Inf"], series[:-1]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels([*pairs, ('le', str(bound))])} {cumulative}")
+            lines.append(f"{name}_sum{_labels(pairs)} {_number(series[-1])}")
+            lines.append(f"{name}_count{_labels(pairs)} {cumulative}")
+
+    from . import caching
+
+    lines += ["# HELP api_cache_events_total Read-through cache events (core/caching.py).",
+              "# TYPE api_cache_events_total counter"]
+    for namespace, counts in sorted(caching.metrics().items()):
+        for event in caching.EVENTS:
+            lines.append(f"api_cache_events_total{_labels([('namespace', namespace), ('event', event)])} {counts[event]}")
+    return "\n".join(lines) + "\n"
+
+
+# --- REQUESTS ---
+class QueryTimer:
+    """``connection.execute_wrapper`` counting queries and SQL time, keeping the first few statements."""
+
+    def __init__(self, keep):
+        self.count, self.seconds, self.keep, self.statements = 0, 0.0, keep, []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.seconds += elapsed
+            if len(self.statements) < self.keep:
+                self.statements.append((elapsed, sql))
+
+
+def _view_name(request):
+    match = getattr(request, "resolver_match", None)
+    return (match.view_name or match.route) if match else "unmatched"
+
+
+class MetricsMiddleware:
+    """Latency, query count and SQL time per view; logs slow requests with their SQL.
+
+    Under ASGI Django runs this middleware synchronously while a later one
+    in MIDDLEWARE is sync-only. Once the chain is fully async, sync views
+    run in the request's executor thread (ThreadSensitiveContext), so the
+    query timer is installed on that thread's connections instead.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _install(stack, timer):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timer))
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not is_enabled():
+            return self.get_response(request)
+        timer = QueryTimer(get_config()["SLOW_REQUEST_MAX_QUERIES"])
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            self._install(stack, timer)
+            response = self.get_response(request)
+        self._observe(request, response, timer, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        if not is_enabled():
+            return await self.get_response(request)
+        timer = QueryTimer(get_config()["SLOW_REQUEST_MAX_QUERIES"])
+        start = time.perf_counter()
+        stack = ExitStack()
+        # Connections are per thread: enter and leave in the thread the views' SQL runs in
+        await sync_to_async(self._install)(stack, timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        self._observe(request, response, timer, time.perf_counter() - start)
+        return response
+
+    def _observe(self, request, response, timer, elapsed):
+        config = get_config()
+        view, method = _view_name(request), request.method
+        REQUEST_SECONDS.observe(elapsed, view=view, method=method, status=f"{response.status_code // 100}xx")
+        REQUEST_QUERIES.observe(timer.count, view=view, method=method)
+        REQUEST_DB_SECONDS.observe(timer.seconds, view=view, method=method)
+        if config["SLOW_REQUEST_SECONDS"] and elapsed >= config["SLOW_REQUEST_SECONDS"]:
+            logger.warning(
+                "Slow request %s %s (%s): %.3fs, %d queries in %.3fs\n%s",
+                method, request.get_full_path(), view, elapsed, timer.count, timer.seconds,
+                "\n".join(f"  {seconds * 1000:.1f}ms {sql}" for seconds, sql in timer.statements),
+            )
+
+
+# --- CELERY ---
+_task_starts = {}
+
+
+def task_started(task_id=None, task=None, **kwargs):
+    if task is not None and task.name.startswith("core."):
+        _task_starts[task_id] = time.perf_counter()
+
+
+def task_finished(task_id=None, task=None, state=None, **kwargs):
+    start = _task_starts.pop(task_id, None)
+    if start is not None:
+        TASK_SECONDS.observe(time.perf_counter() - start, task=task.name.rsplit(".", 1)[-1], state=state or "")
+        # Workers may idle for minutes; don't sit on the numbers until the next task
+        flush()
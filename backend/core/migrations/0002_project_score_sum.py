@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:03
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_score_sum(apps, schema_editor):
+    Project = apps.get_model('core', 'Project')
+    Rating = apps.get_model('core', 'Rating')
+    totals = (
+        Rating.objects.filter(project=OuterRef('pk'))
+        .values('project')
+        .annotate(total=Sum('score'))
+        .values('total')
+    )
+    Project.objects.update(score_sum=Coalesce(Subquery(totals), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='score_sum',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_score_sum, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:11
+
+import django.db.models.deletion
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_aggregates(apps, schema_editor):
+    Project = apps.get_model('core', 'Project')
+    Rating = apps.get_model('core', 'Rating')
+    CriteriaAggregate = apps.get_model('core', 'CriteriaAggregate')
+
+    rows = (
+        Rating.objects.values('project_id', 'criteria_id', 'criteria__weight')
+        .annotate(total=Sum('score'), count=Count('id'))
+        .order_by()
+    )
+    weighted = defaultdict(lambda: [0.0, 0])
+    aggregates = []
+    for row in rows:
+        aggregates.append(CriteriaAggregate(
+            project_id=row['project_id'], criteria_id=row['criteria_id'],
+            score_sum=row['total'], rating_count=row['count'],
+        ))
+        weighted[row['project_id']][0] += row['criteria__weight'] * row['total'] / row['count']
+        weighted[row['project_id']][1] += row['criteria__weight']
+    CriteriaAggregate.objects.bulk_create(aggregates, batch_size=1000)
+
+    projects = [
+        Project(pk=pk, weighted_score=round(total / weight, 2) if weight else None)
+        for pk, (total, weight) in weighted.items()
+    ]
+    Project.objects.bulk_update(projects, ['weighted_score'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_project_score_sum'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CriteriaAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score_sum', models.PositiveBigIntegerField(default=0)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='weighted_score',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-weighted_score'], name='core_projec_weighte_a1ba2d_idx'),
+        ),
+        migrations.AddField(
+            model_name='criteriaaggregate',
+            name='criteria',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aggregates', to='core.criteria'),
+        ),
+        migrations.AddField(
+            model_name='criteriaaggregate',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='criteria_aggregates', to='core.project'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='criteriaaggregate',
+            unique_together={('project', 'criteria')},
+        ),
+        migrations.RunPython(backfill_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SEGMENT = '{:010d}'
+
+
+def backfill_paths(apps, schema_editor):
+    Comment = apps.get_model('core', 'Comment')
+    parents = dict(Comment.objects.values_list('id', 'parent_id').iterator(chunk_size=5000))
+    resolved = {}
+
+    def resolve(pk):
+        # Walk up to the first resolved ancestor (iteratively: threads can be deep)
+        chain = []
+        while pk is not None and pk not in resolved:
+            chain.append(pk)
+            pk = parents[pk]
+        for node in reversed(chain):
+            parent_id = parents[node]
+            if parent_id is None:
+                resolved[node] = (SEGMENT.format(node), node, 0)
+            else:
+                path, root, depth = resolved[parent_id]
+                resolved[node] = (f'{path}.{SEGMENT.format(node)}', root, depth + 1)
+
+    batch = []
+    for pk in parents:
+        resolve(pk)
+        path, root, depth = resolved[pk]
+        batch.append(Comment(pk=pk, path=path, root_id=root, depth=depth))
+        if len(batch) >= 1000:
+            Comment.objects.bulk_update(batch, ['path', 'root', 'depth'])
+            batch = []
+    Comment.objects.bulk_update(batch, ['path', 'root', 'depth'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_criteria_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, editable=False, max_length=451),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='root',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.comment'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['root', 'path'], name='core_commen_root_id_154dda_idx'),
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_rating_notifications'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=20, unique=True)),
+                ('last_id', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CategoryRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Hourly'), ('day', 'Daily')], max_length=4)),
+                ('bucket', models.DateTimeField()),
+                ('votes', models.PositiveIntegerField(default=0)),
+                ('ratings', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.PositiveBigIntegerField(default=0)),
+                ('comments', models.PositiveIntegerField(default=0)),
+                ('category', models.CharField(choices=[('poll', 'Online Polling'), ('movie', 'Movie Recommendation'), ('ecommerce', 'E-commerce Catalogue'), ('social', 'Social Feed'), ('job', 'Job Platform')], max_length=20)),
+            ],
+            options={
+                'unique_together': {('category', 'period', 'bucket')},
+            },
+        ),
+        migrations.CreateModel(
+            name='CriteriaRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Hourly'), ('day', 'Daily')], max_length=4)),
+                ('bucket', models.DateTimeField()),
+                ('ratings', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.PositiveBigIntegerField(default=0)),
+                ('distribution', models.JSONField(default=dict)),
+                ('criteria', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='core.criteria')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='criteria_rollups', to='core.project')),
+            ],
+            options={
+                'unique_together': {('project', 'criteria', 'period', 'bucket')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Hourly'), ('day', 'Daily')], max_length=4)),
+                ('bucket', models.DateTimeField()),
+                ('votes', models.PositiveIntegerField(default=0)),
+                ('ratings', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.PositiveBigIntegerField(default=0)),
+                ('comments', models.PositiveIntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='core.project')),
+            ],
+            options={
+                'unique_together': {('project', 'period', 'bucket')},
+            },
+        ),
+    ]
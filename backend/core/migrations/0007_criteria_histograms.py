@@ -0,0 +1,88 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:38
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_histograms(apps, schema_editor):
+    Rating = apps.get_model('core', 'Rating')
+    CriteriaAggregate = apps.get_model('core', 'CriteriaAggregate')
+
+    rows = (
+        Rating.objects.values('project_id', 'criteria_id')
+        .annotate(**{f'hist_{score}': Count('id', filter=Q(score=score)) for score in range(1, 11)})
+        .order_by()
+    )
+    fields = [f'hist_{score}' for score in range(1, 11)]
+    aggregates = {
+        (a.project_id, a.criteria_id): a for a in CriteriaAggregate.objects.all()
+    }
+    changed = []
+    for row in rows:
+        aggregate = aggregates.get((row['project_id'], row['criteria_id']))
+        if aggregate:
+            for name in fields:
+                setattr(aggregate, name, row[name])
+            changed.append(aggregate)
+    CriteriaAggregate.objects.bulk_update(changed, fields, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_analytics_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='criteriaaggregate',
+            name='hist_1',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='criteriaaggregate',
+            name='hist_10',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='criteriaaggregate',
+            name='hist_2',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='criteriaaggregate',
+            name='hist_3',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='criteriaaggregate',
+            name='hist_4',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='criteriaaggregate',
+            name='hist_5',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='criteriaaggregate',
+            name='hist_6',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='criteriaaggregate',
+            name='hist_7',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='criteriaaggregate',
+            name='hist_8',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='criteriaaggregate',
+            name='hist_9',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_histograms, migrations.RunPython.noop),
+    ]
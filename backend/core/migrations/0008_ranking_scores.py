@@ -0,0 +1,80 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:44
+
+import math
+from collections import defaultdict
+
+from django.db import migrations, models
+
+# Same defaults as core/ranking.py at the time of this migration
+PRIOR_MEAN, PRIOR_WEIGHT, Z, TRIM = 5.5, 10, 1.96, 0.1
+
+
+def trimmed_mean(histogram):
+    n = sum(histogram)
+    k = math.floor(n * TRIM)
+    scores = [score for score, count in enumerate(histogram, start=1) for _ in range(count)]
+    kept = scores[k:n - k]
+    return sum(kept) / len(kept)
+
+
+def backfill_rankings(apps, schema_editor):
+    Project = apps.get_model('core', 'Project')
+    CriteriaAggregate = apps.get_model('core', 'CriteriaAggregate')
+
+    histograms = defaultdict(lambda: [0] * 10)
+    for aggregate in CriteriaAggregate.objects.iterator():
+        for score in range(1, 11):
+            histograms[aggregate.project_id][score - 1] += getattr(aggregate, f'hist_{score}')
+
+    projects = []
+    for project in Project.objects.filter(rating_count__gt=0).only('id', 'rating_count', 'score_sum'):
+        n, total = project.rating_count, project.score_sum
+        share = (total - n) / (9 * n)
+        spread = Z * math.sqrt(share * (1 - share) / n + Z * Z / (4 * n * n))
+        lower = (share + Z * Z / (2 * n) - spread) / (1 + Z * Z / n)
+        project.bayesian_score = round((PRIOR_WEIGHT * PRIOR_MEAN + total) / (PRIOR_WEIGHT + n), 2)
+        project.wilson_score = round(1 + 9 * lower, 2)
+        histogram = histograms[project.pk]
+        project.trimmed_score = round(trimmed_mean(histogram), 2) if sum(histogram) else 0
+        projects.append(project)
+    Project.objects.bulk_update(
+        projects, ['bayesian_score', 'wilson_score', 'trimmed_score'], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_criteria_histograms'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='bayesian_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='trimmed_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='wilson_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-bayesian_score', '-id'], name='core_projec_bayesia_e44057_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-wilson_score', '-id'], name='core_projec_wilson__5f32e6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-trimmed_score', '-id'], name='core_projec_trimmed_66ec65_idx'),
+        ),
+        migrations.RunPython(backfill_rankings, migrations.RunPython.noop),
+    ]
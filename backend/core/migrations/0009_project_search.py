@@ -0,0 +1,60 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:05
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# PostgreSQL only: other databases keep a NULL column and core/search.py
+# falls back to substring matching.
+FORWARD_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE OR REPLACE FUNCTION core_project_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER core_project_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, description ON core_project
+    FOR EACH ROW EXECUTE FUNCTION core_project_search_vector_update()
+    """,
+    # Fires the trigger for existing rows
+    "UPDATE core_project SET name = name",
+    "CREATE INDEX core_project_search_vector_gin ON core_project USING GIN (search_vector)",
+    "CREATE INDEX core_project_name_trgm ON core_project USING GIN (name gin_trgm_ops)",
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS core_project_name_trgm",
+    "DROP INDEX IF EXISTS core_project_search_vector_gin",
+    "DROP TRIGGER IF EXISTS core_project_search_vector_trigger ON core_project",
+    "DROP FUNCTION IF EXISTS core_project_search_vector_update()",
+]
+
+
+def postgres_only(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            for sql in statements:
+                schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_ranking_scores'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(postgres_only(FORWARD_SQL), postgres_only(REVERSE_SQL)),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_project_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(fields=['project', '-created_at', '-id'], name='core_rating_project_d6be81_idx'),
+        ),
+    ]
@@ -1,11 +1,13 @@
 # core/models.py
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models import Avg, Count
 from django.dispatch import receiver
 from django.db.models.signals import post_save, post_delete
 
+from . import metrics
+
 
 class User(AbstractUser):
     email = models.EmailField(unique=True, blank=False)
@@ -53,6 +55,15 @@ class Project(models.Model):
     vote_count = models.PositiveIntegerField(default=0, editable=False)
     average_score = models.FloatField(null=True, blank=True, editable=False, db_index=True)
     rating_count = models.PositiveIntegerField(default=0, editable=False)
+    score_sum = models.PositiveBigIntegerField(default=0, editable=False)
+    # Criteria.weight-weighted mean of the per-criteria averages (see core/stats.py)
+    weighted_score = models.FloatField(null=True, blank=True, editable=False)
+    # Ranking modes that hold up at low rating counts; 0 until rated (see core/ranking.py)
+    bayesian_score = models.FloatField(default=0, editable=False)
+    wilson_score = models.FloatField(default=0, editable=False)
+    trimmed_score = models.FloatField(default=0, editable=False)
+    # Weighted name/description tsvector, kept current by a PostgreSQL trigger (migration 0009)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
@@ -60,6 +71,10 @@ class Project(models.Model):
             models.Index(fields=["category", "status"]),
             models.Index(fields=["-vote_count"]),
             models.Index(fields=["-average_score"]),
+            models.Index(fields=["-weighted_score"]),
+            models.Index(fields=["-bayesian_score", "-id"]),
+            models.Index(fields=["-wilson_score", "-id"]),
+            models.Index(fields=["-trimmed_score", "-id"]),
             models.Index(fields=["-created_at"]),
         ]
 
@@ -67,21 +82,44 @@ class Project(models.Model):
         return f"{self.name} by {self.creator}"
 
     def recalculate_stats(self):
-        agg = self.ratings.aggregate(avg=Avg("score"), count=Count("id"))
-        self.average_score = round(agg["avg"] or 0, 2)
-        self.rating_count = agg["count"] or 0
-        self.vote_count = self.votes.count()
-        self.save(update_fields=["average_score", "rating_count", "vote_count"])
+        from . import stats
+
+        stats.recompute(self.pk)
+        self.refresh_from_db(fields=[
+            "average_score", "rating_count", "score_sum", "vote_count", "weighted_score",
+            "bayesian_score", "wilson_score", "trimmed_score",
+        ])
 
 
 class ProjectImage(models.Model):
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("ready", "Ready"),
+        ("failed", "Failed"),
+    ]
+
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="images")
     image = models.ImageField(upload_to="projects/%Y/%m/%d/")
     caption = models.CharField(max_length=200, blank=True)
     order = models.PositiveSmallIntegerField(default=0)
 
+    # Filled in off the request path by core.images.process (Celery)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending", editable=False)
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    # {"thumbnail": {"name": ..., "width": ..., "height": ..., "format": "webp"}, "card": ..., "full": ...}
+    variants = models.JSONField(default=dict, blank=True, editable=False)
+
     class Meta:
-        ordering = ["order"]
+        # The first image is the project's primary image
+        ordering = ["order", "id"]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the file the variants were made from, so a replaced upload is reprocessed
+        instance._image_snapshot = instance.__dict__.get("image")
+        return instance
 
 
 class Criteria(models.Model):
@@ -98,6 +136,12 @@ class Criteria(models.Model):
     def __str__(self):
         return f"[{self.get_project_category_display()}] {self.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._scoring_snapshot = (instance.__dict__.get("project_category"), instance.__dict__.get("weight"))
+        return instance
+
 
 class Vote(models.Model):
     user = models.ForeignKey('User', on_delete=models.CASCADE, related_name="votes")
@@ -117,15 +161,72 @@ class Rating(models.Model):
 
     class Meta:
         unique_together = ("user", "project", "criteria")
-        indexes = [models.Index(fields=["project", "criteria"])]
+        indexes = [
+            models.Index(fields=["project", "criteria"]),
+            # Keyset pages of a project's ratings (newest first, see core/pagination.py)
+            models.Index(fields=["project", "-created_at", "-id"]),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the stats currently account for, so a later save can
+        # apply a delta instead of recomputing the whole project.
+        instance._stats_snapshot = tuple(instance.__dict__.get(name) for name in ("project_id", "criteria_id", "score"))
+        return instance
 
     def clean(self):
-        if self.project.category != self.criteria.project_category:
+        from . import catalogue
+
+        # The registry saves the criteria query; the project may already be loaded
+        criteria = catalogue.get(self.criteria_id) or self.criteria
+        if self.project.category != criteria.project_category:
             from django.core.exceptions import ValidationError
             raise ValidationError("Criteria does not match project category")
 
 
+class CriteriaAggregate(models.Model):
+    """Running score sum, count and score histogram of one criteria on one project.
+
+    Maintained incrementally from Rating signals so weighted scores and
+    distributions never have to rescan the Rating table.
+    """
+    SCORES = range(1, 11)
+    HISTOGRAM_FIELDS = [f"hist_{score}" for score in SCORES]
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="criteria_aggregates")
+    criteria = models.ForeignKey(Criteria, on_delete=models.CASCADE, related_name="aggregates")
+    score_sum = models.PositiveBigIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    # Number of ratings with each score (Rating.score is 1..10)
+    hist_1 = models.PositiveIntegerField(default=0)
+    hist_2 = models.PositiveIntegerField(default=0)
+    hist_3 = models.PositiveIntegerField(default=0)
+    hist_4 = models.PositiveIntegerField(default=0)
+    hist_5 = models.PositiveIntegerField(default=0)
+    hist_6 = models.PositiveIntegerField(default=0)
+    hist_7 = models.PositiveIntegerField(default=0)
+    hist_8 = models.PositiveIntegerField(default=0)
+    hist_9 = models.PositiveIntegerField(default=0)
+    hist_10 = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("project", "criteria")
+
+    @property
+    def average(self):
+        return round(self.score_sum / self.rating_count, 2) if self.rating_count else None
+
+    @property
+    def histogram(self):
+        return [getattr(self, name) for name in self.HISTOGRAM_FIELDS]
+
+
 class Comment(models.Model):
+    PATH_SEGMENT = "{:010d}"
+    PATH_SEPARATOR = "."
+    MAX_DEPTH = 40
+
     user = models.ForeignKey('User', on_delete=models.CASCADE, related_name="comments")
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="comments")
     parent = models.ForeignKey("self", null=True, blank=True, on_delete=models.CASCADE, related_name="replies")
@@ -133,16 +234,180 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Materialized path: a whole thread is one `root = X ORDER BY path` query
+    root = models.ForeignKey("self", null=True, blank=True, on_delete=models.CASCADE, related_name="+", editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    path = models.CharField(max_length=(MAX_DEPTH + 1) * 11, blank=True, editable=False)
+
     class Meta:
         ordering = ["-created_at"]
-        indexes = [models.Index(fields=["project", "-created_at"])]
+        indexes = [
+            models.Index(fields=["project", "-created_at"]),
+            models.Index(fields=["root", "path"]),
+        ]
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        if adding and self.parent_id:
+            self.root_id = self.parent.root_id
+            self.depth = self.parent.depth + 1
+        super().save(*args, **kwargs)
+        if adding:
+            # The path ends with our own id, which only exists after the INSERT
+            segment = self.PATH_SEGMENT.format(self.pk)
+            self.path = f"{self.parent.path}{self.PATH_SEPARATOR}{segment}" if self.parent_id else segment
+            self.root_id = self.root_id or self.pk
+            Comment.objects.filter(pk=self.pk).update(path=self.path, root_id=self.root_id)
+
+
+class PendingNotification(models.Model):
+    """Ratings a project received since its creator's last digest email.
+
+    One row per project, bumped in place, so a burst of ratings costs one
+    UPDATE each and ends up as a single line in the next digest.
+    """
+    project = models.OneToOneField(Project, on_delete=models.CASCADE, related_name="pending_notification")
+    rating_count = models.PositiveIntegerField(default=0)
+    first_at = models.DateTimeField()
+    last_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [models.Index(fields=["first_at"])]
+
+
+class NotificationDigest(models.Model):
+    """One digest email sent to a user; used for per-recipient rate limits."""
+    recipient = models.ForeignKey('User', on_delete=models.CASCADE, related_name="notification_digests")
+    rating_count = models.PositiveIntegerField()
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["recipient", "-sent_at"])]
+
+
+# --- ANALYTICS ROLLUPS (filled by core.rollups) ---
+class Rollup(models.Model):
+    """Activity counted into one hourly or daily bucket (bucket = period start, UTC)."""
+    PERIOD_CHOICES = [
+        ("hour", "Hourly"),
+        ("day", "Daily"),
+    ]
+
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    bucket = models.DateTimeField()
+    votes = models.PositiveIntegerField(default=0)
+    ratings = models.PositiveIntegerField(default=0)
+    score_sum = models.PositiveBigIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class ProjectRollup(Rollup):
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="rollups")
+
+    class Meta:
+        unique_together = ("project", "period", "bucket")
+
+
+class CategoryRollup(Rollup):
+    category = models.CharField(max_length=20, choices=Project.CATEGORY_CHOICES)
+
+    class Meta:
+        unique_together = ("category", "period", "bucket")
+
+
+class CriteriaRollup(models.Model):
+    """Ratings of one criteria on one project in a bucket, with the count per score."""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="criteria_rollups")
+    criteria = models.ForeignKey(Criteria, on_delete=models.CASCADE, related_name="rollups")
+    period = models.CharField(max_length=4, choices=Rollup.PERIOD_CHOICES)
+    bucket = models.DateTimeField()
+    ratings = models.PositiveIntegerField(default=0)
+    score_sum = models.PositiveBigIntegerField(default=0)
+    distribution = models.JSONField(default=dict)  # {"<score>": count}
+
+    class Meta:
+        unique_together = ("project", "criteria", "period", "bucket")
+
+
+class RollupWatermark(models.Model):
+    """Highest primary key of a source table already counted into the rollups."""
+    source = models.CharField(max_length=20, unique=True)
+    last_id = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
 
 # Signals
 @receiver([post_save, post_delete], sender=Vote)
 @receiver([post_save, post_delete], sender=Rating)
+@metrics.SIGNAL_SECONDS.time(receiver="update_project_stats")
 def update_project_stats(sender, instance, **kwargs):
+    from . import events, notifications, stats, versions, vote_buffer
+
+    deleted = kwargs["signal"] is post_delete
     if isinstance(instance, Vote):
-        instance.project.recalculate_stats()
+        delta = -1 if deleted else 1 if kwargs.get("created") else 0
+        if not delta:
+            return
+        if vote_buffer.is_enabled():
+            vote_buffer.record_vote(instance.project_id, delta)
+            # vote_count follows at the next flush, but has_voted changes now
+            versions.projects_changed([instance.project_id])
+        else:
+            stats.apply_vote_delta(instance.project_id, delta)
+            events.projects_changed([instance.project_id])
     elif isinstance(instance, Rating):
-        instance.project.recalculate_stats()
+        before = None if kwargs.get("created") else getattr(instance, "_stats_snapshot", None)
+        after = None if deleted else (instance.project_id, instance.criteria_id, instance.score)
+        if not kwargs.get("created") and (before is None or None in before):
+            # We don't know what the row looked like before, so rebuild.
+            stats.recompute(instance.project_id)
+        else:
+            stats.apply_rating_change(before, after)
+        instance._stats_snapshot = after
+        if kwargs.get("created") and notifications.is_enabled():
+            notifications.record_ratings(instance.project_id)
+        events.projects_changed({instance.project_id} | ({before[0]} if before and before[0] else set()))
+
+
+@receiver([post_save, post_delete], sender=Project)
+def project_changed(sender, instance, **kwargs):
+    from . import events
+
+    events.projects_changed([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=ProjectImage)
+def project_image_changed(sender, instance, **kwargs):
+    from . import events, images
+
+    if kwargs["signal"] is post_delete:
+        images.delete_variants(instance.variants)
+    else:
+        images.image_saved(instance, kwargs.get("created"))
+    # Images are part of every project payload, leaderboards included
+    events.projects_changed([instance.project_id])
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    from . import versions
+
+    versions.bump(versions.comments(instance.project_id))
+
+
+@receiver(post_save, sender=Criteria)
+@receiver(post_delete, sender=Criteria)
+@metrics.SIGNAL_SECONDS.time(receiver="rescore_category")
+def rescore_category(sender, instance, **kwargs):
+    from . import catalogue, stats
+
+    before = getattr(instance, "_scoring_snapshot", None)
+    after = (instance.project_category, instance.weight)
+    if kwargs["signal"] is post_delete or (before is not None and before != after):
+        categories = {after[0]} | ({before[0]} if before and before[0] else set())
+        stats.rescore_categories(categories)
+    instance._scoring_snapshot = after
+    catalogue.criteria_changed()
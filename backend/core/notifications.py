@@ -0,0 +1,105 @@
+# core/notifications.py
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Value, When
+from django.utils import timezone
+
+from .models import NotificationDigest, PendingNotification
+
+DEFAULTS = {
+    "ENABLED": False,
+    "WINDOW": 300,        # seconds a project's ratings are collected before they are mailed
+    "MAX_PER_HOUR": 4,    # digests per recipient; extra ratings wait for the next slot
+    "FROM_EMAIL": "noreply@example.com",
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "NOTIFICATIONS", {})}
+
+
+def is_enabled():
+    return get_config()["ENABLED"]
+
+
+# --- BUFFER ---
+def record_ratings(project_id, count=1):
+    """Add ``count`` new ratings to the project's pending digest line."""
+    now = timezone.now()
+    updated = PendingNotification.objects.filter(project_id=project_id).update(
+        rating_count=F("rating_count") + count, last_at=now,
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            PendingNotification.objects.create(project_id=project_id, rating_count=count, first_at=now, last_at=now)
+    except IntegrityError:
+        # A concurrent rating created the row first
+        record_ratings(project_id, count)
+
+
+# --- DIGESTS ---
+def _render(lines):
+    total = sum(count for _, count in lines)
+    body = "\n".join(f"- {name}: {count} new rating{'s' if count != 1 else ''}" for name, count in lines)
+    subject = "Your project received a new rating!" if total == 1 else f"Your projects received {total} new ratings"
+    return subject, f"Here is what happened since our last email:\n\n{body}\n"
+
+
+def send_digests(now=None):
+    """Mail every creator one digest covering all their projects whose oldest
+    pending rating is older than WINDOW, over a single SMTP connection.
+
+    Recipients that already got MAX_PER_HOUR digests keep accumulating until a
+    later run. Returns the number of emails sent.
+    """
+    config = get_config()
+    now = now or timezone.now()
+    due = list(
+        PendingNotification.objects.filter(first_at__lte=now - timezone.timedelta(seconds=config["WINDOW"]))
+        .select_related("project__creator")
+        .order_by("project__name")
+    )
+    orphans = [row.pk for row in due if not (row.project.creator and row.project.creator.email)]
+    if orphans:
+        PendingNotification.objects.filter(pk__in=orphans).delete()
+
+    by_recipient = defaultdict(list)
+    for row in due:
+        if row.pk not in orphans:
+            by_recipient[row.project.creator].append(row)
+
+    recent = dict(
+        NotificationDigest.objects.filter(recipient__in=by_recipient, sent_at__gte=now - timezone.timedelta(hours=1))
+        .values_list("recipient").annotate(n=Count("id")).order_by()
+    )
+    batch = {user: rows for user, rows in by_recipient.items() if recent.get(user.pk, 0) < config["MAX_PER_HOUR"]}
+    if not batch:
+        return 0
+
+    messages = []
+    for user, rows in batch.items():
+        subject, body = _render([(row.project.name, row.rating_count) for row in rows])
+        messages.append(EmailMessage(subject, body, config["FROM_EMAIL"], [user.email]))
+    with get_connection() as connection:
+        sent = connection.send_messages(messages) or 0
+
+    # Subtract what was mailed instead of deleting: ratings that arrived while
+    # sending stay pending for the next digest.
+    rows = [row for rows in batch.values() for row in rows]
+    PendingNotification.objects.filter(pk__in=[row.pk for row in rows]).update(
+        rating_count=F("rating_count") - Case(
+            *[When(pk=row.pk, then=Value(row.rating_count)) for row in rows], default=Value(0)
+        ),
+        first_at=now,
+    )
+    PendingNotification.objects.filter(pk__in=[row.pk for row in rows], rating_count=0).delete()
+    NotificationDigest.objects.bulk_create(
+        NotificationDigest(recipient=user, rating_count=sum(row.rating_count for row in rows))
+        for user, rows in batch.items()
+    )
+    return sent
@@ -0,0 +1,164 @@
+# core/pagination.py
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination on (ordering field, id).
+
+    Each page is a ``WHERE (field, id) < (last value, last id) ORDER BY field, id
+    LIMIT n`` query, so it stays as cheap at page 1000 as at page 1 and never
+    runs COUNT(*) unless ``?count=true`` is passed. The ordering comes from the
+    view's ``get_cursor_ordering(request)`` hook, its OrderingFilter (first field
+    only) or ``default_ordering``; id breaks ties. Annotations such as a search
+    rank can be used as the ordering field.
+
+    Requests that pass the legacy ``?page=`` parameter are served by
+    PageNumberPagination so existing clients keep working.
+    """
+
+    default_ordering = "-created_at"
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.legacy = None
+        if "page" in request.query_params:
+            self.legacy = PageNumberPagination()
+            self.legacy.page_size = self.get_page_size(request)
+            return self.legacy.paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.field, self.descending = self.get_ordering(request, queryset, view)
+        self.count = queryset.count() if request.query_params.get(self.count_query_param) == "true" else None
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor["r"])
+        # Walking backwards flips the comparison and the ORDER BY, then flips the page back
+        descending = self.descending != reverse
+        prefix = "-" if descending else ""
+        queryset = queryset.order_by(f"{prefix}{self.field}", f"{prefix}pk")
+        if cursor:
+            op = "lt" if descending else "gt"
+            value = self.to_python(queryset, cursor["v"])
+            queryset = queryset.filter(
+                Q(**{f"{self.field}__{op}": value}) | Q(**{self.field: value, f"pk__{op}": cursor["id"]})
+            )
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not reverse else bool(cursor)
+        self.has_previous = bool(cursor) if not reverse else has_more
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.legacy:
+            return self.legacy.get_paginated_response(data)
+        body = OrderedDict()
+        if self.count is not None:
+            body["count"] = self.count
+        body["next"] = self.get_next_link()
+        body["previous"] = self.get_previous_link()
+        body["results"] = data
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "count": {"type": "integer", "description": "Only with ?count=true"},
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {"name": self.cursor_query_param, "required": False, "in": "query",
+             "description": "Opaque cursor from a previous next/previous link.", "schema": {"type": "string"}},
+            {"name": self.page_size_query_param, "required": False, "in": "query",
+             "description": "Number of results per page.", "schema": {"type": "integer"}},
+            {"name": self.count_query_param, "required": False, "in": "query",
+             "description": "Set to true to include the total count.", "schema": {"type": "boolean"}},
+        ]
+
+    # --- helpers ---
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, request, queryset, view):
+        hook = getattr(view, "get_cursor_ordering", None)
+        preferred = hook(request) if hook else None
+        ordering = [preferred] if preferred else None
+        if not ordering and view is not None and OrderingFilter in getattr(view, "filter_backends", []):
+            ordering = OrderingFilter().get_ordering(request, queryset, view)
+        field = (ordering or [getattr(view, "cursor_ordering", self.default_ordering)])[0]
+        return field.lstrip("-"), field.startswith("-")
+
+    def to_python(self, queryset, value):
+        try:
+            field = queryset.model._meta.get_field(self.field)
+        except FieldDoesNotExist:
+            field = queryset.query.annotations[self.field].output_field
+        try:
+            return field.to_python(value)
+        except (DjangoValidationError, TypeError, ValueError):  # tampered cursor, e.g. {"v": {}}
+            raise NotFound(self.invalid_cursor_message)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            return {"v": cursor["v"], "id": int(cursor["id"]), "r": bool(cursor.get("r"))}
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, reverse):
+        # Rows are model instances, or dicts when a view pages a values() queryset
+        value, pk = (row[self.field], row["id"]) if isinstance(row, dict) else (getattr(row, self.field), row.pk)
+        value = value.isoformat() if hasattr(value, "isoformat") else value
+        payload = json.dumps({"v": value, "id": pk, "r": int(reverse)}, separators=(",", ":"))
+        encoded = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
@@ -0,0 +1,77 @@
+# core/purge.py
+import time
+
+from django.core.cache import cache
+from django.db import connections, router, transaction
+
+from . import events, stats
+from .models import Rating
+
+STATE_KEY = "purge:ratings"
+# Long enough to survive a crashed worker until the next nightly run
+STATE_TTL = 60 * 60 * 24 * 7
+
+
+def _initial_state(before):
+    return {"before": before.isoformat(), "last_pk": 0, "deleted": 0, "batches": 0, "projects": []}
+
+
+def _delete_rows(using, pks):
+    # Plain SQL rather than QuerySet.delete(): no per-row post_delete signal,
+    # the stats are recomputed once at the end instead
+    connection = connections[using]
+    table, column = (connection.ops.quote_name(name) for name in (Rating._meta.db_table, Rating._meta.pk.column))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE {column} IN ({', '.join(['%s'] * len(pks))})", pks)
+
+
+def purge_ratings(before, batch_size=1000, resume=True, progress=None):
+    """Delete every Rating created before ``before`` in primary-key ordered chunks.
+
+    Each chunk is one ``SELECT pk, project_id ... WHERE pk > last LIMIT n`` plus
+    one raw ``DELETE ... WHERE pk IN (...)`` in its own transaction, so memory
+    and lock time stay bounded and no per-row post_delete signal fires. The
+    stats of every touched project are recomputed once at the end.
+
+    Progress (last pk, touched projects) is saved in the cache after each
+    chunk; an interrupted purge resumes from there with its original cutoff.
+    ``progress`` is called with the state dict after every chunk.
+    """
+    state = cache.get(STATE_KEY) if resume else None
+    if state is None:
+        state = _initial_state(before)
+    ratings = Rating.objects.filter(created_at__lt=state["before"])
+    using = router.db_for_write(Rating)
+    projects = set(state["projects"])
+    started = time.monotonic()
+
+    while True:
+        rows = list(ratings.filter(pk__gt=state["last_pk"]).order_by("pk").values_list("pk", "project_id")[:batch_size])
+        if not rows:
+            break
+        with transaction.atomic(using=using):
+            _delete_rows(using, [pk for pk, _ in rows])
+        projects.update(project_id for _, project_id in rows)
+        state.update(
+            last_pk=rows[-1][0],
+            deleted=state["deleted"] + len(rows),
+            batches=state["batches"] + 1,
+            projects=sorted(projects),
+        )
+        cache.set(STATE_KEY, state, STATE_TTL)
+        if progress:
+            progress(state)
+
+    for project_id in sorted(projects):
+        stats.recompute(project_id)
+    events.projects_changed(projects)
+    cache.delete(STATE_KEY)
+
+    elapsed = time.monotonic() - started
+    return {
+        "deleted": state["deleted"],
+        "batches": state["batches"],
+        "projects": len(projects),
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(state["deleted"] / elapsed) if elapsed else 0,
+    }
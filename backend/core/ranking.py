@@ -0,0 +1,97 @@
+# core/ranking.py
+"""Quality scores that stay stable when a project has few ratings.
+
+Each mode is a SQL expression over the project's running ``rating_count`` and
+``score_sum`` (or its CriteriaAggregate histograms) and is stored in its own
+indexed Project column. core/stats.py folds them into the UPDATE that shifts
+the counters, so no write rescans Rating. After changing RANKING settings run
+``manage.py reconcile_stats``.
+"""
+from django.conf import settings
+from django.db.models import F, FloatField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Floor, Greatest, Least, NullIf, Sqrt
+
+from .models import CriteriaAggregate
+
+DEFAULTS = {
+    "PRIOR_MEAN": 5.5,   # what a project with no evidence is assumed to score
+    "PRIOR_WEIGHT": 10,  # how many ratings that assumption is worth
+    "Z": 1.96,           # Wilson interval confidence (95%)
+    "TRIM": 0.1,         # share of ratings dropped at each end for the trimmed mean
+}
+MIN_SCORE, MAX_SCORE = 1, 10
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "RANKING", {})}
+
+
+def _float(expression):
+    return Cast(expression, FloatField())
+
+
+# --- MODES ---
+def bayesian(count, total, config):
+    """Mean pulled towards PRIOR_MEAN by PRIOR_WEIGHT phantom ratings."""
+    weight, prior = config["PRIOR_WEIGHT"], config["PRIOR_MEAN"]
+    return (Value(float(weight * prior)) + _float(total)) / (Value(float(weight)) + _float(count))
+
+
+def wilson(count, total, config):
+    """Lower bound of the Wilson interval on the mean, mapped back to the 1..10 scale.
+
+    The mean is treated as the share of the score range reached, so two hundred
+    9s beat a single 10.
+    """
+    z = config["Z"]
+    n = _float(count)
+    share = (_float(total) - n * Value(float(MIN_SCORE))) / (n * Value(float(MAX_SCORE - MIN_SCORE)))
+    spread = Value(z) * Sqrt(share * (Value(1.0) - share) / n + Value(z * z / 4) / (n * n))
+    lower = (share + Value(z * z / 2) / n - spread) / (Value(1.0) + Value(z * z) / n)
+    return Value(float(MIN_SCORE)) + Value(float(MAX_SCORE - MIN_SCORE)) * lower
+
+
+def _trimmed_sum(buckets, k, scores):
+    # Sum of the ``k`` ratings met first when walking ``scores`` in order
+    taken, seen = [], Value(0)
+    for score in scores:
+        count = buckets[score]
+        taken.append(Value(score) * Least(count, Greatest(k - seen, Value(0))))
+        seen = seen + count
+    return sum(taken[1:], taken[0])
+
+
+def trimmed(count, total, config):
+    """Mean after dropping the lowest and highest TRIM share of ratings.
+
+    Computed from the summed per-criteria histograms of the project, so it is
+    already up to date when the aggregates have been shifted.
+    """
+    scores = list(CriteriaAggregate.SCORES)
+    buckets = {score: F(f"h{score}") for score in scores}
+    n, k = F("n"), Floor(_float(F("n")) * Value(config["TRIM"]))
+    rows = (
+        CriteriaAggregate.objects.filter(project=OuterRef("pk"))
+        .values("project")
+        .annotate(n=Sum("rating_count"), total=Sum("score_sum"), **{f"h{s}": Sum(f"hist_{s}") for s in scores})
+        .annotate(value=(
+            _float(F("total") - _trimmed_sum(buckets, k, scores) - _trimmed_sum(buckets, k, reversed(scores)))
+            / _float(NullIf(n - Value(2) * k, Value(0)))
+        ))
+        .values("value")
+    )
+    return Subquery(rows, output_field=FloatField())
+
+
+# ?by= / ordering name -> (Project column, expression builder)
+RANKINGS = {
+    "bayesian": ("bayesian_score", bayesian),
+    "wilson": ("wilson_score", wilson),
+    "trimmed": ("trimmed_score", trimmed),
+}
+
+
+def expressions(count, total):
+    """{column: expression} for every mode, given the project's rating count and score sum."""
+    config = get_config()
+    return {column: build(count, total, config) for column, build in RANKINGS.values()}
@@ -0,0 +1,13 @@
+# core/redis_client.py
+import redis
+from django.conf import settings
+
+_client = None
+
+
+def get_redis():
+    """Shared client for the Redis instance Celery already uses (settings.REDIS_URL)."""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _client
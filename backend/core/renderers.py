@@ -0,0 +1,47 @@
+# core/renderers.py
+import re
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Same escaping JSONRenderer applies for JavaScript compatibility
+LINE_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+# Where orjson can spell a float differently from json.dumps: exponents
+# (1e16 vs 1e+16, 1e-7 vs 1e-07) and small fractions (0.000015 vs 1.5e-05).
+# Anchored on the separator before a value; the odd string that matches
+# only costs that response the slow path.
+FLOAT_SPELLINGS = re.compile(rb"[:,\[]-?(?:\d+(?:\.\d+)?e|0\.0000)")
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer backed by orjson, producing the same bytes for compact output.
+
+    Types orjson would format differently (datetimes, Decimals, lazy strings...)
+    are handed to DRF's encoder. Indented or ASCII-only output, values orjson
+    rejects and output that may hold a float in exponent notation fall back
+    to JSONRenderer.
+    """
+    options = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_SUBCLASS
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        if self.ensure_ascii or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=JSONEncoder().default, option=self.options)
+        except TypeError:
+            # e.g. integers beyond 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+        if FLOAT_SPELLINGS.search(ret):
+            return super().render(data, accepted_media_type, renderer_context)
+        for raw, escaped in LINE_SEPARATORS:
+            ret = ret.replace(raw, escaped)
+        return ret
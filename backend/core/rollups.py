@@ -0,0 +1,164 @@
+# core/rollups.py
+"""Hourly and daily counts behind the analytics API.
+
+:func:`run` only folds in rows added since the last run: rating scores
+changed through the scorecard, deleted rows and purged ratings are not
+subtracted, so the rollups drift from the source tables over time.
+:func:`rebuild` (run by ``manage.py reconcile_stats``) recounts them.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .models import (
+    CategoryRollup, Comment, CriteriaRollup, ProjectRollup, Rating, RollupWatermark, Vote,
+)
+
+# source name -> (model, Rollup counter it feeds)
+SOURCES = {
+    "votes": (Vote, "votes"),
+    "ratings": (Rating, "ratings"),
+    "comments": (Comment, "comments"),
+}
+PERIODS = ("hour", "day")
+# Rows younger than this are left for the next run, so transactions that
+# committed slightly out of id order are not skipped by the watermark.
+LAG = timedelta(seconds=60)
+
+
+def _buckets(hour):
+    return {"hour": hour, "day": hour.replace(hour=0)}
+
+
+# --- AGGREGATION ---
+def _collect(source, low, high):
+    """Group the rows of one id range by project and hour, and return the deltas
+    for every rollup table: {model: {key: {field: value}}}."""
+    model, counter = SOURCES[source]
+    fields = ["project_id", "project__category", "hour"]
+    if source == "ratings":
+        fields += ["criteria_id", "score"]
+    rows = (
+        model.objects.filter(pk__gt=low, pk__lte=high)
+        .annotate(hour=TruncHour("created_at"))
+        .values(*fields)
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+
+    deltas = defaultdict(lambda: defaultdict(Counter))
+    for row in rows:
+        for period, bucket in _buckets(row["hour"]).items():
+            project = deltas[ProjectRollup][(row["project_id"], period, bucket)]
+            category = deltas[CategoryRollup][(row["project__category"], period, bucket)]
+            for target in (project, category):
+                target[counter] += row["n"]
+            if source == "ratings":
+                project["score_sum"] += row["score"] * row["n"]
+                category["score_sum"] += row["score"] * row["n"]
+                criteria = deltas[CriteriaRollup][(row["project_id"], row["criteria_id"], period, bucket)]
+                criteria["ratings"] += row["n"]
+                criteria["score_sum"] += row["score"] * row["n"]
+                criteria[f"score:{row['score']}"] += row["n"]
+    return deltas
+
+
+KEYS = {
+    ProjectRollup: ("project_id", "period", "bucket"),
+    CategoryRollup: ("category", "period", "bucket"),
+    CriteriaRollup: ("project_id", "criteria_id", "period", "bucket"),
+}
+
+
+def _merge(model, deltas):
+    """Add ``deltas`` onto the existing rollup rows: one SELECT, one bulk UPDATE, one bulk INSERT."""
+    keys = KEYS[model]
+    lookup = {f"{name}__in": {key[i] for key in deltas} for i, name in enumerate(keys)}
+    existing = {tuple(getattr(row, name) for name in keys): row for row in model.objects.filter(**lookup)}
+
+    changed, created, fields = [], [], set()
+    for key, delta in deltas.items():
+        row = existing.get(key)
+        if row is None:
+            row = model(**dict(zip(keys, key)))
+            created.append(row)
+        else:
+            changed.append(row)
+        for name, value in delta.items():
+            if name.startswith("score:"):
+                score = name.split(":", 1)[1]
+                row.distribution[score] = row.distribution.get(score, 0) + value
+                fields.add("distribution")
+            else:
+                setattr(row, name, getattr(row, name) + value)
+                fields.add(name)
+    if changed:
+        model.objects.bulk_update(changed, sorted(fields))
+    if created:
+        model.objects.bulk_create(created)
+
+
+# --- RUN ---
+def process(source, batch_size=5000, now=None):
+    """Fold the rows of ``source`` added since its watermark into the rollups.
+
+    Works in id-range chunks; each chunk is aggregated with GROUP BY in the
+    database and merged in one transaction together with the new watermark, so
+    a crash never counts a row twice. Returns the number of rows processed.
+    """
+    model, _ = SOURCES[source]
+    cutoff = (now or timezone.now()) - LAG
+    RollupWatermark.objects.get_or_create(source=source)
+    processed = 0
+    while True:
+        with transaction.atomic():
+            # The row lock also keeps two concurrent runs from double counting
+            mark = RollupWatermark.objects.select_for_update().get(source=source)
+            rows = list(
+                model.objects.filter(pk__gt=mark.last_id).order_by("pk").values_list("pk", "created_at")[:batch_size]
+            )
+            ready = []
+            for pk, created_at in rows:
+                if created_at >= cutoff:  # stop at the first row that is still too recent
+                    break
+                ready.append(pk)
+            if not ready:
+                return processed
+            for target, deltas in _collect(source, mark.last_id, ready[-1]).items():
+                _merge(target, deltas)
+            mark.last_id = ready[-1]
+            mark.save(update_fields=["last_id", "updated_at"])
+        processed += len(ready)
+        if len(ready) < batch_size:
+            return processed
+
+
+def run(batch_size=5000, now=None):
+    return {source: process(source, batch_size, now) for source in SOURCES}
+
+
+def rebuild(batch_size=5000):
+    """Recount every rollup from the source tables, up to the current watermarks.
+
+    Holds the watermark locks for the whole rebuild, so :func:`process` waits
+    for it instead of adding to half-built rows. Returns the rows recounted
+    per source.
+    """
+    for source in SOURCES:
+        RollupWatermark.objects.get_or_create(source=source)
+    counts = {}
+    with transaction.atomic():
+        marks = {mark.source: mark for mark in RollupWatermark.objects.select_for_update().filter(source__in=SOURCES)}
+        for target in KEYS:
+            target.objects.all().delete()
+        for source, (model, _) in SOURCES.items():
+            last_id = marks[source].last_id
+            counts[source] = model.objects.filter(pk__lte=last_id).count()
+            for low in range(0, last_id, batch_size):
+                for target, deltas in _collect(source, low, min(low + batch_size, last_id)).items():
+                    _merge(target, deltas)
+    return counts
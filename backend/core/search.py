@@ -0,0 +1,63 @@
+# core/search.py
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import connections
+from django.db.models import Case, Exists, F, FloatField, Q, Value, When
+from django.db.models.functions import Cast
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+SEARCH_PARAM = "search"
+SEARCH_CONFIG = "english"
+MAX_TERMS = 10
+# Annotation holding the relevance of each hit; KeysetPagination pages on it
+RANK = "search_rank"
+
+
+def query_from(request):
+    return request.query_params.get(SEARCH_PARAM, "").strip()
+
+
+def search(queryset, query):
+    """Filter ``queryset`` to projects matching ``query`` and annotate ``search_rank``.
+
+    On PostgreSQL this uses the trigger-maintained ``search_vector`` (GIN
+    index, name weighted above description); pg_trgm similarity on the name
+    boosts the rank of those hits and, only when there are none, finds
+    projects by name despite typos. Other databases fall back to
+    case-insensitive substring matching of every term.
+    """
+    if connections[queryset.db].vendor == "postgresql":
+        terms = SearchQuery(query, search_type="websearch", config=SEARCH_CONFIG)
+        rank = SearchRank(F("search_vector"), terms) + TrigramSimilarity("name", query)
+        matches = Q(search_vector=terms)
+        # One uncorrelated subquery, evaluated once, rather than a second round trip
+        typo = ~Exists(queryset.filter(matches)) & Q(name__trigram_similar=query)
+        queryset = queryset.filter(matches | typo)
+    else:
+        terms = query.split()[:MAX_TERMS]
+        rank = Value(0.0)
+        for term in terms:
+            queryset = queryset.filter(Q(name__icontains=term) | Q(description__icontains=term))
+            rank = rank + Case(When(name__icontains=term, then=Value(2.0)), default=Value(0.0)) \
+                + Case(When(description__icontains=term, then=Value(1.0)), default=Value(0.0))
+    return queryset.annotate(**{RANK: Cast(rank, FloatField())})
+
+
+class ProjectSearchFilter(BaseFilterBackend):
+    """``?search=`` full-text search, ordered by relevance unless ``?ordering=`` is given."""
+
+    def filter_queryset(self, request, queryset, view):
+        query = query_from(request)
+        if not query:
+            return queryset
+        queryset = search(queryset, query)
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by(f"-{RANK}", "-pk")
+        return queryset
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            "name": SEARCH_PARAM, "required": False, "in": "query",
+            "description": "Full-text search over name and description, best match first.",
+            "schema": {"type": "string"},
+        }]
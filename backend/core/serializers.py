@@ -1,47 +1,194 @@
 from rest_framework import serializers
-from .models import Project, ProjectImage, Criteria, Vote, Rating, Comment
+from .models import Project, ProjectImage, Criteria, CriteriaAggregate, Vote, Rating, Comment
+from .fieldsets import SparseFieldsetMixin
+from . import catalogue, images as image_variants
 
 class ProjectImageSerializer(serializers.ModelSerializer):
+    # Resized copies, filled in after upload (see core/images.py)
+    variants = serializers.SerializerMethodField()
+
     class Meta:
         model = ProjectImage
-        fields = ["id", "image", "caption", "order"]
+        fields = ["id", "image", "caption", "order", "status", "width", "height", "variants"]
+        read_only_fields = ["status", "width", "height"]
+
+    def get_variants(self, obj):
+        return image_variants.variant_urls(obj.variants, self.context.get("request"))
 
 class CriteriaSerializer(serializers.ModelSerializer):
     class Meta:
         model = Criteria
         fields = ["id", "name", "description", "weight"]
 
+class CatalogueCriteriaField(serializers.PrimaryKeyRelatedField):
+    """Criteria by id, looked up in the per-process registry (core/catalogue.py) instead of a query."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            criteria = catalogue.get(int(data))
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if criteria is None:
+            self.fail("does_not_exist", pk_value=data)
+        return criteria
+
 class RatingSerializer(serializers.ModelSerializer):
-    # We simplify this to avoid circular import or context errors for now
+    criteria = CatalogueCriteriaField(queryset=Criteria.objects.all())
+
     class Meta:
         model = Rating
         fields = ["id", "criteria", "score", "created_at"]
         read_only_fields = ["created_at"]
 
+    def validate(self, attrs):
+        # The view passes the project on create; updates keep their own
+        project = self.context.get("project") or getattr(self.instance, "project", None)
+        criteria = attrs.get("criteria") or getattr(self.instance, "criteria", None)
+        if project is not None and criteria is not None and criteria.project_category != project.category:
+            raise serializers.ValidationError(
+                {"criteria": f"Criteria {criteria.pk} does not belong to the '{project.category}' category."}
+            )
+        request = self.context.get("request")
+        if self.instance is None and project is not None and criteria is not None and request is not None:
+            # One indexed EXISTS; the unique constraint still backs it up under races
+            if Rating.objects.filter(user=request.user, project=project, criteria=criteria).exists():
+                raise serializers.ValidationError(
+                    {"criteria": "You have already rated this criteria; use the scorecard to change it."}
+                )
+        return attrs
+
+class ScoreEntrySerializer(serializers.Serializer):
+    criteria = serializers.IntegerField()
+    score = serializers.IntegerField(min_value=1, max_value=10)
+
+class ScorecardSerializer(serializers.Serializer):
+    # One judge's scores for several criteria of the project in context["project"]
+    scores = ScoreEntrySerializer(many=True, allow_empty=False)
+
+    def validate_scores(self, scores):
+        ids = [entry["criteria"] for entry in scores]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Each criteria can only be scored once.")
+
+        project = self.context["project"]
+        valid = {criteria.pk for criteria in catalogue.for_category(project.category)}
+        invalid = sorted(set(ids) - valid)
+        if invalid:
+            raise serializers.ValidationError(
+                f"Criteria {invalid} do not belong to the '{project.category}' category."
+            )
+        return scores
+
 class CommentSerializer(serializers.ModelSerializer):
     user = serializers.StringRelatedField(read_only=True)
-    
+    parent = serializers.PrimaryKeyRelatedField(queryset=Comment.objects.all(), required=False, allow_null=True)
+
     class Meta:
         model = Comment
-        fields = ["id", "user", "content", "created_at"]
+        fields = ["id", "user", "content", "parent", "depth", "created_at"]
+        read_only_fields = ["depth"]
+
+    def validate_parent(self, parent):
+        if self.instance is not None:
+            # path/root/depth are built on insert only: comments can't be moved
+            if parent != self.instance.parent:
+                raise serializers.ValidationError("The parent of an existing comment cannot be changed.")
+            return parent
+        view = self.context.get("view")
+        if parent is None or view is None:
+            return parent
+        if str(parent.project_id) != str(view.kwargs.get("project_pk")):
+            raise serializers.ValidationError("Parent comment belongs to another project.")
+        if parent.depth >= Comment.MAX_DEPTH:
+            raise serializers.ValidationError("This thread is nested too deeply.")
+        return parent
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     # We rename this to 'ProjectSerializer' to match your Views
     creator = serializers.StringRelatedField()
     has_voted = serializers.SerializerMethodField()
-    images = ProjectImageSerializer(many=True, read_only=True)
+    # Lists only carry the primary image's thumbnail; ?expand=images adds them all
+    thumbnail = serializers.SerializerMethodField()
 
     class Meta:
         model = Project
         fields = [
             "id", "name", "description", "category",
             "creator", "status", "vote_count", 
-            "has_voted", "images", "created_at"
+            "has_voted", "thumbnail", "created_at"
         ]
+        expandable_fields = {"images": lambda: ProjectImageSerializer(many=True, read_only=True)}
+        # What each field reads, for ?fields= (see core/fieldsets.py)
+        field_sources = {
+            "creator": ["creator__email"],
+            "has_voted": [],
+            "thumbnail": ["prefetch:images"],
+            "images": ["prefetch:images"],
+        }
+
+    def get_thumbnail(self, obj):
+        primary = next(iter(obj.images.all()), None)
+        if primary is None:
+            return None
+        return image_variants.thumbnail(
+            primary.image.name, primary.variants, primary.width, primary.height, self.context.get("request")
+        )
 
     def get_has_voted(self, obj):
+        # The viewset resolves this for the whole page at once (see core/user_flags.py)
+        flags = self.context.get("user_flags")
+        if flags is not None:
+            return obj.pk in flags["has_voted"]
+
         # This safely checks if the user voted, handling anonymous users too
         request = self.context.get("request")
         if request and request.user.is_authenticated:
             return obj.votes.filter(user=request.user).exists()
         return False
+
+
+class ProjectCompactSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Flat, column-only listing row for large lists, leaderboards and search suggestions
+    (``?view=compact``). Images can still be added with ``?expand=images``."""
+
+    class Meta:
+        model = Project
+        fields = ["id", "name", "category", "vote_count", "average_score", "weighted_score"]
+        expandable_fields = {"images": lambda: ProjectImageSerializer(many=True, read_only=True)}
+        field_sources = {"images": ["prefetch:images"]}
+
+
+class CriteriaBreakdownSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source="criteria_id")
+    name = serializers.CharField(source="criteria.name")
+    weight = serializers.IntegerField(source="criteria.weight")
+    average = serializers.FloatField()
+
+    class Meta:
+        model = CriteriaAggregate
+        fields = ["id", "name", "weight", "average", "rating_count"]
+
+
+class ProjectDetailSerializer(ProjectSerializer):
+    images = ProjectImageSerializer(many=True, read_only=True)
+    # Per-criteria scores come from the precomputed aggregates, not from Rating
+    criteria_breakdown = CriteriaBreakdownSerializer(source="criteria_aggregates", many=True, read_only=True)
+
+    class Meta(ProjectSerializer.Meta):
+        fields = ProjectSerializer.Meta.fields + [
+            "images", "rating_count", "average_score", "weighted_score", "criteria_breakdown"
+        ]
+
+
+class RollupBucketSerializer(serializers.Serializer):
+    """One ProjectRollup/CategoryRollup bucket."""
+    bucket = serializers.DateTimeField()
+    votes = serializers.IntegerField()
+    ratings = serializers.IntegerField()
+    average_score = serializers.SerializerMethodField()
+    comments = serializers.IntegerField()
+
+    def get_average_score(self, obj):
+        return round(obj.score_sum / obj.ratings, 2) if obj.ratings else None
@@ -0,0 +1,362 @@
+# core/stats.py
+from collections import Counter
+from itertools import islice
+
+import numpy as np
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    Avg, Case, Count, DecimalField, ExpressionWrapper, F, FloatField, OuterRef, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Cast, Coalesce, NullIf, Round
+from django.db.models.lookups import GreaterThan
+
+from . import ranking
+from .models import CriteriaAggregate, Project, Rating, Vote
+
+
+# --- EXPRESSIONS ---
+def _round2(expression):
+    # Round as numeric: PostgreSQL has no ROUND(double precision, int)
+    return Round(Cast(expression, DecimalField(max_digits=14, decimal_places=4)), 2)
+
+
+# Computed inside the UPDATE from the *old* column values plus the delta, so the
+# counters and the average are always written together in one statement.
+def _average_expression(count_delta, score_delta):
+    count = F("rating_count") + Value(count_delta)
+    total = F("score_sum") + Value(score_delta)
+    average = _round2(Cast(total, FloatField()) / NullIf(count, Value(0)))
+    return Coalesce(average, Value(0.0), output_field=FloatField())
+
+
+def _weighted_expression():
+    """sum(weight * criteria average) / sum(weight), read from CriteriaAggregate.
+
+    Only criteria that have ratings take part. NULL when nothing is rated.
+    """
+    weight = F("criteria__weight")
+    weighted = (
+        CriteriaAggregate.objects.filter(project=OuterRef("pk"), rating_count__gt=0)
+        .values("project")
+        .annotate(
+            value=Sum(
+                ExpressionWrapper(
+                    weight * Cast("score_sum", FloatField()) / F("rating_count"),
+                    output_field=FloatField(),
+                )
+            )
+            / Cast(NullIf(Sum(weight), Value(0)), FloatField())
+        )
+        .values("value")
+    )
+    return _round2(Subquery(weighted, output_field=FloatField()))
+
+
+def _ranking_expressions(count, total):
+    """Every core.ranking score for the given (post-delta) rating count and sum; 0 when unrated."""
+    return {
+        column: Case(
+            When(GreaterThan(count, 0), then=Coalesce(_round2(expression), Value(0.0))),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+        for column, expression in ranking.expressions(count, total).items()
+    }
+
+
+# --- INCREMENTAL DELTAS ---
+def apply_vote_delta(project_id, delta):
+    """Atomically shift vote_count. Falls back to a recompute on drift."""
+    qs = Project.objects.filter(pk=project_id)
+    if delta < 0:
+        qs = qs.filter(vote_count__gte=-delta)
+    if not qs.update(vote_count=F("vote_count") + delta):
+        recompute(project_id)
+
+
+def _apply_criteria_delta(project_id, criteria_id, count_delta, score_delta, histogram):
+    updated = CriteriaAggregate.objects.filter(project_id=project_id, criteria_id=criteria_id).update(
+        rating_count=F("rating_count") + count_delta,
+        score_sum=F("score_sum") + score_delta,
+        **{f"hist_{score}": F(f"hist_{score}") + delta for score, delta in histogram.items() if delta},
+    )
+    if updated or count_delta <= 0:
+        # A missing row on a decrement means it was cascade-deleted with its criteria
+        return
+    try:
+        with transaction.atomic():
+            CriteriaAggregate.objects.create(
+                project_id=project_id, criteria_id=criteria_id,
+                rating_count=count_delta, score_sum=score_delta,
+                **{f"hist_{score}": delta for score, delta in histogram.items()},
+            )
+    except IntegrityError:
+        # Lost the race against a concurrent first rating
+        _apply_criteria_delta(project_id, criteria_id, count_delta, score_delta, histogram)
+
+
+def _apply_project_delta(project_id, count_delta, score_delta):
+    qs = Project.objects.filter(pk=project_id)
+    if count_delta < 0:
+        qs = qs.filter(rating_count__gte=-count_delta)
+    if score_delta < 0:
+        qs = qs.filter(score_sum__gte=-score_delta)
+    updated = qs.update(
+        rating_count=F("rating_count") + count_delta,
+        score_sum=F("score_sum") + score_delta,
+        average_score=_average_expression(count_delta, score_delta),
+        weighted_score=_weighted_expression(),
+        **_ranking_expressions(F("rating_count") + Value(count_delta), F("score_sum") + Value(score_delta)),
+    )
+    if not updated:
+        recompute(project_id)
+
+
+def apply_rating_delta(project_id, criteria_id, count_delta, score_delta, histogram=None):
+    """Atomically shift the criteria aggregate (``histogram`` is {score: count delta})
+    and the project's rating_count/score_sum, then refresh average_score and
+    weighted_score in the same UPDATE."""
+    _apply_criteria_delta(project_id, criteria_id, count_delta, score_delta, histogram or {})
+    _apply_project_delta(project_id, count_delta, score_delta)
+
+
+def apply_rating_batch(project_id, deltas):
+    """Apply {criteria_id: (count_delta, score_delta, {score: count delta})} for one
+    project in a fixed number of statements, whatever the number of criteria."""
+    deltas = {pk: delta for pk, delta in deltas.items() if delta[:2] != (0, 0)}
+    if not deltas:
+        return
+    # Make sure every aggregate row exists, then shift them all in one UPDATE
+    CriteriaAggregate.objects.bulk_create(
+        [CriteriaAggregate(project_id=project_id, criteria_id=pk) for pk in deltas],
+        ignore_conflicts=True,
+    )
+
+    def shift(value):
+        whens = [When(criteria_id=pk, then=Value(value(delta))) for pk, delta in deltas.items() if value(delta)]
+        return Case(*whens, default=Value(0))
+
+    scores = {score for _, _, histogram in deltas.values() for score, delta in histogram.items() if delta}
+    CriteriaAggregate.objects.filter(project_id=project_id, criteria_id__in=deltas).update(
+        rating_count=F("rating_count") + shift(lambda delta: delta[0]),
+        score_sum=F("score_sum") + shift(lambda delta: delta[1]),
+        **{
+            f"hist_{score}": F(f"hist_{score}") + shift(lambda delta, score=score: delta[2].get(score, 0))
+            for score in scores
+        },
+    )
+    _apply_project_delta(
+        project_id,
+        sum(delta[0] for delta in deltas.values()),
+        sum(delta[1] for delta in deltas.values()),
+    )
+
+
+def histogram_change(before, after):
+    """{score: count delta} for one rating going from score ``before`` to ``after`` (None = no rating)."""
+    change = Counter()
+    if before:
+        change[before] -= 1
+    if after:
+        change[after] += 1
+    return {score: delta for score, delta in change.items() if delta}
+
+
+def apply_rating_change(before, after):
+    """Apply the move from ``before`` to ``after``, each a (project_id, criteria_id, score)
+    tuple or None for "no rating"."""
+    if before == after:
+        return
+    if before and after and before[:2] == after[:2]:
+        apply_rating_delta(after[0], after[1], 0, after[2] - before[2], histogram_change(before[2], after[2]))
+        return
+    if before:
+        apply_rating_delta(before[0], before[1], -1, -before[2], histogram_change(before[2], None))
+    if after:
+        apply_rating_delta(after[0], after[1], 1, after[2], histogram_change(None, after[2]))
+
+
+# --- FULL RECOMPUTE ---
+def _merge_histograms(pairs, counts):
+    """Sum the rows of ``counts`` that share the same (project, criteria) pair."""
+    unique, index = np.unique(pairs, axis=0, return_inverse=True)
+    merged = np.zeros((len(unique), 10), dtype=np.int64)
+    np.add.at(merged, index.ravel(), counts)
+    return unique, merged
+
+
+def score_histograms(ratings, chunk_size=100_000):
+    """Count scores per (project, criteria) over ``ratings`` in one streaming pass.
+
+    Returns (pairs, counts): an (n, 2) array of project/criteria ids and an
+    (n, 10) array with the number of ratings per score. Each chunk is reduced
+    on arrival, so memory grows with the number of pairs, not of ratings.
+    """
+    rows = ratings.order_by().values_list("project_id", "criteria_id", "score").iterator(chunk_size=chunk_size)
+    partial_pairs, partial_counts = [np.empty((0, 2), dtype=np.int64)], [np.empty((0, 10), dtype=np.int64)]
+    while chunk := list(islice(rows, chunk_size)):
+        data = np.array(chunk, dtype=np.int64)
+        pairs, index = np.unique(data[:, :2], axis=0, return_inverse=True)
+        # One flat bincount over (pair, score) cells instead of a loop per pair
+        cells = index.ravel() * 10 + (data[:, 2] - 1)
+        partial_pairs.append(pairs)
+        partial_counts.append(np.bincount(cells, minlength=len(pairs) * 10).reshape(len(pairs), 10))
+    return _merge_histograms(np.concatenate(partial_pairs), np.concatenate(partial_counts))
+
+
+def rebuild_criteria_aggregates(project_ids=None, batch_size=1000):
+    """Recreate CriteriaAggregate rows from Rating (all projects when project_ids is None).
+
+    Counts, sums and histograms all come from the score histograms: the sum is
+    the histogram dotted with the scores 1..10.
+    """
+    aggregates = CriteriaAggregate.objects.all()
+    ratings = Rating.objects.all()
+    if project_ids is not None:
+        aggregates = aggregates.filter(project_id__in=project_ids)
+        ratings = ratings.filter(project_id__in=project_ids)
+
+    with transaction.atomic():
+        aggregates.delete()
+        CriteriaAggregate.objects.bulk_create(
+            (
+                CriteriaAggregate(project_id=project_id, criteria_id=criteria_id, **fields)
+                for (project_id, criteria_id), fields in _expected_aggregates(ratings)
+            ),
+            batch_size=batch_size,
+        )
+
+
+def _expected_aggregates(ratings):
+    """Yield ((project_id, criteria_id), {field: value}) for every pair rated in ``ratings``."""
+    pairs, counts = score_histograms(ratings)
+    totals = counts @ np.arange(1, 11)
+    rating_counts = counts.sum(axis=1)
+    for (project_id, criteria_id), total, count, histogram in zip(pairs, totals, rating_counts, counts):
+        yield (int(project_id), int(criteria_id)), {
+            "score_sum": int(total), "rating_count": int(count),
+            **dict(zip(CriteriaAggregate.HISTOGRAM_FIELDS, histogram.tolist())),
+        }
+
+
+def _repair_criteria_aggregates(project_id):
+    """Bring one project's CriteriaAggregate rows in line with Rating, writing only the drifted ones.
+
+    Rows that are already right are left alone, so concurrent deltas to them
+    are not lost to a delete-and-reinsert.
+    """
+    existing = {row.criteria_id: row for row in CriteriaAggregate.objects.filter(project_id=project_id)}
+    changed, created, names = [], [], ["score_sum", "rating_count", *CriteriaAggregate.HISTOGRAM_FIELDS]
+    for (_, criteria_id), fields in _expected_aggregates(Rating.objects.filter(project_id=project_id)):
+        row = existing.pop(criteria_id, None)
+        if row is None:
+            created.append(CriteriaAggregate(project_id=project_id, criteria_id=criteria_id, **fields))
+        elif any(getattr(row, name) != fields[name] for name in names):
+            for name in names:
+                setattr(row, name, fields[name])
+            changed.append(row)
+    if existing:  # no ratings left for these criteria
+        CriteriaAggregate.objects.filter(pk__in=[row.pk for row in existing.values()]).delete()
+    if changed:
+        CriteriaAggregate.objects.bulk_update(changed, names)
+    if created:
+        CriteriaAggregate.objects.bulk_create(created)
+
+
+def refresh_weighted_scores(queryset=None):
+    """Recompute weighted_score and the ranking scores from the aggregates with a single UPDATE."""
+    queryset = Project.objects.all() if queryset is None else queryset
+    return queryset.update(
+        weighted_score=_weighted_expression(),
+        **_ranking_expressions(F("rating_count"), F("score_sum")),
+    )
+
+
+def rescore_categories(categories):
+    """Re-score every project of the given categories, e.g. after a Criteria weight change."""
+    from . import events
+
+    projects = Project.objects.filter(category__in=categories)
+    refresh_weighted_scores(projects)
+    events.projects_changed(projects.values_list("pk", flat=True))
+
+
+def _buffered_votes():
+    # Net votes still in the buffer (core/vote_buffer.py); its next flush adds them
+    from . import vote_buffer
+
+    return vote_buffer.get_buffer().pending() if vote_buffer.is_enabled() else {}
+
+
+def recompute(project_id):
+    """Rebuild the cached stats of one project from the Vote/Rating tables.
+
+    Runs under a lock on the project row, so two recomputes of the same
+    project (or one and a scorecard save) do not interleave.
+    """
+    with transaction.atomic():
+        if not Project.objects.select_for_update().filter(pk=project_id).exists():
+            return
+        agg = Rating.objects.filter(project_id=project_id).aggregate(
+            avg=Avg("score"), count=Count("id"), total=Sum("score")
+        )
+        # Leave the buffered votes to the flush, or they would be counted twice
+        votes = Vote.objects.filter(project_id=project_id).count() - _buffered_votes().get(project_id, 0)
+        _repair_criteria_aggregates(project_id)
+        Project.objects.filter(pk=project_id).update(
+            average_score=round(agg["avg"] or 0, 2),
+            rating_count=agg["count"] or 0,
+            score_sum=agg["total"] or 0,
+            vote_count=max(votes, 0),
+            weighted_score=_weighted_expression(),
+            **_ranking_expressions(Value(agg["count"] or 0), Value(agg["total"] or 0)),
+        )
+
+
+def find_drift(queryset=None):
+    """Yield (project, expected) for every project whose cached stats are stale."""
+    queryset = Project.objects.all() if queryset is None else queryset
+    votes = dict(Vote.objects.values_list("project_id").annotate(n=Count("id")).order_by())
+    buffered = _buffered_votes()
+    ratings = {
+        row["project_id"]: row
+        for row in Rating.objects.values("project_id")
+        .annotate(count=Count("id"), total=Sum("score"), avg=Avg("score"))
+        .order_by()
+    }
+
+    fields = ("id", "vote_count", "rating_count", "score_sum", "average_score")
+    for project in queryset.only(*fields).order_by("pk").iterator():
+        row = ratings.get(project.pk, {})
+        expected = {
+            "vote_count": max(votes.get(project.pk, 0) - buffered.get(project.pk, 0), 0),
+            "rating_count": row.get("count", 0),
+            "score_sum": row.get("total") or 0,
+            "average_score": round(row.get("avg") or 0, 2),
+        }
+        current = {name: getattr(project, name) for name in expected}
+        current["average_score"] = current["average_score"] or 0  # unrated projects start at NULL
+        if current != expected:
+            yield project, expected
+
+
+def reconcile(queryset=None, dry_run=False, batch_size=500):
+    """Correct every drifted project with bulk updates and rebuild the per-criteria
+    aggregates and weighted scores. Returns the number of projects whose counters drifted."""
+    stale = []
+    for project, expected in find_drift(queryset):
+        for name, value in expected.items():
+            setattr(project, name, value)
+        stale.append(project)
+
+    if stale and not dry_run:
+        Project.objects.bulk_update(
+            stale,
+            ["vote_count", "rating_count", "score_sum", "average_score"],
+            batch_size=batch_size,
+        )
+    if not dry_run:
+        scope = None if queryset is None else list(queryset.values_list("pk", flat=True))
+        rebuild_criteria_aggregates(scope)
+        refresh_weighted_scores(queryset)
+    return len(stale)
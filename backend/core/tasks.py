@@ -1,7 +1,12 @@
 from celery import shared_task
+from celery.signals import task_postrun, task_prerun
 from django.core.mail import send_mail
 from django.utils import timezone
-from .models import Rating  
+from . import images, metrics, notifications, purge, rollups, vote_buffer
+
+# Run time of every task below, exported at /metrics
+task_prerun.connect(metrics.task_started, weak=False)
+task_postrun.connect(metrics.task_finished, weak=False)
 
 
 @shared_task
@@ -16,8 +21,45 @@ def send_rating_email(to_email, project_name):
 
 
 @shared_task
-def cleanup_old_ratings():
-    
+def send_rating_digests():
+    if not notifications.is_enabled():
+        return "Notifications disabled."
+    count = notifications.send_digests()
+    return f"Sent {count} rating digests."
+
+
+@shared_task
+def cleanup_old_ratings(batch_size=1000):
     one_week_ago = timezone.now() - timezone.timedelta(days=7)
-    count, _ = Rating.objects.filter(created_at__lt=one_week_ago).delete()
-    return f"Deleted {count} old ratings."
\ No newline at end of file
+    result = purge.purge_ratings(one_week_ago, batch_size=batch_size)
+    return (
+        f"Deleted {result['deleted']} old ratings in {result['batches']} batches "
+        f"({result['rows_per_second']} rows/s), recalculated {result['projects']} projects."
+    )
+
+
+@shared_task
+def flush_vote_buffer():
+    if not vote_buffer.is_enabled():
+        return "Vote buffer disabled."
+    count = vote_buffer.flush()
+    return f"Flushed votes for {count} projects."
+
+
+@shared_task
+def update_rollups():
+    counts = rollups.run()
+    return "Rolled up " + ", ".join(f"{count} {source}" for source, count in counts.items()) + "."
+
+
+@shared_task(bind=True, max_retries=3)
+def process_project_image(self, image_id):
+    try:
+        status = images.process(image_id)
+    except OSError as exc:
+        # Storage hiccup: try again with backoff, then give up on the image
+        if self.request.retries >= self.max_retries:
+            images.mark_failed(image_id)
+            raise
+        raise self.retry(exc=exc, countdown=10 * 2 ** self.request.retries)
+    return f"Image {image_id}: {status}."
@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from core.models import Project, Vote
+
+User = get_user_model()
+
+class AsyncVoteTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', email='alice@test.com', password='pass123')
+        self.project = Project.objects.create(name="Polling App", status="published")
+        self.url = f'/api/projects/{self.project.id}/vote-async/'
+        self.auth = {"headers": {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}}
+
+    async def test_vote_once(self):
+        res = await self.async_client.post(self.url, **self.auth)
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.json(), {"detail": "Voted successfully"})
+
+        res = await self.async_client.post(self.url, **self.auth)
+        self.assertEqual(res.status_code, 400)
+
+        project = await Project.objects.aget(pk=self.project.pk)
+        self.assertEqual(project.vote_count, 1)
+        self.assertEqual(await Vote.objects.filter(project=self.project).acount(), 1)
+
+    async def test_requires_valid_token(self):
+        res = await self.async_client.post(self.url)
+        self.assertEqual(res.status_code, 401)
+        res = await self.async_client.post(self.url, headers={"Authorization": "Bearer nope"})
+        self.assertEqual(res.status_code, 401)
+
+    async def test_unknown_or_unpublished_project(self):
+        draft = await Project.objects.acreate(name="Draft")
+        res = await self.async_client.post(f'/api/projects/{draft.id}/vote-async/', **self.auth)
+        self.assertEqual(res.status_code, 404)
+
+    async def test_only_post_is_allowed(self):
+        res = await self.async_client.get(self.url, **self.auth)
+        self.assertEqual(res.status_code, 405)
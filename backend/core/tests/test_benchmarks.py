@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from core import stats
+from core.models import Comment, Project, Rating, Vote
+
+User = get_user_model()
+
+class SeedCohortTest(TestCase):
+    def seed(self, **options):
+        options = {"users": 20, "projects": 10, "criteria": 2, "votes": 150, "scorecards": 40,
+                   "comments": 30, "stdout": StringIO(), **options}
+        call_command("seed_cohort", **options)
+
+    def test_cohort_is_consistent(self):
+        self.seed()
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(set(Project.objects.values_list("category", flat=True)),
+                         {choice for choice, _ in Project.CATEGORY_CHOICES})
+        self.assertEqual(Vote.objects.count(), 150)
+        self.assertEqual(Rating.objects.count(), 80)
+        self.assertEqual(Comment.objects.count(), 30)
+        self.assertFalse(Comment.objects.filter(path="").exists())
+        reply = Comment.objects.filter(depth=1).first()
+        self.assertTrue(reply.path.startswith(reply.parent.path + "."))
+        # Counters were rebuilt after the bulk inserts
+        self.assertEqual(list(stats.find_drift()), [])
+
+    def test_same_seed_same_cohort_and_clear(self):
+        self.seed()
+        first = sorted(Rating.objects.values_list("user__username", "project__name", "score"))
+        with self.assertRaises(CommandError):
+            self.seed()
+        self.seed(clear=True)
+        self.assertEqual(sorted(Rating.objects.values_list("user__username", "project__name", "score")), first)
+
+    def test_rejects_more_pairs_than_possible(self):
+        with self.assertRaises(CommandError):
+            self.seed(votes=201)
+
+
+class RunBenchmarksTest(TestCase):
+    def test_report_baseline_and_compare(self):
+        call_command("seed_cohort", users=10, projects=5, criteria=2, votes=20, scorecards=10,
+                     comments=10, stdout=StringIO())
+        users = User.objects.count()
+        votes = Vote.objects.count()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "baseline.json")
+            call_command("run_benchmarks", requests=3, warmup=1, output=path, stdout=StringIO())
+            with open(path) as fh:
+                report = json.load(fh)
+            self.assertEqual(set(report["endpoints"]), {"list", "detail", "top", "vote", "rating", "comment"})
+            for row in report["endpoints"].values():
+                self.assertEqual(row["requests"], 3)
+                self.assertGreater(row["queries_mean"], 0)
+                self.assertLessEqual(row["p50_ms"], row["p99_ms"])
+            self.assertEqual(report["endpoints"]["vote"]["statuses"], {"201": 3})
+
+            out = StringIO()
+            call_command("run_benchmarks", requests=3, warmup=0, endpoint=["list"], compare=path,
+                         tolerance=1000, stdout=out)
+            self.assertIn("No regressions.", out.getvalue())
+
+            # Metrics missing from the baseline are reported, not compared
+            del report["endpoints"]["list"]["p95_ms"]
+            report["endpoints"]["list"]["queries_mean"] = None
+            with open(path, "w") as fh:
+                json.dump(report, fh)
+            out = StringIO()
+            call_command("run_benchmarks", requests=3, warmup=0, endpoint=["list"], compare=path,
+                         tolerance=1000, stdout=out)
+            self.assertIn("p95_ms (not in baseline)", out.getvalue())
+            self.assertIn("queries_mean (not in baseline)", out.getvalue())
+            self.assertIn("No regressions.", out.getvalue())
+        # The benchmark users and everything they wrote are gone, stats included
+        self.assertEqual((User.objects.count(), Vote.objects.count()), (users, votes))
+        self.assertEqual(list(stats.find_drift()), [])
@@ -0,0 +1,95 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APITestCase
+from core import caching
+
+User = get_user_model()
+
+class ReadThroughCacheTest(TestCase):
+    def setUp(self):
+        caching.flush_metrics()
+        cache.clear()
+        self.namespace = caching.Namespace("test")
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        return {"build": self.builds}
+
+    def test_hit_after_miss_and_namespace_bump(self):
+        self.assertEqual(caching.fetch(self.namespace, "k", self.build), {"build": 1})
+        self.assertEqual(caching.fetch(self.namespace, "k", self.build), {"build": 1})
+        self.namespace.bump()
+        self.assertEqual(caching.fetch(self.namespace, "k", self.build), {"build": 2})
+        counts = caching.metrics()["test"]
+        self.assertEqual((counts["miss"], counts["hit"], counts["rebuild"]), (2, 1, 2))
+        self.assertEqual(counts["hit_ratio"], 0.3333)
+
+    def test_lost_version_does_not_resurrect_old_entries(self):
+        caching.fetch(self.namespace, "k", self.build)
+        cache.delete(self.namespace.version_key)
+        self.assertEqual(caching.fetch(self.namespace, "k", self.build), {"build": 2})
+
+    def test_expired_entry_is_served_stale_while_another_worker_rebuilds(self):
+        caching.fetch(self.namespace, "k", self.build, ttl=1)
+        key = self.namespace.key("k")
+        value, delta, expires = cache.get(key)
+        cache.set(key, (value, delta, expires - 10), 60)
+        cache.add(f"{key}:lock", 1)  # somebody else holds the rebuild lock
+        self.assertEqual(caching.fetch(self.namespace, "k", self.build), {"build": 1})
+        self.assertEqual(self.builds, 1)
+        cache.delete(f"{key}:lock")
+        self.assertEqual(caching.fetch(self.namespace, "k", self.build), {"build": 2})
+        self.assertEqual(caching.metrics()["test"]["stale"], 2)
+
+    def test_early_refresh_before_expiry(self):
+        caching.fetch(self.namespace, "k", self.build)
+        key = self.namespace.key("k")
+        value, _, expires = cache.get(key)
+        cache.set(key, (value, 30.0, expires), 60)  # a slow build, 30s
+        with mock.patch("core.caching.random.random", return_value=1e-300):
+            self.assertEqual(caching.fetch(self.namespace, "k", self.build), {"build": 2})
+        self.assertEqual(caching.metrics()["test"]["early"], 1)
+
+
+@override_settings(API_CACHE={"WAIT": 5})
+class SingleFlightTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_misses_build_once(self):
+        namespace = caching.Namespace("flight")
+        started, release, builds, results = threading.Event(), threading.Event(), [], []
+
+        def build():
+            builds.append(1)
+            started.set()
+            release.wait(5)
+            return "value"
+
+        first = threading.Thread(target=lambda: results.append(caching.fetch(namespace, "k", build)))
+        first.start()
+        started.wait(5)
+        others = [threading.Thread(target=lambda: results.append(caching.fetch(namespace, "k", build))) for _ in range(4)]
+        for thread in others:
+            thread.start()
+        release.set()
+        for thread in [first, *others]:
+            thread.join()
+        self.assertEqual(results, ["value"] * 5)
+        self.assertEqual(len(builds), 1)
+
+
+class CacheMetricsEndpointTest(APITestCase):
+    def test_admin_only(self):
+        self.assertEqual(self.client.get('/api/cache-metrics/').status_code, 401)
+        admin = User.objects.create_superuser('root', email='root@test.com', password='pass123')
+        self.client.force_authenticate(admin)
+        self.client.get('/api/projects/top/')
+        res = self.client.get('/api/cache-metrics/')
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("leaderboard", res.data)
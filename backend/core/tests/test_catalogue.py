@@ -0,0 +1,96 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from core import catalogue, versions
+from core.models import Criteria, Project, Rating
+
+User = get_user_model()
+
+# Outside a test transaction, so the registry keeps what it loads
+class CatalogueTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        catalogue.clear()
+        self.addCleanup(catalogue.clear)
+        self.user = User.objects.create_user('alice', email='alice@test.com', password='pass123')
+        self.project = Project.objects.create(name="Shop", category="ecommerce", status="published")
+        self.design = Criteria.objects.create(name="Design", project_category="ecommerce", order=1)
+        self.ux = Criteria.objects.create(name="UX", project_category="ecommerce", order=0)
+        self.plot = Criteria.objects.create(name="Plot", project_category="movie")
+        self.client = APIClient()
+
+    def test_indexes_are_loaded_once(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(catalogue.for_category("ecommerce"), (self.ux, self.design))
+            self.assertEqual(catalogue.get(self.plot.pk).name, "Plot")
+            self.assertIsNone(catalogue.get(0))
+            self.assertEqual(catalogue.for_category("poll"), ())
+
+    def test_listing_and_validation_cost_no_queries_once_loaded(self):
+        catalogue.snapshot()
+        with self.assertNumQueries(0):
+            res = self.client.get('/api/criteria/')
+        self.assertEqual([row["name"] for row in res.json()["results"]], ["UX", "Design", "Plot"])
+        with self.assertNumQueries(0):
+            res = self.client.get(f'/api/criteria/{self.plot.pk}/')
+        self.assertEqual(res.json()["name"], "Plot")
+        self.assertEqual(self.client.get('/api/criteria/0/').status_code, 404)
+
+        rating = Rating(user=self.user, project=self.project, criteria_id=self.plot.pk, score=5)
+        with self.assertNumQueries(0), self.assertRaises(ValidationError):
+            rating.clean()
+
+        self.client.force_authenticate(self.user)
+        url = f'/api/projects/{self.project.pk}/ratings/scorecard/'
+        res = self.client.post(url, {"scores": [{"criteria": self.plot.pk, "score": 5}]}, format='json')
+        self.assertEqual(res.status_code, 400)
+        res = self.client.post(url, {"scores": [{"criteria": self.ux.pk, "score": 5}]}, format='json')
+        self.assertEqual(res.status_code, 201)
+
+    def test_rating_validation_reads_no_criteria(self):
+        catalogue.snapshot()
+        self.client.force_authenticate(self.user)
+        url = f'/api/projects/{self.project.pk}/ratings/'
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(url, {"criteria": self.ux.pk, "score": 7}, format='json')
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(Rating.objects.get().criteria_id, self.ux.pk)
+        sql = [query["sql"] for query in queries.captured_queries]
+        self.assertFalse([q for q in sql if 'FROM "core_criteria"' in q])
+        # Up to the INSERT: the project lookup and the duplicate check only
+        insert = next(i for i, q in enumerate(sql) if q.startswith('INSERT INTO "core_rating"'))
+        self.assertEqual(len([q for q in sql[:insert] if q.startswith("SELECT")]), 2)
+
+        with self.assertNumQueries(1):
+            res = self.client.post(url, {"criteria": self.plot.pk, "score": 7}, format='json')
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("criteria", res.data)
+        res = self.client.post(url, {"criteria": 0, "score": 7}, format='json')
+        self.assertEqual(res.status_code, 400)
+
+        # Project lookup and the duplicate check: no criteria query, no failed INSERT
+        with self.assertNumQueries(2):
+            res = self.client.post(url, {"criteria": self.ux.pk, "score": 3}, format='json')
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(Rating.objects.get().score, 7)
+
+    def test_writes_invalidate_every_worker(self):
+        loaded = catalogue.snapshot()
+        self.design.name = "Look & feel"
+        self.design.save()
+        self.assertEqual(catalogue.get(self.design.pk).name, "Look & feel")
+        self.assertIsNot(catalogue.snapshot(), loaded)
+
+        # A write this process didn't see (bulk update, another worker):
+        # the copy stays until the shared version moves
+        Criteria.objects.filter(pk=self.ux.pk).update(name="Usability")
+        self.assertEqual(catalogue.get(self.ux.pk).name, "UX")
+        versions.bump(versions.CRITERIA)
+        self.assertEqual(catalogue.get(self.ux.pk).name, "Usability")
+
+        self.plot.delete()
+        self.assertIsNone(catalogue.get(self.plot.pk))
@@ -0,0 +1,72 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from core.models import Project, Comment
+
+User = get_user_model()
+
+class CommentThreadTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', email='alice@test.com', password='pass123')
+        self.project = Project.objects.create(name="Feed", category="social", status="published")
+        self.url = f'/api/projects/{self.project.id}/comments/'
+
+        self.root = self.comment("root")
+        self.reply = self.comment("reply", self.root)
+        self.nested = self.comment("nested", self.reply)
+        self.sibling = self.comment("sibling", self.root)
+        self.other_root = self.comment("other root")
+
+    def comment(self, content, parent=None):
+        return Comment.objects.create(user=self.user, project=self.project, content=content, parent=parent)
+
+    def test_paths_roots_and_depths(self):
+        self.nested.refresh_from_db()
+        self.assertEqual(self.nested.root_id, self.root.id)
+        self.assertEqual(self.nested.depth, 2)
+        self.assertEqual(self.nested.path, f"{self.root.id:010d}.{self.reply.id:010d}.{self.nested.id:010d}")
+        self.assertEqual(self.other_root.root_id, self.other_root.id)
+
+    def test_thread_is_fetched_in_one_query(self):
+        # get_object + the (root, path) range scan
+        with self.assertNumQueries(2):
+            res = self.client.get(f'{self.url}{self.root.id}/thread/')
+        self.assertEqual(res.data['content'], 'root')
+        self.assertEqual([r['content'] for r in res.data['replies']], ['reply', 'sibling'])
+        self.assertEqual(res.data['replies'][0]['replies'][0]['content'], 'nested')
+
+    def test_subtree_of_a_reply(self):
+        res = self.client.get(f'{self.url}{self.reply.id}/thread/')
+        self.assertEqual(res.data['id'], self.reply.id)
+        self.assertEqual([r['id'] for r in res.data['replies']], [self.nested.id])
+
+    def test_threads_page(self):
+        for i in range(5):
+            self.comment(f"reply {i}", self.other_root)
+        with self.assertNumQueries(2):
+            res = self.client.get(f'{self.url}threads/')
+        self.assertEqual([t['id'] for t in res.data['results']], [self.other_root.id, self.root.id])
+        self.assertEqual(len(res.data['results'][0]['replies']), 5)
+
+    def test_create_reply_via_api(self):
+        self.client.force_authenticate(user=self.user)
+        res = self.client.post(self.url, {'content': 'hi', 'parent': self.nested.id}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['depth'], 3)
+
+        other = Project.objects.create(name="Other", status="published")
+        res = self.client.post(f'/api/projects/{other.id}/comments/', {'content': 'x', 'parent': self.root.id}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_replies_cannot_be_moved(self):
+        self.client.force_authenticate(user=self.user)
+        url = f'{self.url}{self.reply.id}/'
+        res = self.client.patch(url, {'parent': self.other_root.id}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.patch(url, {'parent': None}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        # Sending the current parent back (PUT) is fine
+        res = self.client.put(url, {'content': 'edited', 'parent': self.root.id}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.reply.refresh_from_db()
+        self.assertEqual((self.reply.parent_id, self.reply.content), (self.root.id, 'edited'))
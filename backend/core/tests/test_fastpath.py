@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, APITestCase
+from core import fastpath
+from core.models import Project, ProjectImage, Vote
+from core.renderers import FastJSONRenderer
+from core.serializers import ProjectSerializer
+
+User = get_user_model()
+
+class FastPathTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', email='alice@test.com', password='pass123')
+        self.projects = [
+            Project.objects.create(name="Café   «ünï»", description='quote " and </script>',
+                                   status="published", creator=self.user),
+            Project.objects.create(name="Orphan", status="published", creator=None),
+            Project.objects.create(name="Pictures", category="poll", status="published", creator=self.user),
+        ]
+        ProjectImage.objects.create(project=self.projects[2], image="projects/b.png", caption="b", order=2)
+        ProjectImage.objects.create(project=self.projects[2], image="projects/a.png", caption="a", order=1)
+        Vote.objects.create(user=self.user, project=self.projects[0])
+
+    def test_rows_render_byte_identical_to_serializer(self):
+        request = APIRequestFactory().get('/api/projects/')
+        queryset = Project.objects.order_by("-id")
+        voted = {self.projects[0].pk}
+        expected = JSONRenderer().render(ProjectSerializer(
+            queryset, many=True, context={"request": request, "user_flags": {"has_voted": voted}}
+        ).data)
+        rows = fastpath.project_rows(fastpath.values(queryset), request, voted)
+        self.assertEqual(FastJSONRenderer().render(rows), expected)
+
+    def test_list_matches_serializer_path_in_fewer_queries(self):
+        self.client.force_authenticate(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            fast = self.client.get('/api/projects/')
+        # projects (+ creator join), images, has_voted
+        self.assertEqual(len(queries), 3)
+        # Naming every field explicitly goes through ProjectSerializer instead
+        slow = self.client.get('/api/projects/?fields=' + ",".join(ProjectSerializer.Meta.fields))
+        self.assertEqual(fast.status_code, 200)
+        self.assertEqual(fast.content, slow.content)
+
+    def test_cursor_pagination_over_rows(self):
+        pages, url = [], '/api/projects/?page_size=2'
+        while url:
+            body = self.client.get(url).json()
+            pages.append([row["id"] for row in body["results"]])
+            url = body["next"]
+        self.assertEqual(pages, [[self.projects[2].pk, self.projects[1].pk], [self.projects[0].pk]])
+
+    def test_renderers_agree_on_list_and_leaderboard(self):
+        for url in ('/api/projects/', '/api/projects/top/', '/api/projects/top/?by=score'):
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(res.content, JSONRenderer().render(res.data), url)
+
+    def test_renderers_agree_on_floats(self):
+        payload = {"scores": [1e16, 1.5e-05, 1e-07, 1.2345678901234568e+16, 0.0001, 2.5, -0.0, 0.1 + 0.2]}
+        self.assertEqual(FastJSONRenderer().render(payload), JSONRenderer().render(payload))
+        # Strings that merely look like exponents keep the fast path
+        with mock.patch.object(JSONRenderer, "render") as slow:
+            FastJSONRenderer().render({"name": "3e9", "scores": [1.5, 10.0]})
+        slow.assert_not_called()
@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from core.models import Project, ProjectImage, Vote
+
+User = get_user_model()
+
+class SparseFieldsetTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', email='alice@test.com', password='pass123')
+        for i in range(3):
+            project = Project.objects.create(name=f"P{i}", description="x" * 5000, category="poll",
+                                             status="published", creator=self.user)
+            ProjectImage.objects.create(project=project, image="projects/a.png")
+        Vote.objects.create(user=self.user, project=project)
+        self.client.force_authenticate(self.user)
+
+    def test_default_representation_is_unchanged(self):
+        row = self.client.get('/api/projects/').data["results"][0]
+        self.assertEqual(set(row), {
+            "id", "name", "description", "category", "creator", "status",
+            "vote_count", "has_voted", "thumbnail", "created_at",
+        })
+        self.assertTrue(row["has_voted"])
+        self.assertEqual(row["creator"], "alice@test.com")
+
+    def test_fields_trim_payload_and_sql(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get('/api/projects/?fields=id,name,vote_count')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(set(res.data["results"][0]), {"id", "name", "vote_count"})
+        # One SELECT, no description column, no image prefetch, no has_voted lookup
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"description"', queries[0]["sql"])
+        self.assertNotIn('core_user', queries[0]["sql"])
+
+    def test_expand_and_compact_view(self):
+        res = self.client.get('/api/projects/?fields=id,has_voted&expand=images')
+        self.assertEqual(set(res.data["results"][0]), {"id", "has_voted", "images"})
+
+        with self.assertNumQueries(1):
+            res = self.client.get('/api/projects/?view=compact')
+        self.assertEqual(set(res.data["results"][0]),
+                         {"id", "name", "category", "vote_count", "average_score", "weighted_score"})
+        res = self.client.get('/api/projects/?view=compact&expand=images')
+        self.assertEqual(len(res.data["results"][0]["images"]), 1)
+
+    def test_detail_and_unknown_fields(self):
+        project = Project.objects.first()
+        res = self.client.get(f'/api/projects/{project.id}/?fields=id,rating_count')
+        self.assertEqual(res.data, {"id": project.id, "rating_count": 0})
+
+        res = self.client.get('/api/projects/?fields=id,password')
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("password", res.data["fields"])
+
+    def test_cursor_survives_trimmed_columns(self):
+        res = self.client.get('/api/projects/?fields=id&page_size=2&ordering=-vote_count')
+        with self.assertNumQueries(1):
+            res = self.client.get(res.data["next"])
+        self.assertEqual(len(res.data["results"]), 1)
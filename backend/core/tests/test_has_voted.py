@@ -0,0 +1,60 @@
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from core.models import Project, Vote
+
+User = get_user_model()
+
+class HasVotedQueryCountTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', email='alice@test.com', password='pass123')
+        self.client.force_authenticate(user=self.user)
+        cache.clear()
+
+    def create_projects(self, count):
+        projects = [Project.objects.create(name=f"Project {i}", status="published") for i in range(count)]
+        Vote.objects.create(user=self.user, project=projects[0])
+        return projects
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        return len(ctx.captured_queries), res
+
+    def test_list_query_count_is_constant(self):
+        self.create_projects(2)
+        small, _ = self.count_queries('/api/projects/')
+
+        self.create_projects(8)
+        large, res = self.count_queries('/api/projects/')
+
+        self.assertEqual(len(res.data['results']), 10)
+        self.assertEqual(small, large)
+
+    def test_top_query_count_is_constant(self):
+        self.create_projects(1)
+        small, _ = self.count_queries('/api/projects/top/')
+
+        cache.clear()
+        self.create_projects(4)
+        large, res = self.count_queries('/api/projects/top/')
+        self.assertEqual(len(res.data), 5)
+        self.assertEqual(small, large)
+
+    def test_has_voted_flags(self):
+        voted, other = self.create_projects(2)
+        res = self.client.get('/api/projects/')
+        flags = {row['id']: row['has_voted'] for row in res.data['results']}
+        self.assertEqual(flags, {voted.id: True, other.id: False})
+
+        res = self.client.get(f'/api/projects/{voted.id}/')
+        self.assertTrue(res.data['has_voted'])
+
+    def test_anonymous_users_never_voted(self):
+        self.create_projects(3)
+        self.client.logout()
+        res = self.client.get('/api/projects/')
+        self.assertFalse(any(row['has_voted'] for row in res.data['results']))
@@ -0,0 +1,73 @@
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from core import histograms, stats
+from core.models import Project, Criteria, CriteriaAggregate, Rating
+
+User = get_user_model()
+
+class ScoreHistogramTest(APITestCase):
+    def setUp(self):
+        self.users = [User.objects.create_user(f'u{i}', email=f'u{i}@test.com', password='pass123') for i in range(4)]
+        self.project = Project.objects.create(name="Movie App", category="movie", status="published")
+        self.story = Criteria.objects.create(name="Story", project_category="movie", order=0)
+        self.design = Criteria.objects.create(name="Design", project_category="movie", order=1)
+        for user, score in zip(self.users, (2, 8, 8, 10)):
+            Rating.objects.create(user=user, project=self.project, criteria=self.story, score=score)
+
+    def histogram(self, criteria):
+        return CriteriaAggregate.objects.get(project=self.project, criteria=criteria).histogram
+
+    def test_histogram_follows_rating_writes(self):
+        self.assertEqual(self.histogram(self.story), [0, 1, 0, 0, 0, 0, 0, 2, 0, 1])
+
+        rating = Rating.objects.get(user=self.users[0], project=self.project)
+        rating.score = 3
+        rating.save()
+        self.assertEqual(self.histogram(self.story), [0, 0, 1, 0, 0, 0, 0, 2, 0, 1])
+
+        rating.criteria = self.design
+        rating.save()
+        self.assertEqual(self.histogram(self.story), [0, 0, 0, 0, 0, 0, 0, 2, 0, 1])
+        self.assertEqual(self.histogram(self.design), [0, 0, 1, 0, 0, 0, 0, 0, 0, 0])
+
+        Rating.objects.get(user=self.users[3], project=self.project).delete()
+        self.assertEqual(self.histogram(self.story), [0, 0, 0, 0, 0, 0, 0, 2, 0, 0])
+
+    def test_scorecard_updates_histograms(self):
+        self.client.force_authenticate(self.users[0])
+        url = f'/api/projects/{self.project.id}/ratings/scorecard/'
+        self.client.post(url, {"scores": [{"criteria": self.story.id, "score": 5}, {"criteria": self.design.id, "score": 5}]}, format='json')
+        self.assertEqual(self.histogram(self.story), [0, 0, 0, 0, 1, 0, 0, 2, 0, 1])
+        self.assertEqual(self.histogram(self.design), [0, 0, 0, 0, 1, 0, 0, 0, 0, 0])
+
+    def test_vectorized_rebuild_matches_incremental(self):
+        Rating.objects.create(user=self.users[0], project=self.project, criteria=self.design, score=1)
+        expected = {(a.criteria_id, tuple(a.histogram), a.score_sum, a.rating_count) for a in CriteriaAggregate.objects.all()}
+
+        CriteriaAggregate.objects.update(hist_8=0, score_sum=0)
+        stats.rebuild_criteria_aggregates()
+        rebuilt = {(a.criteria_id, tuple(a.histogram), a.score_sum, a.rating_count) for a in CriteriaAggregate.objects.all()}
+        self.assertEqual(rebuilt, expected)
+
+        pairs, counts = stats.score_histograms(Rating.objects.all(), chunk_size=2)
+        self.assertEqual(pairs.tolist(), [[self.project.id, self.story.id], [self.project.id, self.design.id]])
+        self.assertEqual(counts.sum(), 5)
+
+    def test_summary(self):
+        summary = histograms.summarize([0, 1, 0, 0, 0, 0, 0, 2, 0, 1], percentiles=(25, 90))
+        self.assertEqual(summary["count"], 4)
+        self.assertEqual(summary["mean"], 7.0)
+        self.assertEqual(summary["median"], 8.0)
+        self.assertEqual(summary["stddev"], 3.0)
+        self.assertEqual(summary["percentiles"], {"p25": 2, "p90": 10})
+        self.assertEqual(histograms.summarize([0] * 10)["median"], None)
+
+    def test_distribution_endpoint(self):
+        # project + images prefetch + aggregates, whatever the number of ratings
+        with self.assertNumQueries(3):
+            res = self.client.get(f'/api/projects/{self.project.id}/distribution/?percentiles=50,75')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["overall"]["percentiles"], {"p50": 8, "p75": 8})
+        self.assertEqual(res.data["criteria"][0]["distribution"]["8"], 2)
+
+        self.assertEqual(self.client.get(f'/api/projects/{self.project.id}/distribution/?percentiles=abc').status_code, 400)
@@ -0,0 +1,122 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import override_settings
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, APITestCase
+from core import fastpath, images
+from core.models import Project, ProjectImage
+from core.renderers import FastJSONRenderer
+from core.serializers import ProjectSerializer
+
+User = get_user_model()
+
+
+def png(width, height, color="red"):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, "PNG")
+    return ContentFile(buffer.getvalue(), name="upload.png")
+
+
+class ImagePipelineTest(APITestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user('alice', email='alice@test.com', password='pass123')
+        self.project = Project.objects.create(name="Pictures", status="published", creator=self.user)
+
+    def upload(self, content, **kwargs):
+        # Celery runs eagerly under test; the task is queued on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            image = ProjectImage.objects.create(project=self.project, image=content, **kwargs)
+        image.refresh_from_db()
+        return image
+
+    def test_upload_is_resized_into_every_variant(self):
+        image = self.upload(png(2400, 1200))
+        self.assertEqual(image.status, "ready")
+        self.assertEqual((image.width, image.height), (2400, 1200))
+        self.assertEqual(
+            {name: (data["width"], data["height"]) for name, data in image.variants.items()},
+            {"full": (1920, 960), "card": (800, 400), "thumbnail": (320, 160)},
+        )
+        storage = ProjectImage._meta.get_field("image").storage
+        for data in image.variants.values():
+            self.assertTrue(data["name"].endswith(f".{images.FORMAT}"))
+            with storage.open(data["name"]) as fh, Image.open(fh) as variant:
+                self.assertEqual(variant.size, (data["width"], data["height"]))
+
+        # Already done: a redelivered task does nothing
+        self.assertEqual(images.process(image.pk), "skipped")
+
+    def test_list_carries_thumbnail_and_detail_every_variant(self):
+        image = self.upload(png(1000, 1000))
+        row = self.client.get('/api/projects/').json()["results"][0]
+        self.assertTrue(row["thumbnail"]["url"].endswith(image.variants["thumbnail"]["name"]))
+        self.assertEqual((row["thumbnail"]["width"], row["thumbnail"]["height"]), (320, 320))
+        self.assertNotIn("images", row)
+
+        detail = self.client.get(f'/api/projects/{self.project.pk}/').json()
+        self.assertEqual(set(detail["images"][0]["variants"]), {"full", "card", "thumbnail"})
+        self.assertEqual(detail["images"][0]["status"], "ready")
+
+    def test_fast_path_matches_serializer(self):
+        self.upload(png(640, 480), order=2)
+        self.upload(png(480, 640), order=1)
+        request = APIRequestFactory().get('/api/projects/')
+        queryset = Project.objects.all()
+        expected = JSONRenderer().render(ProjectSerializer(
+            queryset, many=True, context={"request": request, "user_flags": {"has_voted": set()}}
+        ).data)
+        rows = fastpath.project_rows(fastpath.values(queryset), request)
+        self.assertEqual(FastJSONRenderer().render(rows), expected)
+        # The lowest order is the primary image
+        self.assertEqual(rows[0]["thumbnail"]["width"], 240)
+
+    def test_unreadable_upload_fails_without_retrying(self):
+        image = self.upload(ContentFile(b"not an image", name="broken.png"))
+        self.assertEqual(image.status, "failed")
+        self.assertEqual(image.variants, {})
+        # Until processed the list shows the original
+        row = self.client.get('/api/projects/').json()["results"][0]
+        self.assertTrue(row["thumbnail"]["url"].endswith(image.image.name))
+
+    def test_replacing_the_file_reprocesses_it(self):
+        image = self.upload(png(1000, 500))
+        old = image.variants["thumbnail"]["name"]
+        image.image = png(500, 1000, "blue")
+        with self.captureOnCommitCallbacks(execute=True):
+            image.save()
+        image.refresh_from_db()
+        self.assertEqual(image.status, "ready")
+        self.assertEqual((image.width, image.height), (500, 1000))
+        self.assertEqual(image.variants["thumbnail"]["height"], 320)
+        storage = ProjectImage._meta.get_field("image").storage
+        if old != image.variants["thumbnail"]["name"]:
+            self.assertFalse(storage.exists(old))
+
+        # Saving other fields keeps the variants
+        image.caption = "Portrait"
+        with self.captureOnCommitCallbacks(execute=True):
+            image.save()
+        image.refresh_from_db()
+        self.assertEqual(image.status, "ready")
+
+    def test_backfill_command(self):
+        with override_settings(IMAGE_PIPELINE={"ENABLED": False}):
+            image = self.upload(png(400, 400))
+        self.assertEqual(image.status, "pending")
+        out = StringIO()
+        call_command("process_images", "--sync", stdout=out)
+        self.assertIn("1 ready", out.getvalue())
+        image.refresh_from_db()
+        self.assertEqual(image.status, "ready")
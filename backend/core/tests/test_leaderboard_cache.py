@@ -0,0 +1,56 @@
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from core import leaderboard
+from core.models import Project, Vote
+
+User = get_user_model()
+
+class LeaderboardCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user('alice', email='alice@test.com', password='pass123')
+        self.bob = User.objects.create_user('bob', email='bob@test.com', password='pass123')
+        self.p1 = Project.objects.create(name="Social Media Feed", status="published")
+        self.p2 = Project.objects.create(name="Job Platform", status="published")
+        Vote.objects.create(user=self.alice, project=self.p1)
+
+    def top(self, user=None):
+        self.client.force_authenticate(user=user)
+        res = self.client.get('/api/projects/top/')
+        self.assertEqual(res.status_code, 200)
+        return {row['id']: row for row in res.data}
+
+    def test_has_voted_is_not_shared_between_users(self):
+        self.assertTrue(self.top(self.alice)[self.p1.id]['has_voted'])
+        self.assertFalse(self.top(self.bob)[self.p1.id]['has_voted'])
+        self.assertFalse(self.top()[self.p1.id]['has_voted'])
+
+    def test_shared_payload_is_user_independent(self):
+        self.top(self.alice)
+        cached, _, _ = cache.get(leaderboard.NAMESPACE.key(leaderboard.payload_key()))
+        self.assertFalse(any(row['has_voted'] for row in cached))
+
+    def test_anonymous_hit_costs_no_queries(self):
+        self.top()
+        self.client.force_authenticate(user=None)
+        with self.assertNumQueries(0):
+            self.client.get('/api/projects/top/')
+
+    def test_vote_invalidates_cached_ranking(self):
+        self.assertEqual(self.top(self.bob)[self.p2.id]['vote_count'], 0)
+
+        self.client.force_authenticate(user=self.bob)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/projects/{self.p2.id}/vote/')
+
+        row = self.top(self.bob)[self.p2.id]
+        self.assertEqual(row['vote_count'], 1)
+        self.assertTrue(row['has_voted'])
+
+    def test_unknown_category_is_rejected_before_caching(self):
+        with self.assertNumQueries(0):
+            res = self.client.get('/api/projects/top/?category=nope')
+        self.assertEqual(res.status_code, 400)
+        self.assertIsNone(cache.get(leaderboard.NAMESPACE.key(leaderboard.payload_key(category="nope"))))
+        self.assertEqual(self.client.get('/api/projects/top/?category=poll').status_code, 200)
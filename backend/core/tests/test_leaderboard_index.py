@@ -0,0 +1,89 @@
+from io import StringIO
+from unittest import mock
+
+import fakeredis
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from core import leaderboard_index
+from core.models import Project, Criteria, Vote, Rating
+
+User = get_user_model()
+
+@override_settings(LEADERBOARD_INDEX={"ENABLED": True, "PREFIX": "test-lb"})
+class LeaderboardIndexTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch("core.leaderboard_index.get_redis", return_value=fakeredis.FakeRedis(decode_responses=True))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.users = [User.objects.create_user(f'u{i}', email=f'u{i}@test.com', password='pass123') for i in range(3)]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.poll = Project.objects.create(name="Poll", category="poll", status="published")
+            self.feed = Project.objects.create(name="Feed", category="social", status="published")
+            self.jobs = Project.objects.create(name="Jobs", category="job", status="published")
+            self.draft = Project.objects.create(name="Draft", category="poll")
+            for user in self.users:
+                Vote.objects.create(user=user, project=self.feed)
+            Vote.objects.create(user=self.users[0], project=self.poll)
+
+    def test_votes_update_global_and_category_sets(self):
+        self.assertEqual(leaderboard_index.top("votes"), [(self.feed.id, 3.0), (self.poll.id, 1.0), (self.jobs.id, 0.0)])
+        self.assertEqual(leaderboard_index.top("votes", "poll"), [(self.poll.id, 1.0)])
+
+    def test_ratings_update_score_set(self):
+        criteria = Criteria.objects.create(name="Design", project_category="job")
+        with self.captureOnCommitCallbacks(execute=True):
+            Rating.objects.create(user=self.users[0], project=self.jobs, criteria=criteria, score=9)
+        self.assertEqual(leaderboard_index.top("score", limit=1), [(self.jobs.id, 9.0)])
+
+    def test_rank_and_around_endpoints(self):
+        res = self.client.get(f'/api/projects/{self.poll.id}/rank/')
+        self.assertEqual(res.data['rank'], 2)
+        self.assertEqual(res.data['total'], 3)
+
+        res = self.client.get(f'/api/projects/{self.poll.id}/rank/?scope=category')
+        self.assertEqual((res.data['rank'], res.data['category']), (1, 'poll'))
+
+        res = self.client.get(f'/api/projects/{self.poll.id}/around/?window=1')
+        self.assertEqual([row['id'] for row in res.data], [self.feed.id, self.poll.id, self.jobs.id])
+        self.assertEqual(res.data[0]['name'], 'Feed')
+
+    def test_unpublished_projects_are_not_ranked(self):
+        res = self.client.get(f'/api/projects/{self.draft.id}/rank/')
+        self.assertEqual(res.status_code, 404)
+
+    def test_top_endpoint_uses_index(self):
+        res = self.client.get('/api/projects/top/')
+        self.assertEqual([row['id'] for row in res.data], [self.feed.id, self.poll.id, self.jobs.id])
+
+    def test_rebuild_command(self):
+        leaderboard_index.get_redis().flushall()
+        out = StringIO()
+        call_command("rebuild_leaderboard_index", stdout=out)
+        self.assertIn("Indexed 3 published project(s)", out.getvalue())
+        self.assertEqual(leaderboard_index.rank(self.feed.id)["rank"], 1)
+
+    def test_rebuild_swaps_complete_sets_in(self):
+        client = leaderboard_index.get_redis()
+        stale = leaderboard_index.key("votes", "movie")
+        client.zadd(stale, {"999": 5})
+        client.zadd(leaderboard_index.key("votes"), {"999": 5})
+        seen = []
+        pipeline = client.pipeline
+
+        def watch_readers(transaction=True):
+            # What a reader sees just before each batch and the swap
+            seen.append(leaderboard_index.top("votes", limit=10))
+            return pipeline(transaction=transaction)
+
+        with mock.patch.object(client, "pipeline", side_effect=watch_readers):
+            self.assertEqual(leaderboard_index.rebuild(), 3)
+        self.assertTrue(all(999 in dict(rows) for rows in seen))
+        self.assertEqual([pk for pk, _ in leaderboard_index.top("votes")], [self.feed.id, self.poll.id, self.jobs.id])
+        self.assertFalse(client.exists(stale))
+        self.assertEqual(client.keys("*:rebuild:*"), [])
+        self.assertEqual(client.ttl(leaderboard_index.key("votes")), -1)
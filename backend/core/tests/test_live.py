@@ -0,0 +1,110 @@
+import asyncio
+import json
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from core import live
+from core.models import Project, Vote
+
+User = get_user_model()
+
+@override_settings(LIVE_UPDATES={"ENABLED": True, "BACKEND": "memory", "INTERVAL": 60, "HEARTBEAT": 60})
+class LiveUpdatesTest(TestCase):
+    def setUp(self):
+        live._hub = None
+        self.user = User.objects.create_user('alice', email='alice@test.com', password='pass123')
+        self.poll = Project.objects.create(name="Poll", category="poll", status="published")
+        self.feed = Project.objects.create(name="Feed", category="social", status="published")
+
+    def test_vote_marks_project_dirty_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Vote.objects.create(user=self.user, project=self.poll)
+        self.assertEqual(live.get_hub()._dirty, {self.poll.id})
+
+    async def test_batched_fan_out(self):
+        hub = live.get_hub()
+        everything = hub.subscribe()
+        polls = hub.subscribe(categories=["poll"])
+        feed_only = hub.subscribe(projects=[self.feed.id])
+        watchers = [hub.subscribe() for _ in range(50)]
+        self.addCleanup(hub.close)
+
+        await sync_to_async(Project.objects.filter(pk=self.poll.pk).update)(vote_count=3)
+        for _ in range(10):
+            live.publish([self.poll.id, self.feed.id])
+
+        with mock.patch.object(live.Project.objects, "filter", wraps=live.Project.objects.filter) as query:
+            await hub.flush()
+        self.assertEqual(query.call_count, 1)
+
+        message = everything.queue.get_nowait()
+        self.assertEqual({row["id"] for row in message["projects"]}, {self.poll.id, self.feed.id})
+        self.assertEqual(polls.queue.get_nowait()["projects"][0]["vote_count"], 3)
+        self.assertEqual([row["id"] for row in feed_only.queue.get_nowait()["projects"]], [self.feed.id])
+        self.assertTrue(all(w.queue.qsize() == 1 for w in watchers))
+
+        # Nothing changed since: nothing is read or sent
+        self.assertEqual(await hub.flush(), 0)
+        self.assertTrue(everything.queue.empty())
+
+    async def test_flush_loop_survives_errors(self):
+        hub = live.Hub(interval=0.01)
+        subscription = hub.subscribe()
+        self.addCleanup(hub.close)
+        hub.mark_dirty([self.poll.id])
+
+        real_filter, calls = live.Project.objects.filter, []
+
+        def flaky_filter(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 1:
+                raise RuntimeError("db down")
+            return real_filter(*args, **kwargs)
+
+        with mock.patch.object(live.Project.objects, "filter", flaky_filter), self.assertLogs("core.live", "ERROR"):
+            message = await asyncio.wait_for(subscription.queue.get(), 2)
+        # The batch read during the failure is sent by the retry
+        self.assertEqual([row["id"] for row in message["projects"]], [self.poll.id])
+        self.assertFalse(any(task.done() for task in hub._tasks))
+
+    async def test_finished_loops_are_restarted(self):
+        hub = live.get_hub()
+        hub.subscribe()
+        self.addCleanup(hub.close)
+        task = hub._tasks[0]
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        hub.subscribe()
+        self.assertEqual(len(hub._tasks), 1)
+        self.assertIsNot(hub._tasks[0], task)
+
+    async def test_event_stream_format(self):
+        hub = live.get_hub()
+        subscription = hub.subscribe()
+        self.addCleanup(hub.close)
+        stream = live.event_stream(subscription)
+
+        self.assertEqual(await anext(stream), ": connected\n\n")
+        subscription.offer({"projects": [{"id": 1}]})
+        chunk = await asyncio.wait_for(anext(stream), 1)
+        self.assertTrue(chunk.startswith("event: stats\ndata: "))
+        self.assertEqual(json.loads(chunk.split("data: ")[1]), {"projects": [{"id": 1}]})
+
+        await stream.aclose()
+        self.assertNotIn(subscription, hub.subscribers)
+
+    async def test_endpoint(self):
+        res = await self.async_client.get('/api/live/?category=poll')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res['Content-Type'], 'text/event-stream')
+        live.get_hub().close()
+
+        res = await self.async_client.get('/api/live/?project=abc')
+        self.assertEqual(res.status_code, 400)
+
+    def test_disabled(self):
+        with override_settings(LIVE_UPDATES={"ENABLED": False}):
+            self.assertEqual(self.client.get('/api/live/').status_code, 404)
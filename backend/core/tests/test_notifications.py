@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from core import notifications
+from core.models import Project, Criteria, Rating, PendingNotification, NotificationDigest
+
+User = get_user_model()
+
+@override_settings(NOTIFICATIONS={"ENABLED": True, "WINDOW": 300, "MAX_PER_HOUR": 2})
+class RatingDigestTest(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', email='owner@test.com', password='pass123')
+        self.poll = Project.objects.create(name="Poll", category="poll", status="published", creator=self.owner)
+        self.feed = Project.objects.create(name="Feed", category="poll", status="published", creator=self.owner)
+        self.criteria = [Criteria.objects.create(name=f"C{i}", project_category="poll") for i in range(5)]
+        self.judges = [User.objects.create_user(f'j{i}', email=f'j{i}@test.com', password='pass123') for i in range(4)]
+
+    def rate_everything(self, project):
+        for judge in self.judges:
+            for criteria in self.criteria:
+                Rating.objects.create(user=judge, project=project, criteria=criteria, score=5)
+
+    def later(self, minutes=10):
+        return timezone.now() + timezone.timedelta(minutes=minutes)
+
+    def test_ratings_are_coalesced_into_one_email(self):
+        self.rate_everything(self.poll)
+        self.rate_everything(self.feed)
+        self.assertEqual(PendingNotification.objects.get(project=self.poll).rating_count, 20)
+
+        # Still inside the window
+        self.assertEqual(notifications.send_digests(), 0)
+
+        with mock.patch("core.notifications.get_connection", wraps=notifications.get_connection) as connect:
+            self.assertEqual(notifications.send_digests(now=self.later()), 1)
+        self.assertEqual(connect.call_count, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['owner@test.com'])
+        self.assertEqual(mail.outbox[0].subject, "Your projects received 40 new ratings")
+        self.assertIn("- Feed: 20 new ratings", mail.outbox[0].body)
+        self.assertFalse(PendingNotification.objects.exists())
+        self.assertEqual(NotificationDigest.objects.get().rating_count, 40)
+
+    def test_rate_limit_defers_until_next_slot(self):
+        for i in range(3):
+            Rating.objects.create(user=self.judges[i], project=self.poll, criteria=self.criteria[0], score=5)
+            notifications.send_digests(now=self.later(10 * (i + 1)))
+        # Two digests per hour; the third rating waits
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(PendingNotification.objects.get().rating_count, 1)
+
+        NotificationDigest.objects.update(sent_at=timezone.now() - timezone.timedelta(hours=2))
+        notifications.send_digests(now=self.later(40))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[2].subject, "Your project received a new rating!")
+
+    def test_scorecard_counts_new_ratings(self):
+        client = APIClient()
+        client.force_authenticate(self.judges[0])
+        scores = [{"criteria": c.id, "score": 7} for c in self.criteria]
+        client.post(f'/api/projects/{self.poll.id}/ratings/scorecard/', {"scores": scores}, format='json')
+        client.post(f'/api/projects/{self.poll.id}/ratings/scorecard/', {"scores": scores}, format='json')
+        self.assertEqual(PendingNotification.objects.get().rating_count, 5)
+
+    def test_disabled(self):
+        with override_settings(NOTIFICATIONS={"ENABLED": False}):
+            self.rate_everything(self.poll)
+        self.assertFalse(PendingNotification.objects.exists())
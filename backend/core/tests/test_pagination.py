@@ -0,0 +1,75 @@
+import base64
+
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from core.models import Project, Comment
+
+User = get_user_model()
+
+class KeysetPaginationTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', email='alice@test.com', password='pass123')
+        self.project = Project.objects.create(name="Feed", category="social", status="published")
+        self.comments = [
+            Comment.objects.create(user=self.user, project=self.project, content=f"comment {i}")
+            for i in range(25)
+        ]
+        self.url = f'/api/projects/{self.project.id}/comments/'
+
+    def walk(self, url):
+        ids, pages = [], 0
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, 200)
+            self.assertNotIn('count', res.data)
+            ids += [row['id'] for row in res.data['results']]
+            url = res.data['next']
+            pages += 1
+        return ids, pages
+
+    def test_walks_every_row_once_in_order(self):
+        ids, pages = self.walk(self.url)
+        self.assertEqual(pages, 3)
+        self.assertEqual(ids, [c.id for c in reversed(self.comments)])
+
+    def test_ties_on_created_at_are_broken_by_id(self):
+        Comment.objects.update(created_at=timezone.now())
+        ids, _ = self.walk(self.url + '?page_size=7')
+        self.assertEqual(ids, sorted((c.id for c in self.comments), reverse=True))
+
+    def test_previous_link_returns_the_same_page(self):
+        first = self.client.get(self.url).data
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+        self.assertEqual(back['results'], first['results'])
+        self.assertIsNone(back['previous'])
+        self.assertIsNone(first['previous'])
+
+    def test_count_is_opt_in(self):
+        res = self.client.get(self.url + '?count=true')
+        self.assertEqual(res.data['count'], 25)
+
+    def test_legacy_page_numbers_still_work(self):
+        res = self.client.get(self.url + '?page=3')
+        self.assertEqual(res.data['count'], 25)
+        self.assertEqual(len(res.data['results']), 5)
+
+    def test_invalid_cursor(self):
+        res = self.client.get(self.url + '?cursor=garbage')
+        self.assertEqual(res.status_code, 404)
+        # Valid JSON, but the value is not a datetime
+        for payload in ('{"v":{},"id":1}', '{"v":[1],"id":1}', '{"v":"2026-13-01T00:00:00","id":1}'):
+            cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+            res = self.client.get(self.url + '?cursor=' + cursor)
+            self.assertEqual(res.status_code, 404, payload)
+
+    def test_project_ordering_by_vote_count(self):
+        for i in range(12):
+            Project.objects.create(name=f"P{i}", status="published")
+        Project.objects.filter(name__in=["P3", "P7"]).update(vote_count=5)
+
+        ids, pages = self.walk('/api/projects/?ordering=-vote_count&page_size=5')
+        self.assertEqual(pages, 3)
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(set(ids[:2]), set(Project.objects.filter(vote_count=5).values_list('id', flat=True)))
@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from core import purge
+from core.models import CriteriaAggregate, Project, Criteria, Rating
+from core.tasks import cleanup_old_ratings
+
+User = get_user_model()
+
+class RatingPurgeTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.poll = Project.objects.create(name="Poll", category="poll", status="published")
+        self.other = Project.objects.create(name="Other", category="poll", status="published")
+        self.criteria = Criteria.objects.create(name="Design", project_category="poll")
+        old = timezone.now() - timezone.timedelta(days=30)
+        for i in range(5):
+            user = User.objects.create_user(f'u{i}', email=f'u{i}@test.com', password='pass123')
+            Rating.objects.create(user=user, project=self.poll, criteria=self.criteria, score=i + 1)
+            Rating.objects.create(user=user, project=self.other, criteria=self.criteria, score=2)
+        # Keep the newest rating of each project
+        keep = [Rating.objects.filter(project=project).latest("pk").pk for project in (self.poll, self.other)]
+        Rating.objects.exclude(pk__in=keep).update(created_at=old)
+        self.cutoff = timezone.now() - timezone.timedelta(days=7)
+
+    def test_purge_in_chunks_and_recalculate(self):
+        batches = []
+        result = purge.purge_ratings(self.cutoff, batch_size=3, progress=lambda s: batches.append(s["deleted"]))
+
+        self.assertEqual(result["deleted"], 8)
+        self.assertEqual(batches, [3, 6, 8])
+        self.assertEqual(result["projects"], 2)
+        self.assertEqual(Rating.objects.count(), 2)
+
+        self.poll.refresh_from_db()
+        self.assertEqual((self.poll.rating_count, self.poll.score_sum, self.poll.average_score), (1, 5, 5.0))
+        self.assertEqual(CriteriaAggregate.objects.get(project=self.poll).rating_count, 1)
+        self.assertIsNone(cache.get(purge.STATE_KEY))
+
+    def test_one_delete_per_chunk(self):
+        with CaptureQueriesContext(connection) as queries:
+            purge.purge_ratings(self.cutoff, batch_size=3)
+        deletes = [q["sql"] for q in queries if q["sql"].startswith('DELETE FROM "core_rating"')]
+        self.assertEqual(len(deletes), 3)
+
+    def test_resume_after_interruption(self):
+        def crash(state):
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            purge.purge_ratings(self.cutoff, batch_size=3, progress=crash)
+        self.assertEqual(Rating.objects.count(), 7)
+        self.assertEqual(cache.get(purge.STATE_KEY)["deleted"], 3)
+
+        result = purge.purge_ratings(self.cutoff, batch_size=3)
+        self.assertEqual(result["deleted"], 8)
+        self.assertEqual(result["projects"], 2)
+        self.other.refresh_from_db()
+        self.assertEqual((self.other.rating_count, self.other.score_sum), (1, 2))
+
+    def test_task(self):
+        self.assertIn("Deleted 8 old ratings", cleanup_old_ratings(batch_size=4))
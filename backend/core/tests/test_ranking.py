@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from core import stats
+from core.models import Project, Criteria, Rating
+
+User = get_user_model()
+
+class RankingModeTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [User.objects.create_user(f'u{i}', email=f'u{i}@test.com', password='pass123') for i in range(20)]
+        self.story = Criteria.objects.create(name="Story", project_category="movie")
+        self.lucky = Project.objects.create(name="One Perfect Score", category="movie", status="published")
+        self.solid = Project.objects.create(name="Consistently Good", category="movie", status="published")
+        self.unrated = Project.objects.create(name="Nobody Rated", category="movie", status="published")
+        Rating.objects.create(user=self.users[0], project=self.lucky, criteria=self.story, score=10)
+        # One outlier at each end, eighteen 9s
+        for user, score in zip(self.users, [1, 10] + [9] * 18):
+            Rating.objects.create(user=user, project=self.solid, criteria=self.story, score=score)
+
+    def scores(self, project):
+        project.refresh_from_db()
+        return project.average_score, project.bayesian_score, project.wilson_score, project.trimmed_score
+
+    def test_scores_are_maintained_incrementally(self):
+        self.assertEqual(self.scores(self.lucky), (10.0, 5.91, 2.86, 10.0))
+        average, bayesian, wilson, trimmed = self.scores(self.solid)
+        self.assertEqual(trimmed, 9.0)  # drops the 1 and the 10
+        self.assertGreater(bayesian, 5.91)
+        self.assertGreater(wilson, 2.86)
+        self.assertEqual(self.scores(self.unrated), (None, 0, 0, 0))
+
+        # A full recompute agrees with the incremental values
+        before = self.scores(self.solid)
+        stats.recompute(self.solid.pk)
+        self.assertEqual(self.scores(self.solid), before)
+
+        Rating.objects.filter(project=self.lucky).delete()
+        self.assertEqual(self.scores(self.lucky)[1:], (0, 0, 0))
+
+    def test_top_and_ordering_use_ranking_modes(self):
+        res = self.client.get('/api/projects/top/?by=votes')
+        self.assertEqual(res.status_code, 200)
+        for by in ("bayesian", "wilson", "trimmed"):
+            res = self.client.get(f'/api/projects/top/?by={by}')
+            self.assertEqual([p["id"] for p in res.data][:2], [self.solid.id, self.lucky.id] if by != "trimmed"
+                             else [self.lucky.id, self.solid.id])
+
+        res = self.client.get('/api/projects/?ordering=-wilson_score')
+        self.assertEqual([p["id"] for p in res.data["results"]], [self.solid.id, self.lucky.id, self.unrated.id])
+        # Keyset pagination walks the indexed column
+        res = self.client.get('/api/projects/?ordering=-bayesian_score&page_size=1')
+        res = self.client.get(res.data["next"])
+        self.assertEqual([p["id"] for p in res.data["results"]], [self.lucky.id])
@@ -0,0 +1,112 @@
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+from core import rollups
+from core.models import (
+    Project, Criteria, Vote, Rating, Comment, ProjectRollup, CategoryRollup, CriteriaRollup, RollupWatermark,
+)
+
+User = get_user_model()
+
+def at(day, hour, minute=30):
+    return datetime(2026, 3, day, hour, minute, tzinfo=dt_timezone.utc)
+
+class RollupTest(APITestCase):
+    def setUp(self):
+        self.users = [User.objects.create_user(f'u{i}', email=f'u{i}@test.com', password='pass123') for i in range(4)]
+        self.poll = Project.objects.create(name="Poll", category="poll", status="published")
+        self.other = Project.objects.create(name="Other Poll", category="poll", status="published")
+        self.design = Criteria.objects.create(name="Design", project_category="poll")
+        self.now = at(5, 0)
+
+    def add(self, model, when, **fields):
+        row = model.objects.create(**fields)
+        model.objects.filter(pk=row.pk).update(created_at=when)
+        return row
+
+    def test_hourly_and_daily_buckets(self):
+        self.add(Vote, at(1, 9), user=self.users[0], project=self.poll)
+        self.add(Vote, at(1, 9), user=self.users[1], project=self.poll)
+        self.add(Vote, at(1, 14), user=self.users[2], project=self.poll)
+        self.add(Vote, at(1, 14), user=self.users[0], project=self.other)
+        self.add(Rating, at(1, 9), user=self.users[0], project=self.poll, criteria=self.design, score=8)
+        self.add(Rating, at(2, 9), user=self.users[1], project=self.poll, criteria=self.design, score=8)
+        self.add(Rating, at(2, 9), user=self.users[2], project=self.poll, criteria=self.design, score=3)
+        self.add(Comment, at(2, 10), user=self.users[0], project=self.poll, content="Nice")
+
+        self.assertEqual(rollups.run(batch_size=2, now=self.now), {"votes": 4, "ratings": 3, "comments": 1})
+
+        hourly = ProjectRollup.objects.get(project=self.poll, period="hour", bucket=at(1, 9, 0))
+        self.assertEqual((hourly.votes, hourly.ratings, hourly.score_sum), (2, 1, 8))
+        day1 = ProjectRollup.objects.get(project=self.poll, period="day", bucket=at(1, 0, 0))
+        self.assertEqual(day1.votes, 3)
+        self.assertEqual(CategoryRollup.objects.get(category="poll", period="day", bucket=day1.bucket).votes, 4)
+
+        day2 = CriteriaRollup.objects.get(project=self.poll, period="day", bucket=at(2, 0, 0))
+        self.assertEqual((day2.ratings, day2.score_sum, day2.distribution), (2, 11, {"8": 1, "3": 1}))
+
+    def test_only_new_rows_are_processed(self):
+        self.add(Vote, at(1, 9), user=self.users[0], project=self.poll)
+        rollups.run(now=self.now)
+        self.add(Vote, at(1, 9), user=self.users[1], project=self.poll)
+        # Too recent for this run, picked up by the next one
+        self.add(Vote, self.now, user=self.users[2], project=self.poll)
+
+        self.assertEqual(rollups.run(now=self.now)["votes"], 1)
+        self.assertEqual(ProjectRollup.objects.get(project=self.poll, period="day").votes, 2)
+        self.assertEqual(rollups.run(now=self.now)["votes"], 0)
+        self.assertEqual(rollups.run(now=at(6, 0))["votes"], 1)
+        self.assertEqual(RollupWatermark.objects.get(source="votes").last_id, Vote.objects.latest("pk").pk)
+
+    def test_rebuild_catches_up_with_changes_and_deletes(self):
+        self.add(Vote, at(1, 9), user=self.users[0], project=self.poll)
+        vote = self.add(Vote, at(1, 9), user=self.users[1], project=self.poll)
+        rating = self.add(Rating, at(1, 9), user=self.users[0], project=self.poll, criteria=self.design, score=8)
+        rollups.run(now=self.now)
+        vote.delete()
+        Rating.objects.filter(pk=rating.pk).update(score=3)
+        # Not yet counted: left for the next run
+        self.add(Vote, self.now, user=self.users[2], project=self.poll)
+
+        out = StringIO()
+        call_command("reconcile_stats", stdout=out)
+        self.assertIn("Rollups rebuilt from 1 votes, 1 ratings, 0 comments.", out.getvalue())
+        day = ProjectRollup.objects.get(project=self.poll, period="day")
+        self.assertEqual((day.votes, day.ratings, day.score_sum), (1, 1, 3))
+        self.assertEqual(CategoryRollup.objects.get(category="poll", period="hour").votes, 1)
+        self.assertEqual(CriteriaRollup.objects.get(period="day").distribution, {"3": 1})
+        self.assertEqual(rollups.run(now=at(6, 0))["votes"], 1)
+        self.assertEqual(ProjectRollup.objects.filter(project=self.poll, period="day").count(), 2)
+
+    def test_analytics_api(self):
+        for i, score in enumerate((4, 8, 8)):
+            self.add(Rating, at(1, 9), user=self.users[i], project=self.poll, criteria=self.design, score=score)
+        self.add(Vote, at(3, 9), user=self.users[0], project=self.poll)
+        rollups.run(now=self.now)
+
+        params = {"period": "day", "since": at(1, 0, 0).isoformat(), "until": self.now.isoformat()}
+        with self.assertNumQueries(3):
+            res = self.client.get(f'/api/analytics/projects/{self.poll.id}/', params)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([b["votes"] for b in res.data["buckets"]], [0, 1])
+        self.assertAlmostEqual(res.data["buckets"][0]["average_score"], 6.67)
+        self.assertEqual(res.data["criteria"][0]["distribution"], {"4": 1, "8": 2})
+
+        res = self.client.get('/api/analytics/categories/poll/', {**params, "period": "hour"})
+        self.assertEqual(len(res.data["buckets"]), 2)
+
+        res = self.client.get('/api/analytics/categories/poll/', {"period": "hour", "since": "2020-01-01T00:00:00Z"})
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(self.client.get('/api/analytics/categories/nope/').status_code, 404)
+
+    def test_analytics_range_parsing(self):
+        url = f'/api/analytics/projects/{self.poll.id}/'
+        # No offset: read in the current time zone
+        res = self.client.get(url, {"since": "2026-03-01T00:00:00", "until": "2026-03-05T00:00:00"})
+        self.assertEqual(res.status_code, 200)
+        res = self.client.get(url, {"since": "2026-13-01T00:00:00"})
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("since", res.data)
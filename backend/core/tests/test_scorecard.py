@@ -0,0 +1,136 @@
+import threading
+from unittest import mock, skipUnless
+
+from rest_framework.test import APIClient, APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from core import stats
+from core.models import Project, Criteria, CriteriaAggregate, Rating
+
+User = get_user_model()
+
+class ScorecardTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', email='alice@test.com', password='pass123')
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(name="Shop", category="ecommerce", status="published")
+        self.criteria = [
+            Criteria.objects.create(name=name, project_category="ecommerce", weight=weight)
+            for name, weight in (("Innovation", 2), ("Design", 1), ("Code Quality", 1), ("UX", 1), ("Docs", 1))
+        ]
+        self.url = f'/api/projects/{self.project.id}/ratings/scorecard/'
+
+    def payload(self, *scores):
+        return {"scores": [{"criteria": c.id, "score": s} for c, s in zip(self.criteria, scores)]}
+
+    def test_submit_full_scorecard(self):
+        res = self.client.post(self.url, self.payload(10, 8, 6, 4, 2), format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((res.data['created'], res.data['updated']), (5, 0))
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.rating_count, 5)
+        self.assertEqual(self.project.score_sum, 30)
+        self.assertEqual(self.project.average_score, 6.0)
+        # (2 * 10 + 8 + 6 + 4 + 2) / 6
+        self.assertEqual(self.project.weighted_score, 6.67)
+
+    def test_resubmitting_updates_in_place(self):
+        self.client.post(self.url, self.payload(10, 8, 6, 4, 2), format='json')
+        res = self.client.post(self.url, self.payload(1, 1), format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual((res.data['created'], res.data['updated']), (0, 2))
+
+        self.assertEqual(Rating.objects.filter(project=self.project).count(), 5)
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.rating_count, self.project.score_sum), (5, 14))
+        aggregate = CriteriaAggregate.objects.get(project=self.project, criteria=self.criteria[0])
+        self.assertEqual((aggregate.rating_count, aggregate.score_sum), (1, 1))
+
+    def test_query_count_does_not_depend_on_criteria_count(self):
+        with CaptureQueriesContext(connection) as one:
+            self.client.post(self.url, self.payload(5), format='json')
+
+        self.client.force_authenticate(user=User.objects.create_user('bob', email='bob@test.com'))
+        with CaptureQueriesContext(connection) as five:
+            self.client.post(self.url, self.payload(5, 5, 5, 5, 5), format='json')
+        self.assertEqual(len(one.captured_queries), len(five.captured_queries))
+
+    def test_rejects_criteria_from_other_category(self):
+        foreign = Criteria.objects.create(name="Plot", project_category="movie")
+        res = self.client.post(self.url, {"scores": [{"criteria": foreign.id, "score": 5}]}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Rating.objects.exists())
+
+    def test_rejects_duplicates_and_out_of_range_scores(self):
+        c = self.criteria[0].id
+        res = self.client.post(self.url, {"scores": [{"criteria": c, "score": 5}, {"criteria": c, "score": 6}]}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.post(self.url, {"scores": [{"criteria": c, "score": 11}]}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unpublished_project_is_not_found(self):
+        Project.objects.filter(pk=self.project.pk).update(status="draft")
+        res = self.client.post(self.url, self.payload(5), format='json')
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(user=None)
+        res = self.client.post(self.url, self.payload(5), format='json')
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rating_twice_is_a_validation_error(self):
+        url = f'/api/projects/{self.project.id}/ratings/'
+        res = self.client.post(url, {"criteria": self.criteria[0].id, "score": 5}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        res = self.client.post(url, {"criteria": self.criteria[0].id, "score": 7}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Rating.objects.get().score, 5)
+
+
+# Needs real row locks and concurrent connections
+@skipUnless(connection.vendor == "postgresql", "SELECT ... FOR UPDATE is a no-op on this database")
+class ConcurrentScorecardTest(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', email='alice@test.com', password='pass123')
+        self.project = Project.objects.create(name="Shop", category="ecommerce", status="published")
+        self.criteria = Criteria.objects.create(name="Design", project_category="ecommerce")
+
+    def test_simultaneous_first_submissions_count_once(self):
+        # Each submission waits here, after its upsert and before committing, for
+        # the other one: without the project lock both would find no previous
+        # scores and count themselves as new
+        barrier = threading.Barrier(2, timeout=2)
+        apply_rating_batch = stats.apply_rating_batch
+
+        def slow_apply(*args, **kwargs):
+            try:
+                barrier.wait()
+            except threading.BrokenBarrierError:
+                pass  # the other one is blocked on the lock, as it should be
+            return apply_rating_batch(*args, **kwargs)
+
+        def submit(score):
+            client = APIClient()
+            client.force_authenticate(self.user)
+            try:
+                client.post(f'/api/projects/{self.project.id}/ratings/scorecard/',
+                            {"scores": [{"criteria": self.criteria.id, "score": score}]}, format='json')
+            finally:
+                connections.close_all()
+
+        with mock.patch("core.viewsets.stats.apply_rating_batch", slow_apply):
+            threads = [threading.Thread(target=submit, args=(score,)) for score in (4, 8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.project.refresh_from_db()
+        rating = Rating.objects.get()
+        self.assertEqual((self.project.rating_count, self.project.score_sum), (1, rating.score))
+        aggregate = CriteriaAggregate.objects.get(project=self.project, criteria=self.criteria)
+        self.assertEqual((aggregate.rating_count, aggregate.score_sum), (1, rating.score))
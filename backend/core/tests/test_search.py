@@ -0,0 +1,48 @@
+from unittest import skipUnless
+
+from django.db import connection
+from rest_framework.test import APITestCase
+from core.models import Project
+
+class ProjectSearchTest(APITestCase):
+    def setUp(self):
+        self.chat = Project.objects.create(name="Chat Poll", description="Vote from a chat room", category="poll", status="published")
+        self.survey = Project.objects.create(name="Survey Builder", description="Ask anything, poll your team", category="poll", status="published")
+        self.movies = Project.objects.create(name="Movie Night", description="Pick tonight's film", category="movie", status="published")
+        Project.objects.create(name="Hidden Poll", description="draft", category="poll", status="draft")
+
+    def ids(self, res):
+        return [p["id"] for p in res.data["results"]]
+
+    def test_name_matches_rank_above_description_matches(self):
+        res = self.client.get('/api/projects/?search=poll')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.ids(res), [self.chat.id, self.survey.id])
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.ids(self.client.get('/api/projects/?search=poll team')), [self.survey.id])
+        self.assertEqual(self.ids(self.client.get('/api/projects/?search=nothing-like-this')), [])
+
+    def test_combines_with_filters_ordering_and_pages(self):
+        res = self.client.get('/api/projects/?search=poll&category=movie')
+        self.assertEqual(self.ids(res), [])
+
+        res = self.client.get('/api/projects/?search=poll&ordering=-created_at')
+        self.assertEqual(self.ids(res), [self.survey.id, self.chat.id])
+
+        # Cursor pages follow the relevance order
+        res = self.client.get('/api/projects/?search=poll&page_size=1')
+        self.assertEqual(self.ids(res), [self.chat.id])
+        res = self.client.get(res.data["next"])
+        self.assertEqual(self.ids(res), [self.survey.id])
+        self.assertIsNone(res.data["next"])
+
+
+@skipUnless(connection.vendor == "postgresql", "full-text and trigram search need PostgreSQL")
+class PostgresSearchTest(ProjectSearchTest):
+    def test_similar_names_do_not_bypass_the_terms(self):
+        # "Chat Poll" is a close trigram match for "poll team" but lacks "team"
+        self.assertEqual(self.ids(self.client.get('/api/projects/?search=poll team')), [self.survey.id])
+
+    def test_typos_fall_back_to_similar_names(self):
+        self.assertEqual(self.ids(self.client.get('/api/projects/?search=movei night')), [self.movies.id])
@@ -0,0 +1,94 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from core import stats
+from core.models import Project, Criteria, CriteriaAggregate, Vote, Rating
+
+User = get_user_model()
+
+class IncrementalStatsTest(TestCase):
+    def setUp(self):
+        self.u1 = User.objects.create_user('alice', email='alice@test.com', password='pass123')
+        self.u2 = User.objects.create_user('bob', email='bob@test.com', password='pass123')
+        self.project = Project.objects.create(name="Polling App", category="poll", status="published")
+        self.c1 = Criteria.objects.create(name="Innovation", project_category="poll")
+        self.c2 = Criteria.objects.create(name="Design", project_category="poll")
+
+    def assertStats(self, votes, ratings, total, average):
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.vote_count, votes)
+        self.assertEqual(self.project.rating_count, ratings)
+        self.assertEqual(self.project.score_sum, total)
+        self.assertEqual(self.project.average_score, average)
+
+    def test_votes_are_counted_incrementally(self):
+        vote = Vote.objects.create(user=self.u1, project=self.project)
+        Vote.objects.create(user=self.u2, project=self.project)
+        self.assertStats(2, 0, 0, None)
+
+        vote.delete()
+        self.assertStats(1, 0, 0, None)
+
+    def test_rating_create_update_delete(self):
+        r1 = Rating.objects.create(user=self.u1, project=self.project, criteria=self.c1, score=5)
+        Rating.objects.create(user=self.u2, project=self.project, criteria=self.c1, score=4)
+        self.assertStats(0, 2, 9, 4.5)
+
+        r1.score = 10
+        r1.save()
+        self.assertStats(0, 2, 14, 7.0)
+
+        # Instances loaded from the database also apply deltas
+        Rating.objects.get(pk=r1.pk).delete()
+        self.assertStats(0, 1, 4, 4.0)
+
+    def test_rating_write_cost_is_constant(self):
+        for score in (3, 7, 9):
+            Rating.objects.create(user=User.objects.create_user(f'u{score}', email=f'u{score}@test.com'),
+                                  project=self.project, criteria=self.c1, score=score)
+        # INSERT + aggregate UPDATE + project UPDATE, regardless of how many ratings already exist
+        with self.assertNumQueries(3):
+            Rating.objects.create(user=self.u1, project=self.project, criteria=self.c1, score=1)
+        self.assertStats(0, 4, 20, 5.0)
+
+    def test_drift_falls_back_to_recompute(self):
+        rating = Rating.objects.create(user=self.u1, project=self.project, criteria=self.c1, score=6)
+        Rating.objects.create(user=self.u2, project=self.project, criteria=self.c1, score=8)
+        Project.objects.filter(pk=self.project.pk).update(rating_count=0, score_sum=0)
+
+        rating.delete()
+        self.assertStats(0, 1, 8, 8.0)
+
+    def test_recompute_rewrites_only_drifted_aggregates(self):
+        Rating.objects.create(user=self.u1, project=self.project, criteria=self.c1, score=6)
+        Rating.objects.create(user=self.u1, project=self.project, criteria=self.c2, score=4)
+        CriteriaAggregate.objects.filter(criteria=self.c2).update(score_sum=40, hist_4=3)
+        fine = CriteriaAggregate.objects.get(criteria=self.c1)
+
+        # Lock, 2 totals, aggregates, histograms, one aggregate UPDATE, project UPDATE, in a savepoint
+        with self.assertNumQueries(9):
+            stats.recompute(self.project.pk)
+        self.assertEqual(CriteriaAggregate.objects.get(criteria=self.c1).pk, fine.pk)
+        drifted = CriteriaAggregate.objects.get(criteria=self.c2)
+        self.assertEqual((drifted.score_sum, drifted.hist_4), (4, 1))
+
+        c3 = Criteria.objects.create(name="Impact", project_category="poll")
+        CriteriaAggregate.objects.create(project=self.project, criteria=c3, score_sum=5, rating_count=1, hist_5=1)
+        stats.recompute(self.project.pk)
+        self.assertFalse(CriteriaAggregate.objects.filter(criteria=c3).exists())
+
+    def test_reconcile_command_fixes_drift(self):
+        Vote.objects.create(user=self.u1, project=self.project)
+        Rating.objects.create(user=self.u1, project=self.project, criteria=self.c1, score=6)
+        Project.objects.filter(pk=self.project.pk).update(vote_count=7, rating_count=3, score_sum=1, average_score=1)
+
+        out = StringIO()
+        call_command("reconcile_stats", stdout=out)
+        self.assertIn("1 project(s) reconciled", out.getvalue())
+        self.assertStats(1, 1, 6, 6.0)
+
+        out = StringIO()
+        call_command("reconcile_stats", "--dry-run", stdout=out)
+        self.assertIn("0 project(s) drifted", out.getvalue())
@@ -0,0 +1,134 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils.http import http_date
+from rest_framework.test import APITestCase
+from core import checks, versions
+from core.models import Comment, Criteria, Project, ProjectImage, Vote
+
+User = get_user_model()
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user('alice', email='alice@test.com', password='pass123')
+        self.bob = User.objects.create_user('bob', email='bob@test.com', password='pass123')
+        self.project = Project.objects.create(name="Feed", category="social", status="published")
+        self.other = Project.objects.create(name="Jobs", category="job", status="published")
+        self.criteria = Criteria.objects.create(project_category="social", name="Design")
+
+    def get(self, url, etag=None, **headers):
+        if etag:
+            headers["HTTP_IF_NONE_MATCH"] = etag
+        return self.client.get(url, **headers)
+
+    def settle(self, *scopes):
+        # Last changed a while ago, so Last-Modified is sent
+        cache.set_many({versions.KEY_PREFIX + scope: time.time() - 10 for scope in scopes}, timeout=None)
+
+    def test_unchanged_list_is_304_without_queries(self):
+        self.settle(versions.PROJECTS)
+        res = self.get('/api/projects/')
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("Last-Modified", res)
+        with self.assertNumQueries(0):
+            again = self.get('/api/projects/', res["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["ETag"], res["ETag"])
+        self.assertEqual(again.content, b"")
+        # Another query string is another representation
+        self.assertEqual(self.get('/api/projects/?category=job', res["ETag"]).status_code, 200)
+
+    def test_if_modified_since(self):
+        self.settle(versions.PROJECTS)
+        res = self.get('/api/projects/top/')
+        again = self.get('/api/projects/top/', HTTP_IF_MODIFIED_SINCE=res["Last-Modified"])
+        self.assertEqual(again.status_code, 304)
+
+    def test_if_modified_since_sees_changes_within_the_second(self):
+        url = f'/api/projects/{self.project.id}/'
+        # Changed this very second: no Last-Modified yet
+        self.assertNotIn("Last-Modified", self.get(url))
+        since = http_date(time.time())
+        self.client.force_authenticate(self.bob)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/projects/{self.project.id}/vote/')
+
+        res = self.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["vote_count"], 1)
+
+    def test_vote_changes_list_top_and_detail(self):
+        self.client.force_authenticate(self.bob)
+        urls = ['/api/projects/', '/api/projects/top/', f'/api/projects/{self.project.id}/']
+        etags = {url: self.get(url)["ETag"] for url in urls}
+        other = self.get(f'/api/projects/{self.other.id}/')["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/projects/{self.project.id}/vote/')
+
+        for url in urls:
+            res = self.get(url, etags[url])
+            self.assertEqual(res.status_code, 200, url)
+        self.assertTrue(self.get(f'/api/projects/{self.project.id}/').data["has_voted"])
+        self.assertEqual(self.get(f'/api/projects/{self.other.id}/', other).status_code, 304)
+
+    def test_etag_is_per_user(self):
+        Vote.objects.create(user=self.alice, project=self.project)
+        self.client.force_authenticate(self.alice)
+        etag = self.get('/api/projects/')["ETag"]
+        self.client.force_authenticate(self.bob)
+        self.assertEqual(self.get('/api/projects/', etag).status_code, 200)
+
+    def test_comments_images_and_criteria(self):
+        comments = f'/api/projects/{self.project.id}/comments/'
+        detail = f'/api/projects/{self.project.id}/'
+        etags = {url: self.get(url)["ETag"] for url in (comments, detail, '/api/criteria/')}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(user=self.alice, project=self.project, content="hi")
+        self.assertEqual(self.get(comments, etags[comments]).status_code, 200)
+        self.assertEqual(self.get(detail, etags[detail]).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectImage.objects.create(project=self.project, image="projects/a.png")
+        self.assertEqual(self.get(detail, etags[detail]).status_code, 200)
+
+        etags[detail] = self.get(detail)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.criteria.name = "Look & feel"
+            self.criteria.save()
+        self.assertEqual(self.get('/api/criteria/', etags['/api/criteria/']).status_code, 200)
+        self.assertEqual(self.get(detail, etags[detail]).status_code, 200)
+
+    def test_writes_are_not_conditional(self):
+        self.client.force_authenticate(self.alice)
+        etag = self.get('/api/projects/')["ETag"]
+        res = self.client.post('/api/projects/', {"name": "New"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 201)
+        self.assertNotIn("ETag", res)
+
+    def test_failing_read_models_do_not_fail_the_write(self):
+        url = f'/api/projects/{self.project.id}/'
+        etag = self.get(url)["ETag"]
+        self.client.force_authenticate(self.bob)
+        with mock.patch("core.events.live.publish", side_effect=ConnectionError("redis down")), \
+                self.assertLogs("core.events", "ERROR"), self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(f'/api/projects/{self.project.id}/vote/')
+        self.assertEqual(res.status_code, 201)
+        # The version token still moved
+        self.assertEqual(self.get(url, etag).status_code, 200)
+
+
+class SharedCacheCheckTest(APITestCase):
+    def test_process_local_cache_is_an_error_outside_debug(self):
+        with override_settings(DEBUG=False, TESTING=False):
+            self.assertEqual([error.id for error in checks.check_shared_cache(None)], ["core.E001"])
+        with override_settings(DEBUG=True, TESTING=False):
+            self.assertEqual(checks.check_shared_cache(None), [])
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://localhost"}}
+        with override_settings(DEBUG=False, TESTING=False, CACHES=redis):
+            self.assertEqual(checks.check_shared_cache(None), [])
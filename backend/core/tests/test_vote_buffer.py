@@ -0,0 +1,139 @@
+from io import StringIO
+from unittest import mock
+
+import fakeredis
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import override_settings
+from core import stats, vote_buffer
+from core.models import Project, Vote
+
+User = get_user_model()
+
+MEMORY_BUFFER = {"ENABLED": True, "BACKEND": "memory", "KEY": "test:votes"}
+REDIS_BUFFER = {"ENABLED": True, "BACKEND": "redis", "KEY": "test:votes"}
+
+
+class VoteBufferTestMixin:
+    def setUp(self):
+        vote_buffer._buffers.clear()
+        self.users = [
+            User.objects.create_user(f'user{i}', email=f'user{i}@test.com', password='pass123')
+            for i in range(3)
+        ]
+        self.p1 = Project.objects.create(name="Polling App", status="published")
+        self.p2 = Project.objects.create(name="Job Board", status="published")
+
+    def flush(self):
+        # The buffer is cleared on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            return vote_buffer.flush()
+
+    def vote(self, user, project):
+        self.client.force_authenticate(user=user)
+        return self.client.post(f'/api/projects/{project.id}/vote/')
+
+    def test_votes_are_buffered_until_flush(self):
+        for user in self.users:
+            self.assertEqual(self.vote(user, self.p1).status_code, status.HTTP_201_CREATED)
+        self.vote(self.users[0], self.p2)
+
+        self.p1.refresh_from_db()
+        self.assertEqual(self.p1.vote_count, 0)
+        self.assertEqual(vote_buffer.check_consistency(), [])
+
+        # Both projects are updated by a single statement
+        # One UPDATE (inside a savepoint here)
+        with self.assertNumQueries(3):
+            self.assertEqual(self.flush(), 2)
+
+        self.p1.refresh_from_db()
+        self.p2.refresh_from_db()
+        self.assertEqual((self.p1.vote_count, self.p2.vote_count), (3, 1))
+        self.assertEqual(vote_buffer.get_buffer().pending(), {})
+
+    def test_deletes_are_buffered_as_negative_deltas(self):
+        self.vote(self.users[0], self.p1)
+        self.vote(self.users[1], self.p1)
+        self.flush()
+
+        Vote.objects.filter(user=self.users[0]).delete()
+        self.assertEqual(vote_buffer.get_buffer().pending(), {self.p1.id: -1})
+        self.flush()
+
+        self.p1.refresh_from_db()
+        self.assertEqual(self.p1.vote_count, 1)
+
+    def test_recompute_leaves_buffered_votes_to_the_flush(self):
+        self.vote(self.users[0], self.p1)
+        self.vote(self.users[1], self.p1)
+        self.flush()
+        self.vote(self.users[2], self.p1)
+
+        stats.recompute(self.p1.id)
+        self.assertEqual(stats.reconcile(), 0)
+        self.flush()
+        self.p1.refresh_from_db()
+        self.assertEqual(self.p1.vote_count, 3)
+
+    def test_consistency_check_reports_drift(self):
+        self.vote(self.users[0], self.p1)
+        Project.objects.filter(pk=self.p2.pk).update(vote_count=5)
+
+        self.flush()
+        out = StringIO()
+        call_command("check_vote_buffer", "--flush", stdout=out)
+        self.assertIn(f"project {self.p2.id}: vote_count=5 buffered=0 votes=0", out.getvalue())
+        self.assertIn("1 project(s) inconsistent", out.getvalue())
+
+
+    def test_overlapping_flushes_apply_once(self):
+        self.vote(self.users[0], self.p1)
+        buffer = vote_buffer.get_buffer()
+        self.assertTrue(buffer.acquire())
+        try:
+            self.assertEqual(self.flush(), 0)
+        finally:
+            buffer.release()
+        self.assertEqual(self.flush(), 1)
+        self.assertEqual(self.flush(), 0)
+        self.p1.refresh_from_db()
+        self.assertEqual(self.p1.vote_count, 1)
+
+
+@override_settings(VOTE_BUFFER=MEMORY_BUFFER)
+class MemoryVoteBufferTest(VoteBufferTestMixin, APITestCase):
+    pass
+
+
+@override_settings(VOTE_BUFFER=REDIS_BUFFER)
+class RedisVoteBufferTest(VoteBufferTestMixin, APITestCase):
+    def setUp(self):
+        patcher = mock.patch("core.vote_buffer.get_redis", return_value=fakeredis.FakeRedis(decode_responses=True))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super().setUp()
+
+    def test_failed_flush_is_retried(self):
+        self.vote(self.users[0], self.p1)
+        with mock.patch("core.vote_buffer.Project.objects.filter", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.flush()
+
+        # A vote arriving after the failed flush goes to the live hash
+        self.vote(self.users[1], self.p1)
+        self.assertEqual(vote_buffer.get_buffer().pending(), {self.p1.id: 2})
+
+        self.flush()
+        self.flush()
+        self.p1.refresh_from_db()
+        self.assertEqual(self.p1.vote_count, 2)
+
+    def test_buffer_is_kept_until_the_update_commits(self):
+        self.vote(self.users[0], self.p1)
+        with self.captureOnCommitCallbacks(execute=False):
+            vote_buffer.flush()
+        # Not committed (yet): the deltas stay for the next flush
+        self.assertEqual(vote_buffer.get_buffer().pending(), {self.p1.id: 1})
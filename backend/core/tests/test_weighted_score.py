@@ -0,0 +1,68 @@
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from core.models import Project, Criteria, CriteriaAggregate, Rating
+
+User = get_user_model()
+
+class WeightedScoreTest(APITestCase):
+    def setUp(self):
+        self.u1 = User.objects.create_user('alice', email='alice@test.com', password='pass123')
+        self.u2 = User.objects.create_user('bob', email='bob@test.com', password='pass123')
+        self.project = Project.objects.create(name="Movie App", category="movie", status="published")
+        self.other = Project.objects.create(name="Movie Finder", category="movie", status="published")
+        self.innovation = Criteria.objects.create(name="Innovation", project_category="movie", weight=3, order=0)
+        self.design = Criteria.objects.create(name="Design", project_category="movie", weight=1, order=1)
+
+        Rating.objects.create(user=self.u1, project=self.project, criteria=self.innovation, score=8)
+        Rating.objects.create(user=self.u2, project=self.project, criteria=self.innovation, score=10)
+        Rating.objects.create(user=self.u1, project=self.project, criteria=self.design, score=2)
+        Rating.objects.create(user=self.u1, project=self.other, criteria=self.design, score=6)
+
+    def test_weighted_score_uses_criteria_weights(self):
+        self.project.refresh_from_db()
+        # (3 * 9 + 1 * 2) / 4
+        self.assertEqual(self.project.weighted_score, 7.25)
+        self.assertEqual(self.project.average_score, 6.67)
+
+        aggregate = CriteriaAggregate.objects.get(project=self.project, criteria=self.innovation)
+        self.assertEqual((aggregate.score_sum, aggregate.rating_count), (18, 2))
+
+    def test_rating_changes_update_aggregates(self):
+        rating = Rating.objects.get(user=self.u2, project=self.project)
+        rating.criteria = self.design
+        rating.save()
+        self.project.refresh_from_db()
+        # innovation 8/1, design (2 + 10)/2: (3 * 8 + 1 * 6) / 4
+        self.assertEqual(self.project.weighted_score, 7.5)
+
+        Rating.objects.filter(project=self.project).delete()
+        self.project.refresh_from_db()
+        self.assertIsNone(self.project.weighted_score)
+        self.assertFalse(CriteriaAggregate.objects.filter(project=self.project, rating_count__gt=0).exists())
+
+    def test_weight_change_rescores_category(self):
+        self.design.weight = 3
+        self.design.save()
+
+        self.project.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(self.project.weighted_score, 5.5)
+        self.assertEqual(self.other.weighted_score, 6.0)
+
+    def test_deleting_criteria_rescores_category(self):
+        self.design.delete()
+        self.project.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(self.project.weighted_score, 9.0)
+        self.assertIsNone(self.other.weighted_score)
+
+    def test_detail_endpoint_breakdown(self):
+        res = self.client.get(f'/api/projects/{self.project.id}/')
+        self.assertEqual(res.data['weighted_score'], 7.25)
+        self.assertEqual(res.data['criteria_breakdown'], [
+            {"id": self.innovation.id, "name": "Innovation", "weight": 3, "average": 9.0, "rating_count": 2},
+            {"id": self.design.id, "name": "Design", "weight": 1, "average": 2.0, "rating_count": 1},
+        ])
+
+        res = self.client.get('/api/projects/')
+        self.assertNotIn('criteria_breakdown', res.data['results'][0])
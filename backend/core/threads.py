@@ -0,0 +1,38 @@
+# core/threads.py
+from .models import Comment
+
+
+def thread_queryset(root_ids):
+    """Every reply under the given top-level comments, parents before children."""
+    return (
+        Comment.objects.filter(root_id__in=root_ids, parent__isnull=False)
+        .select_related("user")
+        .order_by("root_id", "path")
+    )
+
+
+def subtree_queryset(comment):
+    """``comment`` and all of its descendants in one indexed (root, path) range scan."""
+    return (
+        Comment.objects.filter(root_id=comment.root_id, path__startswith=comment.path)
+        .select_related("user")
+        .order_by("path")
+    )
+
+
+def build_tree(rows):
+    """Nest serialized comments under their parents in a single pass.
+
+    ``rows`` must list every parent before its children (true for path order).
+    Rows whose parent isn't in ``rows`` become top-level nodes, in input order.
+    """
+    nodes, roots = {}, []
+    for row in rows:
+        node = {**row, "replies": []}
+        nodes[node["id"]] = node
+        parent = nodes.get(node.get("parent"))
+        if parent is None:
+            roots.append(node)
+        else:
+            parent["replies"].append(node)
+    return roots
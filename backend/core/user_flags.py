@@ -0,0 +1,26 @@
+# core/user_flags.py
+from .models import Vote
+
+# Per-user boolean flags shown on projects: flag name -> a model with ``user``
+# and ``project`` foreign keys. Add e.g. "has_rated": Rating here and a
+# matching field on the serializer.
+USER_FLAGS = {
+    "has_voted": Vote,
+}
+
+
+def resolve(user, ids, flags=USER_FLAGS):
+    """Return {flag: set(project_ids)} for the given project ids with one IN query per flag."""
+    ids = list(ids)
+    if not ids or not user or not user.is_authenticated:
+        return {name: set() for name in flags}
+    return {
+        name: set(model.objects.filter(user=user, project_id__in=ids).values_list("project_id", flat=True))
+        for name, model in flags.items()
+    }
+
+
+def overlay(rows, user, flags=USER_FLAGS):
+    """Copy serialized project rows with the per-user flags filled in for ``user``."""
+    resolved = resolve(user, [row["id"] for row in rows], flags)
+    return [{**row, **{name: row["id"] in ids for name, ids in resolved.items()}} for row in rows]
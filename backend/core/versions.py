@@ -0,0 +1,122 @@
+# core/versions.py
+"""Version tokens for HTTP conditional requests (ETag / Last-Modified).
+
+Each scope ("projects", "project:<id>", "comments:<project id>", "criteria")
+holds the time of its last change in the cache. Writers bump it after commit;
+:class:`ConditionalViewMixin` turns the tokens into validators and answers
+``If-None-Match`` / ``If-Modified-Since`` with a 304 before the view queries
+or serializes anything. A token lost from the cache is re-seeded with the
+current time, which only costs clients one full response. The cache must be
+shared by every worker (system check core.E001 in core/checks.py).
+"""
+import hashlib
+import math
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+KEY_PREFIX = "version:"
+PROJECTS = "projects"  # any project row: lists, top, ranks
+CRITERIA = "criteria"
+SAFE_METHODS = ("GET", "HEAD")
+
+
+def project(pk):
+    return f"project:{pk}"
+
+
+def comments(project_pk):
+    return f"comments:{project_pk}"
+
+
+def bump(*scopes):
+    """Mark ``scopes`` as changed once the current transaction commits."""
+    keys = [KEY_PREFIX + scope for scope in scopes]
+    transaction.on_commit(lambda: cache.set_many(dict.fromkeys(keys, time.time()), timeout=None))
+
+
+def projects_changed(project_ids):
+    bump(PROJECTS, *(project(pk) for pk in project_ids))
+
+
+def current(scopes):
+    """Token per scope, seeding the missing ones (``add`` so concurrent readers agree)."""
+    keys = [KEY_PREFIX + scope for scope in scopes]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        now = time.time()
+        for key in missing:
+            cache.add(key, now, timeout=None)
+        found.update(cache.get_many(missing))
+    return [found.get(key, time.time()) for key in keys]
+
+
+def validators(request, scopes):
+    """(etag, last_modified or None) for ``request`` given the scopes its response depends on.
+
+    The ETag also covers the URL, the user (per-user flags such as has_voted)
+    and the negotiated media type.
+    """
+    tokens = current(scopes)
+    user = getattr(request, "user", None)
+    seed = repr((tokens, request.get_full_path(), getattr(user, "pk", None), getattr(request, "accepted_media_type", None)))
+    etag = '"%s"' % hashlib.md5(seed.encode(), usedforsecurity=False).hexdigest()
+    # HTTP dates have whole seconds: round up, and leave Last-Modified out
+    # while a change in the same second is still possible, or a client
+    # sending only If-Modified-Since would get a 304 for it
+    last_modified = math.ceil(max(tokens))
+    return etag, (last_modified if last_modified <= time.time() else None)
+
+
+class ConditionalResponse(Exception):
+    # Carries the 304 (or 412) out of APIView.initial()
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalViewMixin:
+    """APIView mixin answering conditional GET/HEAD requests from version tokens.
+
+    Views implement ``get_version_scopes()`` returning the scopes the current
+    action reads, or None to opt out. The check runs after authentication and
+    content negotiation but before the handler, so a 304 costs no query.
+    """
+
+    def get_version_scopes(self):
+        return None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._validators = None
+        if request.method not in SAFE_METHODS:
+            return
+        scopes = self.get_version_scopes()
+        if not scopes:
+            return
+        etag, last_modified = self._validators = validators(request, scopes)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            self._set_validators(response)
+            raise ConditionalResponse(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, ConditionalResponse):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, "_validators", None) and response.status_code == 200:
+            self._set_validators(response)
+        return response
+
+    def _set_validators(self, response):
+        etag, last_modified = self._validators
+        response.headers["ETag"] = etag
+        if last_modified is not None:
+            response.headers["Last-Modified"] = http_date(last_modified)
+        patch_vary_headers(response, ("Accept", "Authorization"))
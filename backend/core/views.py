@@ -1,3 +1,22 @@
-from django.shortcuts import render
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
 
+from . import metrics
 
+
+@require_GET
+def metrics_view(request):
+    """Prometheus scrape target (see core/metrics.py).
+
+    Scrapers send "Authorization: Bearer <TOKEN>"; without a configured token
+    only staff sessions (e.g. from the admin) may read it.
+    """
+    token = metrics.get_config()["TOKEN"]
+    if token:
+        allowed = constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}")
+    else:
+        allowed = request.user.is_authenticated and request.user.is_staff
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
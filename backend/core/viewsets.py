@@ -1,18 +1,28 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny, IsAuthenticated
-from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny, IsAuthenticated, IsAdminUser
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.renderers import BrowsableAPIRenderer
 from django.db import transaction, IntegrityError
-from django.db.models import Avg
-from django.core.cache import cache
+from django.db.models import Avg, Prefetch
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
-from .models import Project, ProjectImage, Criteria, Vote, Rating, Comment
+from .models import (
+    Project, ProjectImage, Criteria, CriteriaAggregate, Vote, Rating, Comment,
+    CategoryRollup, CriteriaRollup, ProjectRollup, Rollup,
+)
+from . import caching, catalogue, events, fastpath, fieldsets, histograms, leaderboard, leaderboard_index, notifications, search, stats, threads, user_flags, versions
+from .pagination import KeysetPagination
+from .renderers import FastJSONRenderer
 
 # We use the single serializer we created to avoid ImportErrors
 from .serializers import (
-    ProjectSerializer, ProjectImageSerializer, 
-    RatingSerializer, CommentSerializer, CriteriaSerializer
+    ProjectSerializer, ProjectDetailSerializer, ProjectCompactSerializer, ProjectImageSerializer,
+    RatingSerializer, ScorecardSerializer, CommentSerializer, CriteriaSerializer,
+    RollupBucketSerializer,
 )
 
 # Standard Django filters
@@ -20,34 +30,183 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import OrderingFilter
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(versions.ConditionalViewMixin, viewsets.ModelViewSet):
     # We only show 'published' projects
     queryset = Project.objects.filter(status="published").select_related("creator").prefetch_related("images")
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    # Search runs last so its relevance order wins over the default ordering
+    filter_backends = [DjangoFilterBackend, OrderingFilter, search.ProjectSearchFilter]
     filterset_fields = ["category"]
-    ordering_fields = ["created_at", "vote_count"]
+    ordering_fields = ["created_at", "vote_count", "bayesian_score", "wilson_score", "trimmed_score"]
     ordering = ["-created_at"]
+    pagination_class = KeysetPagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
 
     # Use the serializer we created in Step 1
     serializer_class = ProjectSerializer
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "list":
+            # Only read the columns/relations the requested fields need; keep the sort keys for the cursor
+            fields, expand = self.get_fieldset()
+            queryset = fieldsets.shape_queryset(
+                queryset, self.get_serializer_class(), fields, expand, always=self.ordering_fields
+            )
+        if self.action == "retrieve" and "criteria_breakdown" in self.get_selected_fields():
+            breakdown = CriteriaAggregate.objects.filter(rating_count__gt=0).select_related("criteria")
+            queryset = queryset.prefetch_related(
+                Prefetch("criteria_aggregates", queryset=breakdown.order_by("criteria__order"))
+            )
+        return queryset
+
+    # --- SPARSE FIELDSETS (?fields=, ?expand=, ?view=compact) ---
+    def get_fieldset(self):
+        if not hasattr(self, "_fieldset"):
+            fields, expand = fieldsets.parse(self.request)
+            self.get_serializer_class().validate_fieldset(fields, expand)
+            self._fieldset = fields, expand
+        return self._fieldset
+
+    def get_selected_fields(self):
+        if self.action not in ("list", "retrieve"):
+            return set(self.get_serializer_class().Meta.fields)
+        return self.get_serializer_class().selected_fields(*self.get_fieldset())
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in ("list", "retrieve"):
+            context["fields"], context["expand"] = self.get_fieldset()
+        return context
+
+    # --- CONDITIONAL GET (ETag / Last-Modified, see core/versions.py) ---
+    def get_version_scopes(self):
+        if self.action in ("list", "top", "rank", "around"):
+            return [versions.PROJECTS]
+        if self.action in ("retrieve", "distribution"):
+            # The breakdown and distributions also show criteria names
+            return [versions.project(self.kwargs["pk"]), versions.CRITERIA]
+        return None
+
+    def get_cursor_ordering(self, request):
+        if search.query_from(request) and not request.query_params.get("ordering"):
+            return f"-{search.RANK}"
+        return None
+
+    def get_serializer_class(self):
+        if self.action == "retrieve":
+            return ProjectDetailSerializer
+        if self.action == "list" and self.request.query_params.get("view") == "compact":
+            return ProjectCompactSerializer
+        return super().get_serializer_class()
+
     def perform_create(self, serializer):
         serializer.save(creator=self.request.user, status="published")
 
+    def get_serializer(self, *args, **kwargs):
+        # Resolve has_voted & co. for every serialized project in one query per flag
+        if args and args[0] is not None and "has_voted" in self.get_selected_fields():
+            projects = args[0] if kwargs.get("many") else [args[0]]
+            kwargs["context"] = {
+                **self.get_serializer_context(),
+                "user_flags": user_flags.resolve(self.request.user, [p.pk for p in projects]),
+            }
+        return super().get_serializer(*args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        if not fastpath.eligible(request):
+            return super().list(request, *args, **kwargs)
+        # Same JSON as ProjectSerializer, built from values() rows (see core/fastpath.py)
+        queryset = fastpath.values(self.filter_queryset(self.get_queryset()), extra=self.ordering_fields)
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else list(queryset)
+        voted = user_flags.resolve(request.user, [row["id"] for row in rows])["has_voted"]
+        data = fastpath.project_rows(rows, request, voted)
+        return self.get_paginated_response(data) if page is not None else Response(data)
+
     # --- LEADERBOARD FEATURE ---
     @action(detail=False, methods=['get'])
     def top(self, request):
-        cached_data = cache.get("leaderboard")
-        if cached_data:
-            return Response(cached_data)
+        by = request.query_params.get("by", "votes")
+        category = request.query_params.get("category") or None
+        if by not in leaderboard.ORDERINGS:
+            raise ValidationError({"by": f"Choose one of {', '.join(leaderboard.ORDERINGS)}."})
+        # Checked before it becomes part of a cache key
+        categories = dict(Project.CATEGORY_CHOICES)
+        if category is not None and category not in categories:
+            raise ValidationError({"category": f"Choose one of {', '.join(categories)}."})
+
+        # Shared, user-independent ranking + a cheap per-user overlay (has_voted)
+        data = leaderboard.get_payload(lambda: self.build_leaderboard(by, category), by, category)
+        return Response(user_flags.overlay(data, request.user))
 
-        top_projects = self.get_queryset().order_by('-vote_count')[:5]
-        serializer = self.get_serializer(top_projects, many=True)
-        data = serializer.data
+    def build_leaderboard(self, by="votes", category=None):
+        size = leaderboard.LEADERBOARD_SIZE
+        queryset = fastpath.values(self.get_queryset())
+        if leaderboard_index.is_enabled() and by in leaderboard_index.METRICS:
+            ids = [pk for pk, _ in leaderboard_index.top(by, category, limit=size)]
+            projects = {row["id"]: row for row in queryset.filter(pk__in=ids)}
+            top_projects = [projects[pk] for pk in ids if pk in projects]
+        else:
+            if category:
+                queryset = queryset.filter(category=category)
+            top_projects = queryset.order_by(leaderboard.ORDERINGS[by])[:size]
 
-        cache.set("leaderboard", data, 300)
-        return Response(data)
+        # has_voted is left False here and overlaid per request
+        return fastpath.project_rows(top_projects, self.request)
+
+    # --- RANKING (Redis leaderboard index) ---
+    def _ranking_params(self, request):
+        if not leaderboard_index.is_enabled():
+            raise NotFound("Leaderboard index is disabled.")
+        by = request.query_params.get("by", "votes")
+        if by not in leaderboard_index.METRICS:
+            raise ValidationError({"by": f"Choose one of {', '.join(leaderboard_index.METRICS)}."})
+        category = self.get_object().category if request.query_params.get("scope") == "category" else None
+        return by, category
+
+    @action(detail=True, methods=["get"])
+    def rank(self, request, pk=None):
+        by, category = self._ranking_params(request)
+        position = leaderboard_index.rank(pk, by, category)
+        if position is None:
+            raise NotFound("Project is not ranked.")
+        return Response({"id": int(pk), "by": by, "category": category, **position})
+
+    @action(detail=True, methods=["get"])
+    def around(self, request, pk=None):
+        by, category = self._ranking_params(request)
+        window = request.query_params.get("window", "2")
+        if not window.isdigit():
+            raise ValidationError({"window": "Must be a positive integer."})
+        window = min(int(window), 25)
+        rows = leaderboard_index.around(pk, by, category, window=window)
+        names = dict(Project.objects.filter(pk__in=[row["id"] for row in rows]).values_list("id", "name"))
+        return Response([{**row, "name": names.get(row["id"])} for row in rows])
+
+    # --- SCORE DISTRIBUTIONS (from the CriteriaAggregate histograms) ---
+    @action(detail=True, methods=["get"])
+    def distribution(self, request, pk=None):
+        project = self.get_object()
+        raw = request.query_params.get("percentiles")
+        try:
+            percentiles = [float(p) for p in raw.split(",")] if raw else histograms.DEFAULT_PERCENTILES
+        except ValueError:
+            raise ValidationError({"percentiles": "Comma-separated numbers between 0 and 100."})
+        if not all(0 < p <= 100 for p in percentiles):
+            raise ValidationError({"percentiles": "Comma-separated numbers between 0 and 100."})
+
+        aggregates = project.criteria_aggregates.select_related("criteria").order_by("criteria__order", "criteria_id")
+        criteria = [
+            {"id": a.criteria_id, "name": a.criteria.name, **histograms.summarize(a.histogram, percentiles)}
+            for a in aggregates
+        ]
+        overall = histograms.combine([a.histogram for a in aggregates])
+        return Response({
+            "project": project.pk,
+            "overall": histograms.summarize(overall, percentiles),
+            "criteria": criteria,
+        })
 
     # --- VOTING FEATURE ---
     @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated])
@@ -59,10 +218,8 @@ class ProjectViewSet(viewsets.ModelViewSet):
         vote, created = Vote.objects.get_or_create(user=user, project=project)
         if not created:
             return Response({"detail": "Already voted"}, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Update Count
-        project.vote_count = Vote.objects.filter(project=project).count()
-        project.save(update_fields=["vote_count"])
+
+        # vote_count is bumped atomically by the post_save signal (see core/stats.py)
         return Response({"detail": "Voted successfully"}, status=status.HTTP_201_CREATED)
 
 
@@ -76,16 +233,201 @@ class ProjectImageViewSet(viewsets.ModelViewSet):
 class RatingViewSet(viewsets.ModelViewSet):
     serializer_class = RatingSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = KeysetPagination
     def get_queryset(self):
         return Rating.objects.filter(project_id=self.kwargs["project_pk"])
 
-class CommentViewSet(viewsets.ModelViewSet):
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == "create":
+            # RatingSerializer checks the criteria's category against it
+            context["project"] = get_object_or_404(
+                Project.objects.filter(status="published"), pk=self.kwargs["project_pk"]
+            )
+        return context
+
+    def perform_create(self, serializer):
+        try:
+            with transaction.atomic():
+                serializer.save(user=self.request.user, project=serializer.context["project"])
+        except IntegrityError:
+            # unique (user, project, criteria): rescoring goes through the scorecard
+            raise ValidationError({"criteria": "You have already rated this criteria; use the scorecard to change it."})
+
+    # --- SCORECARD: all criteria in one request ---
+    @action(detail=False, methods=["post"], permission_classes=[IsAuthenticated])
+    def scorecard(self, request, project_pk=None):
+        project = get_object_or_404(Project.objects.filter(status="published"), pk=project_pk)
+        serializer = ScorecardSerializer(
+            data=request.data, context={**self.get_serializer_context(), "project": project}
+        )
+        serializer.is_valid(raise_exception=True)
+        scores = {entry["criteria"]: entry["score"] for entry in serializer.validated_data["scores"]}
+
+        with transaction.atomic():
+            # Rating rows may not exist yet, so lock the project: concurrent
+            # first submissions would otherwise both count themselves as new
+            Project.objects.select_for_update().get(pk=project.pk)
+            previous = dict(
+                Rating.objects.select_for_update()
+                .filter(user=request.user, project=project, criteria_id__in=scores)
+                .values_list("criteria_id", "score")
+            )
+            # bulk_create skips the per-row signals; stats are applied once below
+            Rating.objects.bulk_create(
+                [Rating(user=request.user, project=project, criteria_id=pk, score=score) for pk, score in scores.items()],
+                update_conflicts=True,
+                unique_fields=["user", "project", "criteria"],
+                update_fields=["score"],
+            )
+            stats.apply_rating_batch(project.pk, {
+                pk: (
+                    0 if pk in previous else 1,
+                    score - previous.get(pk, 0),
+                    stats.histogram_change(previous.get(pk), score),
+                )
+                for pk, score in scores.items()
+            })
+            if notifications.is_enabled() and len(scores) > len(previous):
+                notifications.record_ratings(project.pk, len(scores) - len(previous))
+        events.projects_changed([project.pk])
+
+        created = len(scores) - len(previous)
+        return Response(
+            {
+                "project": project.pk,
+                "created": created,
+                "updated": len(previous),
+                "scores": [{"criteria": pk, "score": score} for pk, score in scores.items()],
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+class CommentViewSet(versions.ConditionalViewMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = KeysetPagination
     def get_queryset(self):
-        return Comment.objects.filter(project_id=self.kwargs["project_pk"])
+        return Comment.objects.filter(project_id=self.kwargs["project_pk"]).select_related("user")
+
+    def get_version_scopes(self):
+        return [versions.comments(self.kwargs["project_pk"])]
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user, project_id=self.kwargs["project_pk"])
 
-class CriteriaViewSet(viewsets.ReadOnlyModelViewSet):
+    # --- THREADED VIEWS (materialized paths, see core/threads.py) ---
+    @action(detail=False, methods=["get"])
+    def threads(self, request, project_pk=None):
+        # A page of top-level comments, then all their replies in one query
+        roots = self.paginate_queryset(self.get_queryset().filter(parent__isnull=True))
+        replies = threads.thread_queryset([comment.pk for comment in roots])
+        rows = self.get_serializer([*roots, *replies], many=True).data
+        return self.get_paginated_response(threads.build_tree(rows))
+
+    @action(detail=True, methods=["get"])
+    def thread(self, request, project_pk=None, pk=None):
+        comment = self.get_object()
+        rows = self.get_serializer(threads.subtree_queryset(comment), many=True).data
+        return Response(threads.build_tree(rows)[0])
+
+class CriteriaViewSet(versions.ConditionalViewMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Criteria.objects.all()
     serializer_class = CriteriaSerializer
-    permission_classes = [AllowAny]
\ No newline at end of file
+    permission_classes = [AllowAny]
+
+    def get_version_scopes(self):
+        return [versions.CRITERIA]
+
+    # Served from the per-process registry (see core/catalogue.py): no query once loaded
+    def get_queryset(self):
+        return list(catalogue.all_criteria())
+
+    def get_object(self):
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        criteria = catalogue.get(int(lookup)) if lookup.isdigit() else None
+        if criteria is None:
+            raise NotFound()
+        self.check_object_permissions(self.request, criteria)
+        return criteria
+
+class AnalyticsViewSet(viewsets.ViewSet):
+    """Read-only dashboards served from the hourly/daily rollups (see core/rollups.py).
+
+    Every query reads one row per bucket, whatever the number of votes,
+    ratings or comments behind it. Public on purpose, like the leaderboard:
+    only aggregate counts, nothing per user.
+    """
+    permission_classes = [AllowAny]
+    MAX_BUCKETS = 1000
+    STEPS = {"hour": timezone.timedelta(hours=1), "day": timezone.timedelta(days=1)}
+    DEFAULT_SPANS = {"hour": timezone.timedelta(hours=48), "day": timezone.timedelta(days=30)}
+
+    def _range(self, request):
+        period = request.query_params.get("period", "day")
+        if period not in dict(Rollup.PERIOD_CHOICES):
+            raise ValidationError({"period": "Choose one of hour, day."})
+        bounds = {}
+        for name in ("since", "until"):
+            value = request.query_params.get(name)
+            if not value:
+                bounds[name] = None
+                continue
+            try:
+                bounds[name] = parse_datetime(value)
+            except ValueError:  # well-formed but out of range, e.g. month 13
+                bounds[name] = None
+            if bounds[name] is None:
+                raise ValidationError({name: "Must be an ISO 8601 datetime."})
+            if timezone.is_naive(bounds[name]):
+                bounds[name] = timezone.make_aware(bounds[name])
+        until = bounds["until"] or timezone.now()
+        since = bounds["since"] or until - self.DEFAULT_SPANS[period]
+        if since > until or (until - since) / self.STEPS[period] > self.MAX_BUCKETS:
+            raise ValidationError({"since": f"The range must cover at most {self.MAX_BUCKETS} buckets."})
+        return {"period": period, "bucket__gte": since, "bucket__lte": until}
+
+    @action(detail=False, methods=["get"], url_path=r"projects/(?P<project_pk>\d+)")
+    def project(self, request, project_pk=None):
+        project = get_object_or_404(Project, pk=project_pk)
+        window = self._range(request)
+        buckets = ProjectRollup.objects.filter(project=project, **window).order_by("bucket")
+
+        criteria = {}
+        for row in CriteriaRollup.objects.filter(project=project, **window).select_related("criteria"):
+            entry = criteria.setdefault(row.criteria_id, {
+                "id": row.criteria_id, "name": row.criteria.name, "ratings": 0, "score_sum": 0, "distribution": {},
+            })
+            entry["ratings"] += row.ratings
+            entry["score_sum"] += row.score_sum
+            for score, count in row.distribution.items():
+                entry["distribution"][score] = entry["distribution"].get(score, 0) + count
+        for entry in criteria.values():
+            entry["average"] = round(entry.pop("score_sum") / entry["ratings"], 2) if entry["ratings"] else None
+
+        return Response({
+            "project": project.pk,
+            "period": window["period"],
+            "buckets": RollupBucketSerializer(buckets, many=True).data,
+            "criteria": sorted(criteria.values(), key=lambda entry: entry["id"]),
+        })
+
+    @action(detail=False, methods=["get"], url_path=r"categories/(?P<category>[a-z]+)")
+    def category(self, request, category=None):
+        if category not in dict(Project.CATEGORY_CHOICES):
+            raise NotFound("Unknown category.")
+        window = self._range(request)
+        buckets = CategoryRollup.objects.filter(category=category, **window).order_by("bucket")
+        return Response({
+            "category": category,
+            "period": window["period"],
+            "buckets": RollupBucketSerializer(buckets, many=True).data,
+        })
+
+
+class CacheMetricsViewSet(viewsets.ViewSet):
+    """Hit/miss/rebuild counters of the shared API cache, summed over all workers."""
+    permission_classes = [IsAdminUser]
+
+    def list(self, request):
+        return Response(caching.metrics())
@@ -0,0 +1,171 @@
+# core/vote_buffer.py
+import threading
+import uuid
+from collections import Counter
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, Value, When
+from django.db.models.functions import Greatest
+
+from . import events
+from .models import Project, Vote
+from .redis_client import get_redis
+
+DEFAULTS = {"ENABLED": False, "BACKEND": "redis", "KEY": "votes:buffer"}
+# Seconds after which the flush lock of a crashed worker expires
+LOCK_TIMEOUT = 60
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "VOTE_BUFFER", {})}
+
+
+def is_enabled():
+    return get_config()["ENABLED"]
+
+
+# --- BACKENDS ---
+class MemoryVoteBuffer:
+    """Per-process counters. Only useful for a single worker (dev, tests)."""
+
+    def __init__(self, key=None):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._deltas = Counter()
+
+    def acquire(self):
+        return self._flush_lock.acquire(blocking=False)
+
+    def release(self):
+        self._flush_lock.release()
+
+    def add(self, project_id, delta):
+        with self._lock:
+            self._deltas[project_id] += delta
+
+    def pending(self):
+        with self._lock:
+            return dict(self._deltas)
+
+    def drain(self):
+        with self._lock:
+            deltas, self._deltas = self._deltas, Counter()
+        return dict(deltas)
+
+    def ack(self):
+        pass
+
+
+class RedisVoteBuffer:
+    """Per-project counters in a Redis hash, shared by every worker.
+
+    A flush atomically renames the live hash to a "flushing" key, so votes
+    arriving mid-flush land in a fresh hash. The flushing key is only deleted
+    once the UPDATE has committed, and is retried first on the next flush.
+    Flushes hold a Redis lock, so two of them never apply the same hash.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.flushing_key = f"{key}:flushing"
+        self.lock_key = f"{key}:lock"
+        self._held = threading.local()
+
+    def acquire(self):
+        token = uuid.uuid4().hex
+        if not get_redis().set(self.lock_key, token, nx=True, ex=LOCK_TIMEOUT):
+            return False
+        self._held.token = token
+        return True
+
+    def release(self):
+        # Only delete our own lock: it may have expired and been taken by another flush
+        with get_redis().pipeline() as pipe:
+            try:
+                pipe.watch(self.lock_key)
+                if pipe.get(self.lock_key) == self._held.token:
+                    pipe.multi()
+                    pipe.delete(self.lock_key)
+                    pipe.execute()
+            except redis.exceptions.WatchError:
+                pass
+
+    def add(self, project_id, delta):
+        get_redis().hincrby(self.key, project_id, delta)
+
+    def pending(self):
+        client = get_redis()
+        totals = Counter()
+        for key in (self.key, self.flushing_key):
+            for project_id, delta in client.hgetall(key).items():
+                totals[int(project_id)] += int(delta)
+        return dict(totals)
+
+    def drain(self):
+        client = get_redis()
+        if not client.exists(self.flushing_key):
+            try:
+                client.rename(self.key, self.flushing_key)
+            except redis.exceptions.ResponseError:  # nothing buffered
+                return {}
+        return {int(pk): int(delta) for pk, delta in client.hgetall(self.flushing_key).items()}
+
+    def ack(self):
+        get_redis().delete(self.flushing_key)
+
+
+BACKENDS = {"memory": MemoryVoteBuffer, "redis": RedisVoteBuffer}
+_buffers = {}
+
+
+def get_buffer():
+    config = get_config()
+    name = (config["BACKEND"], config["KEY"])
+    if name not in _buffers:
+        _buffers[name] = BACKENDS[config["BACKEND"]](config["KEY"])
+    return _buffers[name]
+
+
+def record_vote(project_id, delta):
+    get_buffer().add(project_id, delta)
+
+
+# --- FLUSH ---
+def flush():
+    """Apply every buffered delta with a single bulk UPDATE. Returns the number of projects touched.
+
+    Returns 0 without doing anything while another flush (beat task,
+    check_vote_buffer, reconcile_stats) is running. Call it outside a
+    transaction: the buffer is only cleared once the UPDATE has committed.
+    """
+    buffer = get_buffer()
+    if not buffer.acquire():
+        return 0
+    try:
+        with transaction.atomic():
+            deltas = {pk: delta for pk, delta in buffer.drain().items() if delta}
+            if deltas:
+                shift = Case(*[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()], default=Value(0))
+                Project.objects.filter(pk__in=deltas).update(vote_count=Greatest(F("vote_count") + shift, Value(0)))
+                events.projects_changed(deltas)
+            transaction.on_commit(buffer.ack)
+    finally:
+        buffer.release()
+    return len(deltas)
+
+
+def check_consistency(queryset=None):
+    """Return (project_id, stored, pending, actual) for projects whose vote_count
+    plus the still-buffered delta does not match the Vote table."""
+    queryset = Project.objects.all() if queryset is None else queryset
+    pending = get_buffer().pending() if is_enabled() else {}
+    actual = dict(Vote.objects.values_list("project_id").annotate(n=Count("id")).order_by())
+
+    mismatches = []
+    for pk, stored in queryset.order_by("pk").values_list("pk", "vote_count").iterator():
+        buffered = pending.get(pk, 0)
+        if stored + buffered != actual.get(pk, 0):
+            mismatches.append((pk, stored, buffered, actual.get(pk, 0)))
+    return mismatches
@@ -3,6 +3,7 @@ Django settings for polling_system project.
 Updated for Production (Render + Vercel)
 """
 import os
+import sys
 from pathlib import Path
 from datetime import timedelta
 import dj_database_url
@@ -57,6 +58,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third Party Apps
     'corsheaders', 
@@ -85,6 +87,7 @@ REST_FRAMEWORK = {
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware', # Must be at the top
     'django.middleware.security.SecurityMiddleware',
+    'core.metrics.MetricsMiddleware', # Latency / SQL per view, served at /metrics
     "whitenoise.middleware.WhiteNoiseMiddleware", 
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -143,14 +146,48 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# --- REDIS ---
+REDIS_URL = os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/0")
+
+# --- CACHE ---
+# Shared by every worker (leaderboards, ETag version tokens, purge progress).
+# Without REDIS_URL (local dev) and under `manage.py test` each process gets a
+# LocMemCache. Never clear() the Redis cache: it shares the Celery database
+# unless CACHE_REDIS_URL points elsewhere.
+TESTING = sys.argv[1:2] == ["test"]
+
+if "REDIS_URL" in os.environ and not TESTING:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": os.environ.get("CACHE_REDIS_URL", REDIS_URL),
+            "KEY_PREFIX": "api",
+            "TIMEOUT": 300,
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+                "SOCKET_CONNECT_TIMEOUT": 2,
+                "SOCKET_TIMEOUT": 2,
+            },
+        }
+    }
+
+# Read-through API caching (core/caching.py): freshness, stale window and
+# single-flight lock timeouts.
+API_CACHE = {
+    'TTL': 300,
+    'STALE': 60,
+    'LOCK_TIMEOUT': 30,
+}
+
 # --- CELERY SETTINGS ---
-CELERY_BROKER_URL = os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/0")
-CELERY_RESULT_BACKEND = os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/0")
+CELERY_BROKER_URL = REDIS_URL
+CELERY_RESULT_BACKEND = REDIS_URL
 
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
-CELERY_TASK_ALWAYS_EAGER = False
+# Tests run tasks in-process (e.g. image processing queued on upload)
+CELERY_TASK_ALWAYS_EAGER = TESTING
 
 from celery.schedules import crontab
 CELERY_BEAT_SCHEDULE = {
@@ -158,6 +195,76 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'core.tasks.cleanup_old_ratings',
         'schedule': crontab(hour=0, minute=0),
     },
+    'flush-vote-buffer': {
+        'task': 'core.tasks.flush_vote_buffer',
+        'schedule': timedelta(seconds=int(os.environ.get('VOTE_BUFFER_FLUSH_SECONDS', '5'))),
+    },
+    'send-rating-digests': {
+        'task': 'core.tasks.send_rating_digests',
+        'schedule': timedelta(seconds=60),
+    },
+    'update-rollups': {
+        'task': 'core.tasks.update_rollups',
+        'schedule': timedelta(minutes=5),
+    },
+}
+
+# --- VOTE BUFFER (write-behind vote_count) ---
+# When enabled, votes only bump an in-memory/Redis counter and the
+# flush_vote_buffer task applies the summed deltas in one UPDATE.
+# "memory" is per-process and only meant for dev/tests.
+VOTE_BUFFER = {
+    'ENABLED': os.environ.get('VOTE_BUFFER_ENABLED', 'False') == 'True',
+    'BACKEND': os.environ.get('VOTE_BUFFER_BACKEND', 'redis'),
+    'KEY': 'votes:buffer',
+}
+
+# --- LEADERBOARD INDEX (Redis sorted sets) ---
+# Keeps global + per-category rankings by votes and score in Redis.
+# Populate with `manage.py rebuild_leaderboard_index` before enabling.
+LEADERBOARD_INDEX = {
+    'ENABLED': os.environ.get('LEADERBOARD_INDEX_ENABLED', 'False') == 'True',
+    'PREFIX': 'lb',
+}
+
+# --- LIVE UPDATES (SSE at /api/live/, needs the ASGI server) ---
+# Workers publish changed project ids on a Redis channel; each ASGI process
+# batches them every INTERVAL seconds and pushes one diff to its clients.
+LIVE_UPDATES = {
+    'ENABLED': os.environ.get('LIVE_UPDATES_ENABLED', 'False') == 'True',
+    'BACKEND': os.environ.get('LIVE_UPDATES_BACKEND', 'redis'),
+    'CHANNEL': 'live:projects',
+    'INTERVAL': float(os.environ.get('LIVE_UPDATES_INTERVAL', '0.25')),
+    'HEARTBEAT': 15,
+}
+
+# --- RATING NOTIFICATIONS (digest emails to project creators) ---
+# New ratings are counted per project; send_rating_digests mails each creator
+# one summary once a project's oldest pending rating is WINDOW seconds old.
+NOTIFICATIONS = {
+    'ENABLED': os.environ.get('NOTIFICATIONS_ENABLED', 'False') == 'True',
+    'WINDOW': int(os.environ.get('NOTIFICATIONS_WINDOW', '300')),
+    'MAX_PER_HOUR': int(os.environ.get('NOTIFICATIONS_MAX_PER_HOUR', '4')),
+    'FROM_EMAIL': 'noreply@example.com',
+}
+
+# --- IMAGE PIPELINE (core/images.py) ---
+# Uploads are resized into thumbnail/card/full WebP variants by the
+# process_project_image task; `manage.py process_images` backfills old ones.
+IMAGE_PIPELINE = {
+    'ENABLED': os.environ.get('IMAGE_PIPELINE_ENABLED', 'True') == 'True',
+    'QUALITY': 80,
+}
+
+# --- METRICS (Prometheus text format at /metrics, see core/metrics.py) ---
+# Per-view latency, query count and SQL time, signal and Celery task timings.
+# Requests slower than SLOW_REQUEST_SECONDS are logged with their SQL.
+# Scrapers authenticate with METRICS_TOKEN; without one only staff can read it.
+METRICS = {
+    'ENABLED': os.environ.get('METRICS_ENABLED', 'True') == 'True',
+    'TOKEN': os.environ.get('METRICS_TOKEN', ''),
+    'FLUSH_INTERVAL': 10,
+    'SLOW_REQUEST_SECONDS': float(os.environ.get('SLOW_REQUEST_SECONDS', '1.0')),
 }
 
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
@@ -5,10 +5,12 @@ from django.conf.urls.static import static
 from rest_framework.routers import DefaultRouter
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
 
+from core import async_views, views
+
 # --- IMPORT FROM VIEWSETS NOW ---
 from core.viewsets import (
     ProjectViewSet, ProjectImageViewSet,
-    RatingViewSet, CommentViewSet, CriteriaViewSet
+    RatingViewSet, CommentViewSet, CriteriaViewSet, AnalyticsViewSet, CacheMetricsViewSet,
 )
 
 # --- ROUTER SETUP ---
@@ -19,6 +21,8 @@ router.register(r"projects/(?P<project_pk>\d+)/images", ProjectImageViewSet, bas
 router.register(r"projects/(?P<project_pk>\d+)/ratings", RatingViewSet, basename="project-ratings")
 router.register(r"projects/(?P<project_pk>\d+)/comments", CommentViewSet, basename="project-comments")
 router.register(r"criteria", CriteriaViewSet)
+router.register(r"analytics", AnalyticsViewSet, basename="analytics")
+router.register(r"cache-metrics", CacheMetricsViewSet, basename="cache-metrics")
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -27,10 +31,17 @@ urlpatterns = [
     path('api/auth/', include('djoser.urls')),
     path('api/auth/', include('djoser.urls.jwt')),
 
+    # Async vote ingestion (ASGI)
+    path("api/projects/<int:pk>/vote-async/", async_views.vote, name="project-vote-async"),
+    path("api/live/", async_views.live_stream, name="live-stream"),
+
     # --- THE API ENDPOINT ---
     # This automatically creates 'api/projects/' for you
     path("api/", include(router.urls)),
 
+    # Prometheus scrape target
+    path("metrics", views.metrics_view, name="metrics"),
+
     # Documentation
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path("api/docs/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
@@ -18,7 +18,9 @@ const Projects = () => {
   useEffect(() => {
     const fetchProjects = async () => {
       try {
-        const response = await api.get('/api/projects/')
+        // Search runs on the server, best matches first
+        const params = searchTerm.trim() ? { search: searchTerm.trim() } : {}
+        const response = await api.get('/api/projects/', { params })
         setProjects(response.data.results) 
       } catch (error) {
         console.error("Failed to fetch projects:", error)
@@ -26,8 +28,10 @@ const Projects = () => {
         setLoading(false)
       }
     }
-    fetchProjects()
-  }, [])
+    // Debounce so typing doesn't fire a request per keystroke
+    const timer = setTimeout(fetchProjects, 300)
+    return () => clearTimeout(timer)
+  }, [searchTerm])
 
   const handleVote = async (project) => {
     if (project.has_voted) return
@@ -49,10 +53,7 @@ const Projects = () => {
     }
   }
 
-  const filteredProjects = projects.filter(project => 
-    project.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-    project.description.toLowerCase().includes(searchTerm.toLowerCase())
-  )
+  const filteredProjects = projects
 
   return (
     // FIXED: p-4 for mobile, p-8 for desktop